@@ -1,8 +1,13 @@
 import os
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.config import settings
-from app.models import ToolResult
+from app.models import ToolResult, CHANNEL_WEB, CHANNEL_WHATSAPP
+from app.utils.serialization import dumps, to_jsonable
+from app.utils.llm_usage import UsageTracker
+from app.utils.plan_cache import PlanCache, ToolCall, ToolPlan
+from app.utils.prefetch import Prefetch, SpeculativePrefetcher
+from app.utils.tool_selection import ToolSelection, ToolSelector
 from app.tools import leads, appointments, invoices, business, catalog, help, offers
 
 # Tool definitions for the LLM
@@ -216,20 +221,141 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+def tool_result_payload(raw_result: Any) -> Any:
+    """JSON-compatible value of a tool result; computed once per ToolResult."""
+    if isinstance(raw_result, ToolResult):
+        return raw_result.payload
+    return to_jsonable(raw_result)
+
+
+def tool_result_to_json(raw_result: Any) -> str:
+    """Serializes a tool result to the JSON string sent back in an OpenAI tool message."""
+    payload = tool_result_payload(raw_result)
+    if isinstance(payload, str):
+        # Plain text results (errors) go to the model as-is
+        return payload
+    return dumps(payload)
+
+
+def tool_result_to_message(raw_result: Any) -> Any:
+    """Converts a tool result to the JSON-compatible value sent back in a Gemini function response."""
+    payload = tool_result_payload(raw_result)
+    if isinstance(payload, (dict, list)):
+        return payload
+    return {"result": str(payload)}
+
+
+def _gemini_function_calls(response: Any) -> List[Any]:
+    if not response.candidates:
+        return []
+    return [p.function_call for p in response.candidates[0].content.parts or [] if p.function_call]
+
+
+def build_agent_response(response_type: str, response_text: str, last_tool_result: Any, channel: str = CHANNEL_WEB) -> Dict[str, Any]:
+    """
+    Assembles the agent reply. Only the tool rendering for `channel` is built;
+    the other channel falls back to the model's own reply text.
+    """
+    response_value = None
+    whatsapp_text = ""
+
+    if last_tool_result:
+        if isinstance(last_tool_result, ToolResult):
+            # Same payload the LLM was sent, not a second dump
+            response_value = last_tool_result.payload
+            response_type = last_tool_result.type
+            # Prefer the tool's own rendering over the model's paraphrase
+            rendered = last_tool_result.render(channel)
+            if rendered:
+                if channel == CHANNEL_WHATSAPP:
+                    whatsapp_text = rendered
+                else:
+                    response_text = rendered
+        else:
+            response_value = tool_result_payload(last_tool_result)
+
+    return {
+        "type": response_type,
+        "response_text": response_text,
+        "response_value": response_value,
+        "whatsAppText": whatsapp_text if whatsapp_text else response_text
+    }
+
+
 class Agent:
     def __init__(self):
         self.provider = settings.LLM_PROVIDER
+        self.tool_selector = ToolSelector(TOOLS_DEFINITIONS)
+        self.plan_cache = PlanCache()
+        self.prefetcher = SpeculativePrefetcher(TOOLS_DEFINITIONS)
         
-    async def process_prompt(self, prompt: str, business_id: int, token: str = None, client_id: str = None) -> Dict[str, Any]:
+    async def process_prompt(self, prompt: str, business_id: int, token: str = None, client_id: str = None, channel: str = CHANNEL_WEB) -> Dict[str, Any]:
         logger.info(f"Processing prompt: {prompt}")
-        if self.provider == "openai":
-            return await self._process_openai(prompt, business_id, token, client_id)
-        elif self.provider == "gemini":
-            return await self._process_gemini(prompt, business_id, token, client_id)
-        else:
+        # The fake provider runs whichever SDK loop FAKE_LLM_STYLE names against scripted replies
+        style = settings.FAKE_LLM_STYLE if self.provider == "fake" else self.provider
+        if style not in ("openai", "gemini"):
             return {"type": "Error", "response_text": "Unsupported LLM provider", "response_value": None}
 
-    async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any], token: str = None, prompt: str = None, client_id: str = None) -> Any:
+        session = f"{channel}:{client_id or business_id}"
+        cached_calls = self.plan_cache.get(business_id, prompt, channel)
+        if cached_calls:
+            result = await self._run_plan(cached_calls, prompt, token, client_id, channel)
+            if result is not None:
+                self.tool_selector.remember(session, cached_calls[0][0])
+                return result
+            self.plan_cache.invalidate(business_id, prompt, channel)
+
+        model = settings.OPENAI_MODEL if style == "openai" else settings.GEMINI_MODEL
+        usage = UsageTracker(self.provider, model, business_id)
+        tools = self.tool_selector.select(prompt, channel, session)
+        logger.info(f"Tool selection: {len(tools.names)}/{len(TOOLS_DEFINITIONS)} tools, ~{tools.saved_tokens} schema tokens saved")
+        plan = ToolPlan()
+        # Likely reads run while the model decides; _execute_tool picks them up if the model agrees
+        prefetch = self.prefetcher.start(
+            business_id, prompt, channel,
+            lambda tool_name, arguments: self._execute_tool(tool_name, arguments, token, prompt, client_id),
+        )
+        try:
+            if style == "openai":
+                result = await self._process_openai(prompt, business_id, token, client_id, channel, usage=usage, tools=tools, plan=plan, prefetch=prefetch)
+            else:
+                result = await self._process_gemini(prompt, business_id, token, client_id, channel, usage=usage, tools=tools, plan=plan, prefetch=prefetch)
+        finally:
+            usage.finish()
+            prefetch.finish()
+        if usage.tool:
+            self.tool_selector.remember(session, usage.tool)
+        if plan.rounds:
+            self.prefetcher.record(business_id, channel, *plan.rounds[0][0])
+        self.plan_cache.put(business_id, prompt, channel, plan)
+        return result
+
+    async def _run_plan(self, calls: List[ToolCall], prompt: str, token: str, client_id: str, channel: str) -> Optional[Dict[str, Any]]:
+        """
+        Replays a cached tool plan without the LLM and replies with the last tool's
+        own rendering; None if a tool fails or has nothing to show.
+        """
+        last_tool_name, last_tool_result = None, None
+        for tool_name, arguments in calls:
+            last_tool_name = tool_name
+            last_tool_result = await self._execute_tool(tool_name, arguments, token, prompt, client_id)
+            if not isinstance(last_tool_result, ToolResult):
+                logger.warning(f"Cached plan for '{prompt}' failed at {tool_name}; asking the model")
+                return None
+        rendered = last_tool_result.render(channel)
+        if not rendered:
+            return None
+        logger.info(f"Answered '{prompt}' from the tool-plan cache ({', '.join(name for name, _ in calls)})")
+        return build_agent_response(last_tool_name, rendered, last_tool_result, channel)
+
+    async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any], token: str = None, prompt: str = None, client_id: str = None,
+                            prefetch: Optional[Prefetch] = None) -> Any:
+        if prefetch:
+            prefetched, result = await prefetch.take(tool_name, arguments)
+            if prefetched:
+                logger.info(f"Tool '{tool_name}' answered by prefetch")
+                return result
         logger.info(f"Executing tool '{tool_name}' with args: {arguments}")
         # Inject token and client_id into arguments if available
         if token:
@@ -276,9 +402,14 @@ class Agent:
             logger.error(f"Error executing tool '{tool_name}': {str(e)}")
             return f"Error executing tool {tool_name}: {str(e)}"
 
-    async def _process_openai(self, prompt: str, business_id: int, token: str = None, client_id: str = None) -> Dict[str, Any]:
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    async def _process_openai(self, prompt: str, business_id: int, token: str = None, client_id: str = None, channel: str = CHANNEL_WEB, *, usage: UsageTracker, tools: ToolSelection, plan: ToolPlan, prefetch: Prefetch) -> Dict[str, Any]:
+        if self.provider == "fake":
+            from app.fakes.llm import FakeAsyncOpenAI
+            client = FakeAsyncOpenAI()
+        else:
+            from openai import AsyncOpenAI
+            # Retries happen in UsageTracker.call so they are counted
+            client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         
         system_prompt = (
             "You are a helpful assistant for QTick. "
@@ -297,15 +428,23 @@ class Agent:
         messages = [{"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}]
         
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            tools=TOOLS_DEFINITIONS,
-            tool_choice="auto"
-        )
-        
-        response_message = response.choices[0].message
+        async def choose_tools(selection: ToolSelection):
+            selection.record_call()
+            response = await usage.call(lambda: client.chat.completions.create(
+                model=usage.model,
+                messages=messages,
+                tools=selection.definitions,
+                tool_choice="auto"
+            ))
+            return response.choices[0].message
+
+        response_message = await choose_tools(tools)
         tool_calls = response_message.tool_calls
+        if tool_calls and not tools.is_full and not tools.allows(tc.function.name for tc in tool_calls):
+            # The model wants a tool it was not shown: ask again with every schema
+            logger.info(f"Tool selection fallback: model asked for {[tc.function.name for tc in tool_calls]} outside {tools.names}")
+            response_message = await choose_tools(self.tool_selector.widen(tools))
+            tool_calls = response_message.tool_calls
         
         last_tool_name = "Chat"
         last_tool_result = None
@@ -313,32 +452,23 @@ class Agent:
         if tool_calls:
             logger.info(f"Agent decided to call {len(tool_calls)} tools")
             messages.append(response_message)
+            round_calls, round_failed = [], False
             
             for tool_call in tool_calls:
                 function_name = tool_call.function.name
                 function_args = json.loads(tool_call.function.arguments)
                 
                 logger.info(f"Agent calling tool: {function_name}")
-                raw_result = await self._execute_tool(function_name, function_args, token, prompt, client_id)
+                usage.chose_tool(function_name)
+                round_calls.append((function_name, dict(function_args)))
+                raw_result = await self._execute_tool(function_name, function_args, token, prompt, client_id, prefetch=prefetch)
+                round_failed = round_failed or not isinstance(raw_result, ToolResult)
                 
                 last_tool_name = function_name
                 last_tool_result = raw_result
                 
                 # Convert to JSON for LLM consumption
-                if isinstance(raw_result, ToolResult):
-                    inner_result = raw_result.data
-                    if isinstance(inner_result, list):
-                        json_result = json.dumps([item.dict() for item in inner_result], default=str)
-                    elif hasattr(inner_result, "dict"):
-                        json_result = json.dumps(inner_result.dict(), default=str)
-                    else:
-                        json_result = str(inner_result)
-                elif isinstance(raw_result, list):
-                    json_result = json.dumps([item.dict() for item in raw_result], default=str)
-                elif hasattr(raw_result, "dict"):
-                    json_result = json.dumps(raw_result.dict(), default=str)
-                else:
-                    json_result = str(raw_result)
+                json_result = tool_result_to_json(raw_result)
                 
                 messages.append({
                     "tool_call_id": tool_call.id,
@@ -346,66 +476,56 @@ class Agent:
                     "name": function_name,
                     "content": json_result,
                 })
+            plan.add_round(round_calls, round_failed)
             
-            second_response = await client.chat.completions.create(
-                model="gpt-4o",
+            second_response = await usage.call(lambda: client.chat.completions.create(
+                model=usage.model,
                 messages=messages
-            )
+            ))
             response_text = second_response.choices[0].message.content
         else:
             response_text = response_message.content
 
-        # Prepare response value for API
-        response_value = None
-        response_type = last_tool_name
-        whatsapp_text = ""
-        
-        if last_tool_result:
-            if isinstance(last_tool_result, ToolResult):
-                response_value = last_tool_result.data
-                if hasattr(response_value, "dict"):
-                    response_value = response_value.dict()
-                # Prefer the text from the tool result if it's provided
-                if last_tool_result.text:
-                    response_text = last_tool_result.text
-                
-                # Use the type from the tool result
-                response_type = last_tool_result.type
-                # Capture WhatsApp text
-                if last_tool_result.whatsAppText:
-                    whatsapp_text = last_tool_result.whatsAppText
-            elif isinstance(last_tool_result, list):
-                response_value = [item.dict() for item in last_tool_result]
-            elif hasattr(last_tool_result, "dict"):
-                response_value = last_tool_result.dict()
-            else:
-                response_value = last_tool_result
-
-        return {
-            "type": response_type,
-            "response_text": response_text,
-            "response_value": response_value,
-            "whatsAppText": whatsapp_text if whatsapp_text else response_text
-        }
+        return build_agent_response(last_tool_name, response_text, last_tool_result, channel)
 
-    async def _process_gemini(self, prompt: str, business_id: int, token: str = None, client_id: str = None) -> Dict[str, Any]:
+    async def _process_gemini(self, prompt: str, business_id: int, token: str = None, client_id: str = None, channel: str = CHANNEL_WEB, *, usage: UsageTracker, tools: ToolSelection, plan: ToolPlan, prefetch: Prefetch) -> Dict[str, Any]:
         import google.generativeai as genai
         from google.generativeai.types import FunctionDeclaration, Tool
         from google.ai.generativelanguage import Part, FunctionResponse
         
-        genai.configure(api_key=settings.GEMINI_API_KEY)
+        if self.provider == "fake":
+            from app.fakes.llm import FakeGenerativeModel as GenerativeModel
+        else:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            GenerativeModel = genai.GenerativeModel
         
-        # Map our tool definitions to Gemini's format
-        gemini_tools = []
-        for tool_def in TOOLS_DEFINITIONS:
-            func_def = tool_def["function"]
-            gemini_tool = FunctionDeclaration(
-                name=func_def["name"],
-                description=func_def["description"],
-                parameters=func_def["parameters"]
+        def start_chat(selection: ToolSelection):
+            # Map our tool definitions to Gemini's format
+            gemini_tools = []
+            for tool_def in selection.definitions:
+                func_def = tool_def["function"]
+                gemini_tool = FunctionDeclaration(
+                    name=func_def["name"],
+                    description=func_def["description"],
+                    parameters=func_def["parameters"]
+                )
+                gemini_tools.append(gemini_tool)
+
+            # Create the model with tools (declarations only)
+            model = GenerativeModel(
+                model_name=usage.model,
+                tools=[Tool(function_declarations=gemini_tools)],
+                system_instruction=system_instruction
             )
-            gemini_tools.append(gemini_tool)
-        
+
+            # Disable automatic function calling so we can handle async execution manually
+            return model.start_chat(enable_automatic_function_calling=False)
+
+        async def send(content):
+            # Every Gemini turn carries the model's tool declarations
+            tools.record_call()
+            return await usage.call(lambda: chat.send_message_async(content))
+
         system_instruction = (
             "You are a helpful assistant for QTick. "
             f"CURRENT BUSINESS CONTEXT: ID {business_id}. "
@@ -420,18 +540,16 @@ class Agent:
             "DO NOT guess the Service ID."
         )
 
-        # Create the model with tools (declarations only)
-        model = genai.GenerativeModel(
-            model_name=settings.GEMINI_MODEL,
-            tools=[Tool(function_declarations=gemini_tools)],
-            system_instruction=system_instruction
-        )
-        
-        # Disable automatic function calling so we can handle async execution manually
-        chat = model.start_chat(enable_automatic_function_calling=False)
+        chat = start_chat(tools)
         
         logger.info("Sending prompt to Gemini...")
-        response = await chat.send_message_async(prompt)
+        response = await send(prompt)
+        if not tools.is_full and not tools.allows(fc.name for fc in _gemini_function_calls(response)):
+            # The model wants a tool it was not shown: start over with every declaration
+            logger.info(f"Tool selection fallback: Gemini asked for a tool outside {tools.names}")
+            tools = self.tool_selector.widen(tools)
+            chat = start_chat(tools)
+            response = await send(prompt)
         
         last_tool_name = "Chat"
         last_tool_result = None
@@ -459,35 +577,24 @@ class Agent:
                 
             # Process all function calls in this turn
             responses = []
+            round_calls, round_failed = [], False
             for fc in function_calls:
                 function_name = fc.name
                 function_args = dict(fc.args)
                 
                 logger.info(f"Gemini requested tool call: {function_name}")
+                usage.chose_tool(function_name)
+                round_calls.append((function_name, dict(function_args)))
                 
                 # Execute the tool
-                raw_result = await self._execute_tool(function_name, function_args, token, prompt, client_id)
+                raw_result = await self._execute_tool(function_name, function_args, token, prompt, client_id, prefetch=prefetch)
+                round_failed = round_failed or not isinstance(raw_result, ToolResult)
                 
                 last_tool_name = function_name
                 last_tool_result = raw_result
                 
                 # Convert to dict for LLM consumption
-                if isinstance(raw_result, ToolResult):
-                    inner_result = raw_result.data
-                    if isinstance(inner_result, list):
-                        msg_result = [json.loads(item.json()) if hasattr(item, "json") else item.dict() if hasattr(item, "dict") else item for item in inner_result]
-                    elif hasattr(inner_result, "json"):
-                        msg_result = json.loads(inner_result.json())
-                    elif hasattr(inner_result, "dict"):
-                        msg_result = inner_result.dict()
-                    else:
-                        msg_result = {"result": str(inner_result)}
-                elif isinstance(raw_result, list):
-                    msg_result = [item.dict() if hasattr(item, "dict") else item for item in raw_result]
-                elif hasattr(raw_result, "dict"):
-                    msg_result = raw_result.dict()
-                else:
-                    msg_result = {"result": str(raw_result)}
+                msg_result = tool_result_to_message(raw_result)
                 
                 logger.debug(f"Tool Formatted Result for Gemini: {msg_result}")
                 
@@ -497,50 +604,22 @@ class Agent:
                     response=msg_result if isinstance(msg_result, dict) else {"result": msg_result}
                 )))
             
+            plan.add_round(round_calls, round_failed)
+
             # Send all responses back in one message
             logger.info(f"Sending {len(responses)} tool results back to Gemini")
-            response = await chat.send_message_async(responses)
+            response = await send(responses)
 
         # Final terminal response processing
         response_text = ""
-        response_value = None
-        response_type = last_tool_name
-        whatsapp_text = ""
 
         # Concatenate text from all parts if available
         if response.candidates and response.candidates[0].content.parts:
             text_parts = [p.text for p in response.candidates[0].content.parts if p.text]
             response_text = "\n".join(text_parts).strip()
 
-        # If we have a tool result, prefer its text and data
-        if last_tool_result:
-            if isinstance(last_tool_result, ToolResult):
-                response_value = last_tool_result.data
-                if hasattr(response_value, "dict"):
-                    response_value = response_value.dict()
-                
-                # Prefer the tool result text
-                if last_tool_result.text:
-                    response_text = last_tool_result.text
-                
-                response_type = last_tool_result.type
-                # Capture WhatsApp text
-                if last_tool_result.whatsAppText:
-                    whatsapp_text = last_tool_result.whatsAppText
-            elif isinstance(last_tool_result, list):
-                response_value = [item.dict() if hasattr(item, "dict") else item for item in last_tool_result]
-            elif hasattr(last_tool_result, "dict"):
-                response_value = last_tool_result.dict()
-            else:
-                response_value = last_tool_result
-        
         # Fallback for empty text
         if not response_text:
             response_text = "I've completed your request."
 
-        return {
-            "type": response_type,
-            "response_text": response_text,
-            "response_value": response_value,
-            "whatsAppText": whatsapp_text if whatsapp_text else response_text
-        }
+        return build_agent_response(last_tool_name, response_text, last_tool_result, channel)
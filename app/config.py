@@ -7,15 +7,11 @@ from dotenv import load_dotenv
 BASE_DIR = Path(__file__).resolve().parent.parent
 env_path = BASE_DIR / ".env"
 
-print(f"--- Environment Loading ---")
-print(f"Project Root: {BASE_DIR}")
-print(f"Looking for .env at: {env_path.absolute()}")
-print(f"File exists: {env_path.exists()}")
-
 # In dev, let .env override anything else. Force clear cache for reliability.
 # Note: override=True handles existing env vars in the current shell.
+# Nothing is printed at import time; the resolved configuration is logged once
+# from the FastAPI lifespan (see app.main.startup_event).
 loaded = load_dotenv(dotenv_path=env_path, override=True)
-print(f"load_dotenv result: {loaded}")
 
 def mask_key(k):
     if not k: return "None"
@@ -41,21 +37,116 @@ class Config:
         key_source = "GEMINI_API_KEY (Prod Mode)"
 
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
     
     JAVA_API_BASE_URL = os.getenv("JAVA_API_BASE_URL", "http://localhost:8080/api")
     QTICK_JAVA_SERVICE_TOKEN = os.getenv("QTICK_JAVA_SERVICE_TOKEN")
     QTICK_BIZ_PROFILE_SECRET = os.getenv("QTICK_BIZ_PROFILE_SECRET")
 
-    # Debug logging
-    print(f"--- Configuration Debug ---")
-    print(f"APP_ENV: {APP_ENV}")
-    print(f"LLM_PROVIDER: {LLM_PROVIDER}")
-    print(f"GEMINI_MODEL: {GEMINI_MODEL}")
-    print(f"Selected GEMINI_API_KEY source: {key_source}")
-    print(f"Active GEMINI_API_KEY: {mask_key(GEMINI_API_KEY)}")
-    print(f"JAVA_API_BASE_URL: {JAVA_API_BASE_URL}")
-    print(f"QTICK_JAVA_SERVICE_TOKEN: {mask_key(QTICK_JAVA_SERVICE_TOKEN)}")
-    print(f"---------------------------")
+    # Website chat: answer short questions straight from the knowledge base
+    # (no LLM call) when one chunk beats the runner-up by at least the margin and
+    # either matches MIN_KEYWORDS of the question's keywords or has a keyword in
+    # its heading ("loyalty?" -> "4. Loyalty Program").
+    WEBSITE_EXTRACTIVE_ENABLED = os.getenv("WEBSITE_EXTRACTIVE_ENABLED", "true").lower() == "true"
+    WEBSITE_EXTRACTIVE_MIN_MARGIN = float(os.getenv("WEBSITE_EXTRACTIVE_MIN_MARGIN", "0.5"))
+    WEBSITE_EXTRACTIVE_MIN_KEYWORDS = int(os.getenv("WEBSITE_EXTRACTIVE_MIN_KEYWORDS", "2"))
+    WEBSITE_EXTRACTIVE_MAX_WORDS = int(os.getenv("WEBSITE_EXTRACTIVE_MAX_WORDS", "8"))
+
+    # Website chat history: recent turns are kept verbatim up to this many (estimated)
+    # tokens, older turns are collapsed into a running summary of at most N tokens.
+    WEBSITE_HISTORY_TOKEN_BUDGET = int(os.getenv("WEBSITE_HISTORY_TOKEN_BUDGET", "800"))
+    WEBSITE_HISTORY_SUMMARY_TOKENS = int(os.getenv("WEBSITE_HISTORY_SUMMARY_TOKENS", "200"))
+
+    # Languages dateparser may consider (comma separated). Restricting this skips
+    # dateparser's costly language autodetection.
+    DATEPARSER_LANGUAGES = [lang.strip() for lang in os.getenv("DATEPARSER_LANGUAGES", "en").split(",") if lang.strip()]
+
+    # Phone -> business mapping storage: "json" (data/phone_mappings.json) or "sqlite"
+    MAPPINGS_BACKEND = os.getenv("MAPPINGS_BACKEND", "json").lower()
+    MAPPINGS_DB_PATH = os.getenv("MAPPINGS_DB_PATH", "data/phone_mappings.db")
+    # "code:local_length" pairs so "92701525" and "6592701525" are the same phone;
+    # bare local numbers get the default country code.
+    PHONE_COUNTRY_CODES = os.getenv("PHONE_COUNTRY_CODES", "65:8,91:10")
+    PHONE_DEFAULT_COUNTRY_CODE = os.getenv("PHONE_DEFAULT_COUNTRY_CODE", "65")
+
+    # Startup: pre-import heavy dependencies (dateparser, LLM SDK) in the lifespan
+    # instead of on the first request. See app/startup.py.
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+    # LLM_PROVIDER=fake: scripted replies for offline benchmarking (see app/fakes/llm.py).
+    # FAKE_LLM_STYLE selects which agent loop runs against it: "openai" or "gemini".
+    FAKE_LLM_SCRIPT = os.getenv("FAKE_LLM_SCRIPT", "data/fake_llm_script.json")
+    FAKE_LLM_STYLE = os.getenv("FAKE_LLM_STYLE", "openai").lower()
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    FAKE_LLM_LATENCY_JITTER_MS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", "0"))
+
+    # Upstream cassettes (see app/services/cassette.py): "record" appends sanitized
+    # Java API exchanges to JAVA_CASSETTE_PATH, "replay" serves them instead of the network.
+    JAVA_CASSETTE_MODE = os.getenv("JAVA_CASSETTE_MODE", "").lower()
+    JAVA_CASSETTE_PATH = os.getenv("JAVA_CASSETTE_PATH", "data/cassettes/java_api.jsonl")
+    JAVA_CASSETTE_LATENCY = os.getenv("JAVA_CASSETTE_LATENCY", "original").lower()
+    JAVA_CASSETTE_LATENCY_SCALE = float(os.getenv("JAVA_CASSETTE_LATENCY_SCALE", "1.0"))
+    CASSETTE_MASK_SALT = os.getenv("CASSETTE_MASK_SALT", "qtick-cassette")
+
+    # USE_MOCK_DATA=true: synthetic data generated per business/day from MOCK_SEED
+    # (see app/services/mock_store.py). Volumes are per business and per day.
+    MOCK_SEED = int(os.getenv("MOCK_SEED", "42"))
+    MOCK_LEADS_PER_BUSINESS = int(os.getenv("MOCK_LEADS_PER_BUSINESS", "50"))
+    MOCK_BOOKINGS_PER_DAY = int(os.getenv("MOCK_BOOKINGS_PER_DAY", "10"))
+    MOCK_INVOICES_PER_DAY = int(os.getenv("MOCK_INVOICES_PER_DAY", "8"))
+    MOCK_SERVICES_PER_BUSINESS = int(os.getenv("MOCK_SERVICES_PER_BUSINESS", "30"))
+
+    # Longest WhatsApp text body; list replies are truncated with "...and N more." to fit
+    WHATSAPP_MAX_MESSAGE_CHARS = int(os.getenv("WHATSAPP_MAX_MESSAGE_CHARS", "4096"))
+
+    # Event-loop watchdog (see app/utils/loop_monitor.py): lag percentiles on /metrics,
+    # stacks of callbacks that hold the loop longer than LOOP_MONITOR_BLOCK_MS on /debug/loop
+    LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "false").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+    LOOP_MONITOR_BLOCK_MS = float(os.getenv("LOOP_MONITOR_BLOCK_MS", "100"))
+    LOOP_MONITOR_MAX_OFFENDERS = int(os.getenv("LOOP_MONITOR_MAX_OFFENDERS", "50"))
+
+    # Bounded thread pool for blocking file/CPU work called from async handlers (app/utils/offload.py)
+    OFFLOAD_MAX_WORKERS = int(os.getenv("OFFLOAD_MAX_WORKERS", "8"))
+
+    # /debug/* endpoints need this in the X-Admin-Token header; unset disables them
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Sampling profiler (app/utils/profiler.py): GET /debug/profile captures on demand;
+    # with PROFILE_SLOW_REQUEST_MS > 0 every request is sampled and the profiles of the
+    # last PROFILE_SLOW_REQUEST_KEEP requests slower than that are kept
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "10"))
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))
+    PROFILE_SLOW_REQUEST_KEEP = int(os.getenv("PROFILE_SLOW_REQUEST_KEEP", "20"))
+
+    # tracemalloc stack depth for /debug/memory; 0 leaves tracing off until a baseline is taken
+    MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "0"))
+
+    # LLM accounting (app/utils/llm_usage.py): transient provider errors are retried here,
+    # not in the SDK, so retries show up per call; daily per-business totals go to
+    # LLM_USAGE_DB_PATH (empty disables the table, metrics are always exported)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF_MS = float(os.getenv("LLM_RETRY_BACKOFF_MS", "500"))
+    LLM_USAGE_DB_PATH = os.getenv("LLM_USAGE_DB_PATH", "data/llm_usage.db")
+
+    # Send only the tool schemas a prompt likely needs (app/utils/tool_selection.py);
+    # the last tool of up to TOOL_SELECTION_MAX_SESSIONS sessions is kept for follow-ups
+    TOOL_SELECTION_ENABLED = os.getenv("TOOL_SELECTION_ENABLED", "true").lower() == "true"
+    TOOL_SELECTION_MAX_SESSIONS = int(os.getenv("TOOL_SELECTION_MAX_SESSIONS", "10000"))
+
+    # Tool-plan cache (app/utils/plan_cache.py): repeated read-only prompts replay the model's
+    # earlier tool calls without an LLM call once PLAN_CACHE_MIN_CONFIDENCE is reached
+    PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "true").lower() == "true"
+    PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", "86400"))
+    PLAN_CACHE_MIN_CONFIDENCE = int(os.getenv("PLAN_CACHE_MIN_CONFIDENCE", "2"))
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "5000"))
+
+    # Speculative prefetch for phone chat (app/utils/prefetch.py): likely read tools start
+    # alongside the LLM call and are used if the model picks the same call
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_MAX_PER_REQUEST = int(os.getenv("PREFETCH_MAX_PER_REQUEST", "2"))
+    PREFETCH_MIN_SHARE = float(os.getenv("PREFETCH_MIN_SHARE", "0.5"))
 
 settings = Config()
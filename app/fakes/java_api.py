@@ -0,0 +1,318 @@
+"""
+Local stand-in for the QTick Java API, for load testing the real client stack.
+
+Implements the endpoints JavaService calls with realistic payload shapes,
+deterministic synthetic data, and configurable latency and error injection.
+Run it standalone and point the service at it:
+
+    python -m app.fakes.java_api --port 8081 --latency-ms 80 --error-rate 0.01
+    JAVA_API_BASE_URL=http://localhost:8081/ USE_MOCK_DATA=false uvicorn app.main:app
+
+or mount it in-process with httpx.ASGITransport(app=create_app(...)).
+Every option can also be set through a FAKE_JAVA_<FIELD> environment variable.
+"""
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+JAVA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+
+FIRST_NAMES = ["Aisha", "Ravi", "Mei Ling", "John", "Priya", "Ahmad", "Siti", "Karthik", "Wei", "Nur", "Arjun", "Grace"]
+LAST_NAMES = ["Tan", "Kumar", "Lim", "Wong", "Singh", "Rahman", "Lee", "Ng", "Menon", "Chua"]
+SERVICE_NAMES = [
+    "Gents Cut", "Ladies Cut", "Kids Cut", "Hair Colouring", "Highlights", "Keratin Treatment", "Hair Spa",
+    "Head Massage", "Simple Facial", "Gold Facial", "Anti-Ageing Facial", "Manicure", "Pedicure",
+    "Eyebrow Threading", "Full Arm Waxing", "Bridal Makeup", "Beard Trim", "Scalp Treatment",
+]
+LEAD_STATUSES = ["NEW", "FOLLOWUP", "CONVERTED", "LOST"]
+LEAD_CHANNELS = ["PH", "WA", "WEB", "WALKIN", None]
+BOOKING_STATUSES = ["QU", "BO", "PE"]
+
+
+class FakeJavaSettings(BaseModel):
+    # Latency added to every response: "fixed", "uniform", "lognormal" or "exponential"
+    latency_distribution: str = "lognormal"
+    latency_ms: float = 50.0        # median (lognormal), mean (exponential) or centre (fixed/uniform)
+    latency_spread: float = 0.5     # lognormal sigma, or +/- fraction of latency_ms for uniform
+    # Fraction of requests answered with error_status instead of data
+    error_rate: float = 0.0
+    error_status: int = 500
+    # Dataset sizes, per business
+    leads_per_business: int = 200
+    bookings_per_day: int = 20
+    services_per_business: int = 40
+    offers_per_business: int = 3
+    recent_activities: int = 20
+    seed: int = 42
+    require_auth: bool = True
+
+    @classmethod
+    def from_env(cls, **overrides) -> "FakeJavaSettings":
+        values = {}
+        for name, field in cls.model_fields.items():
+            raw = os.getenv(f"FAKE_JAVA_{name.upper()}")
+            if raw is not None:
+                values[name] = raw.lower() == "true" if field.annotation is bool else raw
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+
+def sample_latency(config: FakeJavaSettings, rng: random.Random) -> float:
+    """Returns one latency sample in seconds."""
+    base = config.latency_ms
+    if base <= 0:
+        return 0.0
+    if config.latency_distribution == "fixed":
+        ms = base
+    elif config.latency_distribution == "uniform":
+        ms = rng.uniform(base * (1 - config.latency_spread), base * (1 + config.latency_spread))
+    elif config.latency_distribution == "exponential":
+        ms = rng.expovariate(1 / base)
+    else:
+        ms = rng.lognormvariate(0, config.latency_spread) * base
+    return max(ms, 0.0) / 1000
+
+
+class FakeDataset:
+    """Deterministic synthetic data, generated lazily per business."""
+
+    def __init__(self, config: FakeJavaSettings):
+        self.config = config
+        self._leads: Dict[int, List[Dict[str, Any]]] = {}
+        self._services: Dict[int, List[Dict[str, Any]]] = {}
+        self._next_enq_no = 900000
+        self._next_booking_id = 700000
+
+    def _rng(self, *key) -> random.Random:
+        # String seeds are hashed with sha512, so the data is stable across processes
+        return random.Random(":".join(str(part) for part in (self.config.seed,) + key))
+
+    def _name(self, rng: random.Random) -> str:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def _phone(self, rng: random.Random) -> str:
+        return f"65{rng.randint(80000000, 99999999)}"
+
+    def leads(self, biz_id: int) -> List[Dict[str, Any]]:
+        if biz_id not in self._leads:
+            rng = self._rng("leads", biz_id)
+            now = datetime(2026, 1, 1)
+            leads = []
+            for i in range(self.config.leads_per_business):
+                value = round(rng.choice([0, 0, 35, 60, 120, 250, 590, 1500]) * rng.uniform(0.8, 1.2), 2)
+                leads.append({
+                    "enqNo": biz_id * 100000 + i,
+                    "bizId": biz_id,
+                    "custName": self._name(rng) if rng.random() > 0.03 else None,
+                    "phone": self._phone(rng) if rng.random() > 0.1 else None,
+                    "email": None if rng.random() < 0.7 else f"customer{i}@example.com",
+                    "status": rng.choice(LEAD_STATUSES),
+                    "srcChannel": rng.choice(LEAD_CHANNELS),
+                    "enqFor": rng.choice(SERVICE_NAMES),
+                    "enquiredOn": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))).strftime(JAVA_DATETIME_FORMAT),
+                    "value": value,
+                    "leadValue": value,
+                })
+            self._leads[biz_id] = leads
+        return self._leads[biz_id]
+
+    def services(self, biz_id: int) -> List[Dict[str, Any]]:
+        if biz_id not in self._services:
+            rng = self._rng("services", biz_id)
+            services = []
+            for i in range(self.config.services_per_business):
+                base_name = SERVICE_NAMES[i % len(SERVICE_NAMES)]
+                tier = i // len(SERVICE_NAMES)
+                services.append({
+                    "id": biz_id * 1000 + i,
+                    "name": base_name if tier == 0 else f"{base_name} - Premium {tier}",
+                    "price": float(rng.choice([15, 25, 35, 60, 90, 120, 250, 590])),
+                    "gender": rng.choice(["M", "F", None]),
+                    "type": "S",
+                })
+            self._services[biz_id] = services
+        return self._services[biz_id]
+
+    def bookings(self, biz_id: int, start: datetime, end: datetime, statuses: List[str]) -> List[Dict[str, Any]]:
+        bookings = []
+        day = start.replace(hour=0, minute=0, second=0)
+        # Long ranges are capped so one request cannot generate unbounded data
+        last_day = min(end, day + timedelta(days=92))
+        services = self.services(biz_id)
+        while day <= last_day:
+            rng = self._rng("bookings", biz_id, day.toordinal())
+            for i in range(self.config.bookings_per_day):
+                status = rng.choice(BOOKING_STATUSES)
+                picked = rng.sample(services, k=min(len(services), rng.randint(1, 3)))
+                booking = {
+                    "bookingId": int(f"{day.strftime('%y%m%d')}{biz_id % 1000:03d}{i:03d}"),
+                    "bkStartTime": (day + timedelta(hours=9, minutes=15 * rng.randint(0, 44))).strftime(JAVA_DATETIME_FORMAT),
+                    "status": status,
+                    "customerInfo": {"name": self._name(rng), "phone": self._phone(rng) if rng.random() > 0.05 else None},
+                    "services": [{"serviceId": s["id"], "serviceName": s["name"], "price": s["price"]} for s in picked],
+                }
+                if not statuses or status in statuses:
+                    bookings.append(booking)
+            day += timedelta(days=1)
+        return bookings
+
+    def summary(self, biz_id: int, from_date: str, to_date: str) -> Dict[str, Any]:
+        rng = self._rng("summary", biz_id, from_date, to_date)
+        bookings = rng.randint(0, self.config.bookings_per_day * 7)
+        return {
+            "bizId": biz_id,
+            "leadsCount": rng.randint(0, self.config.leads_per_business),
+            "appointmentsCount": bookings,
+            "billsCount": rng.randint(0, bookings),
+            "totalRevenue": round(rng.uniform(0, 5000) * max(bookings, 1) / 10, 2),
+            "recentActivities": [
+                f"{self._name(rng)} booked {rng.choice(SERVICE_NAMES)}" for _ in range(self.config.recent_activities)
+            ],
+        }
+
+    def offers(self, biz_id: int) -> List[Dict[str, Any]]:
+        rng = self._rng("offers", biz_id)
+        offers = []
+        for i in range(self.config.offers_per_business):
+            campaigns = {"WS": f"https://qa.qtick.biz/biz-{biz_id}?cb={rng.randint(100, 999)}"}
+            if rng.random() > 0.3:
+                campaigns["BP"] = f"https://qa.qtick.biz/biz-{biz_id}?cb={rng.randint(100, 999)}"
+            offers.append({
+                "title": f"{rng.choice(SERVICE_NAMES)} {rng.choice(['Special', 'Bonanza', 'Combo'])}",
+                "image": "",
+                "startDate": "2026-01-01T00:00:00.000+0000",
+                "endDate": "2026-12-31T23:59:00.000+0000",
+                "pubStatus": "U",
+                "details": f"Get {rng.choice([10, 15, 20, 30])}% off this month.",
+                "detailFormat": "P",
+                "buttonHeader": "Grab the offer",
+                "serviceId": 0,
+                "activeCampaigns": campaigns,
+            })
+        return offers
+
+    def create_lead(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_enq_no += 1
+        value = 0.0
+        return {
+            "enqNo": self._next_enq_no,
+            "bizId": payload.get("bizId"),
+            "status": "NEW",
+            "custName": payload.get("custName"),
+            "phone": payload.get("phone"),
+            "enqFor": payload.get("enqFor"),
+            "value": value,
+            "leadValue": value,
+        }
+
+    def create_booking(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_booking_id += 1
+        biz_id = int(payload.get("bizId") or 0)
+        by_id = {s["id"]: s["name"] for s in self.services(biz_id)}
+        when = str(payload.get("dateTime") or "")
+        return {
+            "bookingId": self._next_booking_id,
+            "date": when[:10],
+            "time": when[11:16],
+            "custName": self._name(self._rng("customer", payload.get("phone"))),
+            "bizInfo": {"id": biz_id, "name": f"Fake Salon #{biz_id}"},
+            "services": [by_id.get(int(sid), f"Service {sid}") for sid in payload.get("serviceIds") or []],
+        }
+
+
+def _parse_java_date(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.now()
+    return datetime.strptime(value.split(" ")[0].replace("-", "/"), "%Y/%m/%d")
+
+
+def create_app(config: FakeJavaSettings = None) -> FastAPI:
+    config = config or FakeJavaSettings.from_env()
+    dataset = FakeDataset(config)
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake QTick Java API")
+    app.state.config = config
+    app.state.dataset = dataset
+
+    @app.middleware("http")
+    async def inject_latency_and_errors(request: Request, call_next):
+        await asyncio.sleep(sample_latency(config, rng))
+        if config.require_auth and not request.headers.get("authorization"):
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse({"message": "Injected upstream failure"}, status_code=config.error_status)
+        return await call_next(request)
+
+    @app.get("/api/biz/my-queues")
+    async def my_queues(request: Request):
+        phone = request.headers.get("x-clientid", "")
+        if not phone:
+            return []
+        biz_id = int(phone[-4:]) % 500 + 1 if phone[-4:].isdigit() else 1
+        return [{"bizId": biz_id, "operId": 26013001, "name": f"Fake Salon #{biz_id}"}]
+
+    @app.get("/api/biz/{biz_id}/summary")
+    async def summary(biz_id: int, fromDate: str = "", toDate: str = ""):
+        return dataset.summary(biz_id, fromDate, toDate)
+
+    @app.post("/api/biz/sales-enq")
+    async def create_lead(request: Request):
+        return dataset.create_lead(await request.json())
+
+    @app.get("/api/biz/{biz_id}/sales-enq/list")
+    async def list_leads(biz_id: int):
+        return dataset.leads(biz_id)
+
+    @app.get("/api/biz/{biz_id}/bookings/")
+    async def list_bookings(biz_id: int, startDate: str = "", endDate: str = "", status: str = ""):
+        statuses = [s for s in status.split(",") if s]
+        return dataset.bookings(biz_id, _parse_java_date(startDate), _parse_java_date(endDate), statuses)
+
+    @app.get("/api/biz/{biz_id}/offers")
+    async def list_offers(biz_id: int):
+        return dataset.offers(biz_id)
+
+    @app.get("/web/biz/services")
+    async def search_services(bizId: int, text: str = "", groupId: int = 0):
+        needle = text.lower()
+        return [s for s in dataset.services(bizId) if needle in s["name"].lower()]
+
+    @app.post("/web/v2/booking")
+    async def create_booking(request: Request):
+        payload = await request.json()
+        if not payload.get("serviceIds"):
+            return JSONResponse({"message": "At least one service is required"}, status_code=400)
+        return dataset.create_booking(payload)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake QTick Java API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "lognormal", "exponential"])
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-spread", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--error-status", type=int)
+    parser.add_argument("--leads-per-business", type=int)
+    parser.add_argument("--bookings-per-day", type=int)
+    parser.add_argument("--services-per-business", type=int)
+    parser.add_argument("--seed", type=int)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    import uvicorn
+    uvicorn.run(create_app(FakeJavaSettings.from_env(**args)), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
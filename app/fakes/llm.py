@@ -0,0 +1,225 @@
+"""
+Deterministic stand-in for the OpenAI and Gemini SDKs (LLM_PROVIDER=fake).
+
+Replies come from a script file (FAKE_LLM_SCRIPT, default
+data/fake_llm_script.json) instead of a model, so the agent loop (tool
+dispatch, serialization, formatting) can be measured offline and repeatably.
+The script is a list of rules; the first rule whose "match" regex finds the
+user prompt (case-insensitive) supplies the turns:
+
+    {"match": "\\bleads\\b", "steps": [
+        {"tool_calls": [{"name": "list_leads", "arguments": {"business_id": "{business_id}"}}]},
+        {"text": "Here are your leads."}
+    ]}
+
+String arguments are formatted with the rule's named groups, the prompt and
+the business ID from the system prompt; arguments that format to "" are
+dropped, and "{business_id}" on its own becomes an int. FAKE_LLM_STYLE picks
+which Agent loop runs (openai or gemini); both get SDK-shaped responses.
+"""
+import asyncio
+import json
+import random
+import re
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.history import estimate_tokens
+
+_BUSINESS_ID_RE = re.compile(r"CURRENT BUSINESS CONTEXT: ID (\d+)")
+
+
+class _TemplateContext(dict):
+    # Placeholders for groups the rule did not capture format to ""
+    def __missing__(self, key):
+        return ""
+
+
+class FakeLLM:
+    """Script matching, latency and call counters shared by both SDK shims."""
+
+    def __init__(self, script: Dict[str, Any], latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.rules = [(re.compile(rule["match"], re.IGNORECASE), rule["steps"]) for rule in script.get("rules", [])]
+        self.default_steps = script.get("default", {}).get("steps") or [{"text": ""}]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "FakeLLM":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    async def wait(self):
+        self.calls += 1
+        delay_ms = self.latency_ms
+        if self.jitter_ms:
+            delay_ms += self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def step(self, prompt: str, system_prompt: Optional[str], turn: int) -> Dict[str, Any]:
+        """Returns the scripted step for this turn: {"tool_calls": [...]} or {"text": ...}."""
+        steps, groups = self.default_steps, {}
+        for pattern, rule_steps in self.rules:
+            match = pattern.search(prompt.strip())
+            if match:
+                steps, groups = rule_steps, match.groupdict()
+                break
+        step = steps[min(turn, len(steps) - 1)]
+        if turn >= len(steps) and "tool_calls" in step:
+            # Never loop on tool calls once the script has run out
+            return {"text": ""}
+
+        business_id = ""
+        if system_prompt:
+            found = _BUSINESS_ID_RE.search(system_prompt)
+            business_id = found.group(1) if found else ""
+        context = _TemplateContext(prompt=prompt, business_id=business_id)
+        context.update({k: (v or "").strip() for k, v in groups.items()})
+
+        if "tool_calls" not in step:
+            return {"text": step.get("text", "").format_map(context)}
+        return {"tool_calls": [
+            {"name": call["name"], "arguments": _format_arguments(call.get("arguments", {}), context)}
+            for call in step["tool_calls"]
+        ]}
+
+
+def _format_arguments(arguments: Dict[str, Any], context: Dict[str, str]) -> Dict[str, Any]:
+    formatted = {}
+    for key, value in arguments.items():
+        if isinstance(value, str):
+            if value == "{business_id}" and context["business_id"].isdigit():
+                value = int(context["business_id"])
+            else:
+                value = value.format_map(context)
+                if value == "":
+                    continue
+        formatted[key] = value
+    return formatted
+
+
+_fake_llm: Optional[FakeLLM] = None
+
+
+def get_fake_llm() -> FakeLLM:
+    """Process-wide FakeLLM built from settings; the script is read once."""
+    global _fake_llm
+    if _fake_llm is None:
+        _fake_llm = FakeLLM.from_file(
+            settings.FAKE_LLM_SCRIPT,
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            jitter_ms=settings.FAKE_LLM_LATENCY_JITTER_MS,
+        )
+    return _fake_llm
+
+
+# --- OpenAI-style client ---------------------------------------------------
+
+class _Completions:
+    def __init__(self, llm: FakeLLM):
+        self._llm = llm
+
+    async def create(self, model: str = None, messages: List[Any] = None, tools=None, tool_choice=None, **kwargs):
+        await self._llm.wait()
+        messages = messages or []
+        system_prompt = next((m["content"] for m in messages if isinstance(m, dict) and m.get("role") == "system"), None)
+        prompt = next((m["content"] for m in reversed(messages) if isinstance(m, dict) and m.get("role") == "user"), "")
+        # Each assistant tool-call message in the history is one completed turn
+        turn = sum(1 for m in messages if not isinstance(m, dict) and getattr(m, "tool_calls", None))
+        step = self._llm.step(prompt, system_prompt, turn)
+        if not tools and step.get("tool_calls"):
+            # Called without tools (e.g. website chat): skip straight to the script's final reply
+            step = self._llm.step(prompt, system_prompt, turn=sys.maxsize)
+
+        tool_calls = None
+        if tools and step.get("tool_calls"):
+            tool_calls = [
+                SimpleNamespace(
+                    id=f"call_{self._llm.calls}_{i}",
+                    type="function",
+                    function=SimpleNamespace(name=call["name"], arguments=json.dumps(call["arguments"])),
+                )
+                for i, call in enumerate(step["tool_calls"])
+            ]
+        content = None if tool_calls else step.get("text", "")
+        message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages if isinstance(m, dict))
+        completion_tokens = estimate_tokens(content or json.dumps(step.get("tool_calls")))
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="tool_calls" if tool_calls else "stop")],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+class FakeAsyncOpenAI:
+    """Drop-in for openai.AsyncOpenAI covering chat.completions.create."""
+
+    def __init__(self, llm: FakeLLM = None, **kwargs):
+        self.chat = SimpleNamespace(completions=_Completions(llm or get_fake_llm()))
+
+
+# --- Gemini-style model ----------------------------------------------------
+
+class FakeChatSession:
+    def __init__(self, llm: FakeLLM, system_instruction: Optional[str], history: Optional[list], has_tools: bool):
+        self._llm = llm
+        self._system_instruction = system_instruction
+        self._has_tools = has_tools
+        self._prompt = ""
+        self._turn = 0
+        self.history = list(history or [])
+
+    async def send_message_async(self, content):
+        await self._llm.wait()
+        if isinstance(content, str):
+            # A new user message starts a new scripted exchange
+            self._prompt = content
+            self._turn = 0
+        else:
+            # A list of function responses answers the previous turn's tool calls
+            self._turn += 1
+        step = self._llm.step(self._prompt, self._system_instruction, self._turn)
+        if not self._has_tools and step.get("tool_calls"):
+            step = self._llm.step(self._prompt, self._system_instruction, turn=sys.maxsize)
+
+        if step.get("tool_calls"):
+            parts = [
+                SimpleNamespace(text="", function_call=SimpleNamespace(name=call["name"], args=call["arguments"]))
+                for call in step["tool_calls"]
+            ]
+        else:
+            parts = [SimpleNamespace(text=step.get("text", ""), function_call=None)]
+        prompt_tokens = estimate_tokens((self._system_instruction or "") + self._prompt)
+        completion_tokens = estimate_tokens(step.get("text") or json.dumps(step.get("tool_calls")))
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(role="model", parts=parts))],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                total_token_count=prompt_tokens + completion_tokens,
+            ),
+            text=step.get("text", ""),
+        )
+
+
+class FakeGenerativeModel:
+    """Drop-in for google.generativeai.GenerativeModel covering start_chat/send_message_async."""
+
+    def __init__(self, model_name: str = None, tools=None, system_instruction: str = None, llm: FakeLLM = None, **kwargs):
+        self.model_name = model_name
+        self._system_instruction = system_instruction
+        self._has_tools = bool(tools)
+        self._llm = llm or get_fake_llm()
+
+    def start_chat(self, history: Optional[list] = None, enable_automatic_function_calling: bool = False):
+        return FakeChatSession(self._llm, self._system_instruction, history, self._has_tools)
@@ -1,5 +1,8 @@
 import sys
 import io
+import asyncio
+import codecs
+import hmac
 
 # Force UTF-8 encoding for stdout and stderr to handle emojis on Windows terminals
 if sys.stdout.encoding != 'utf-8':
@@ -7,16 +10,28 @@ if sys.stdout.encoding != 'utf-8':
 if sys.stderr.encoding != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Any, Optional
+from typing import Any, List, Optional
 from fastapi import Header
 from app.agent import Agent
+from app.config import settings
+from app.models import CHANNEL_WHATSAPP
+from app.utils.loop_monitor import loop_report, stop_loop_monitor
+from app.utils.diagnostics import memory_report, take_baseline
+from app.utils.http import close_http_client, get_http_client
+from app.utils.llm_usage import RouteContextMiddleware, get_usage_store
+from app.utils.metrics import REGISTRY
+from app.utils.offload import iterate_from_loop, run_blocking, shutdown_executor
+from app.utils.profiler import PROFILE_MODES, SlowRequestMiddleware, get_slow_request_profiler, profile
+from app.utils.serialization import FastJSONResponse
 from app.website_agent import WebsiteAgent
 import logging
 import sys
-from app.utils.mappings import get_business_id_by_phone, add_mapping
+from app.utils.mappings import get_business_id_by_phone, add_mapping, import_mappings
 
 # Configure logging
 logging.basicConfig(
@@ -25,21 +40,12 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 
-app = FastAPI(title="QTick MCP Service")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.on_event("startup")
 async def startup_event():
-    from app.config import settings
+    from app.config import settings, loaded, env_path
     logging.info("Starting QTick MCP Service...")
+    logging.info(f"Environment file: {env_path} (loaded: {loaded})")
     logging.info(f"Configuration:")
+    logging.info(f"  APP_ENV: {settings.APP_ENV}")
     logging.info(f"  USE_MOCK_DATA: {settings.USE_MOCK_DATA}")
     logging.info(f"  LLM_PROVIDER: {settings.LLM_PROVIDER}")
     logging.info(f"  JAVA_API_BASE_URL: {settings.JAVA_API_BASE_URL}")
@@ -53,7 +59,7 @@ async def startup_event():
         
     gemini_key = settings.GEMINI_API_KEY
     if gemini_key:
-        logging.info(f"  GEMINI_API_KEY: {gemini_key[:4]}...{gemini_key[-4:]}")
+        logging.info(f"  GEMINI_API_KEY: {gemini_key[:4]}...{gemini_key[-4:]} (source: {settings.key_source})")
     else:
         logging.info(f"  GEMINI_API_KEY: Not set")
 
@@ -68,6 +74,48 @@ async def startup_event():
     import os
     logging.info(f"  JAVA_SERVICE_FILE: {os.path.abspath(JavaService.__init__.__code__.co_filename)}")
 
+    # Deliberate warm-up: heavy imports happen here, not at import time or on the first request
+    if settings.STARTUP_WARMUP:
+        from app.startup import warm_up
+        warm_up()
+
+    if settings.LOOP_MONITOR_ENABLED:
+        from app.utils.loop_monitor import start_loop_monitor
+        start_loop_monitor()
+
+    if settings.PROFILE_SLOW_REQUEST_MS > 0:
+        get_slow_request_profiler().start()
+
+    if settings.MEMORY_TRACEMALLOC_FRAMES > 0:
+        from app.utils.diagnostics import start_tracing
+        start_tracing()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_event()
+    yield
+    await stop_loop_monitor()
+    if settings.PROFILE_SLOW_REQUEST_MS > 0:
+        get_slow_request_profiler().stop()
+    await close_http_client()
+    shutdown_executor(wait=False)
+
+app = FastAPI(title="QTick MCP Service", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Tags LLM usage with the route that caused it
+app.add_middleware(RouteContextMiddleware)
+
+if settings.PROFILE_SLOW_REQUEST_MS > 0:
+    app.add_middleware(SlowRequestMiddleware, profiler=get_slow_request_profiler())
+
 agent = Agent()
 website_agent = WebsiteAgent()
 
@@ -85,6 +133,7 @@ class ChatResponse(BaseModel):
 class WebsiteChatRequest(BaseModel):
     message: str
     history: list = []
+    conversation_id: Optional[str] = None
 
 class WebsiteChatResponse(BaseModel):
     response_text: str
@@ -97,12 +146,34 @@ class BusinessRegisterRequest(BaseModel):
     phone: str
     business_id: int
 
+class BulkImportError(BaseModel):
+    line: int
+    reason: str
+
+class BulkImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    errors: List[BulkImportError] = []
+
 class PhoneChatRequest(BaseModel):
     phone: str
     prompt: str
 
 
 
+def chat_response(prompt: str, agent_response: dict) -> FastJSONResponse:
+    """
+    ChatResponse body, rendered straight from the agent reply: response_value is
+    already the tool payload dumped for the LLM, so it is not validated or dumped again.
+    """
+    return FastJSONResponse({
+        "prompt": prompt,
+        "type": agent_response.get("type", "Chat"),
+        "response_text": agent_response.get("response_text", ""),
+        "response_value": agent_response.get("response_value"),
+        "whatsAppText": agent_response.get("whatsAppText", ""),
+    })
+
 @app.post("/agent/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest, authorization: Optional[str] = Header(None)):
     token = None
@@ -114,13 +185,7 @@ async def chat(request: ChatRequest, authorization: Optional[str] = Header(None)
 
     try:
         agent_response = await agent.process_prompt(request.prompt, request.business_id, token)
-        return ChatResponse(
-            prompt=request.prompt,
-            type=agent_response.get("type", "Chat"),
-            response_text=agent_response.get("response_text", ""),
-            response_value=agent_response.get("response_value"),
-            whatsAppText=agent_response.get("whatsAppText", "")
-        )
+        return chat_response(request.prompt, agent_response)
     except Exception as e:
         logging.error(f"Error processing request: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -144,14 +209,8 @@ async def phone_chat(request: PhoneChatRequest):
 
     try:
         # Agent processing (no user token passed, agent uses system token if needed)
-        agent_response = await agent.process_prompt(request.prompt, business_id, None, request.phone)
-        return ChatResponse(
-            prompt=request.prompt,
-            type=agent_response.get("type", "Chat"),
-            response_text=agent_response.get("response_text", ""),
-            response_value=agent_response.get("response_value"),
-            whatsAppText=agent_response.get("whatsAppText", "")
-        )
+        agent_response = await agent.process_prompt(request.prompt, business_id, None, request.phone, channel=CHANNEL_WHATSAPP)
+        return chat_response(request.prompt, agent_response)
     except Exception as e:
         logging.error(f"Error processing phone chat: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -163,7 +222,7 @@ async def website_chat(request: WebsiteChatRequest, authorization: Optional[str]
         token = authorization.split(" ")[1]
 
     try:
-        response = await website_agent.process_message(request.message, request.history, token)
+        response = await website_agent.process_message(request.message, request.history, token, request.conversation_id)
         return WebsiteChatResponse(
             response_text=response.get("response_text", ""),
             action=response.get("action")
@@ -174,7 +233,8 @@ async def website_chat(request: WebsiteChatRequest, authorization: Optional[str]
 
 @app.post("/business/lookup", response_model=int)
 async def business_lookup(request: BusinessLookupRequest):
-    business_id = get_business_id_by_phone(request.phone)
+    # The mapping store reads files / SQLite, so it runs on the offload pool
+    business_id = await run_blocking(get_business_id_by_phone, request.phone)
     if business_id:
         return business_id
     else:
@@ -182,20 +242,145 @@ async def business_lookup(request: BusinessLookupRequest):
 
 @app.post("/business/register")
 async def business_register(request: BusinessRegisterRequest):
-    success = add_mapping(request.phone, request.business_id)
+    success = await run_blocking(add_mapping, request.phone, request.business_id)
     if success:
         return {"message": "Mapping registered successfully", "phone": request.phone, "business_id": request.business_id}
     else:
         raise HTTPException(status_code=400, detail=f"Business ID {request.business_id} is already assigned to another phone number")
 
+# Content types accepted by /business/register/bulk
+BULK_IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+}
+# Only the first errors are returned; the counts cover every row
+MAX_REPORTED_IMPORT_ERRORS = 100
+# Lines handed from the upload stream to the import thread at a time
+BULK_IMPORT_BATCH_LINES = 5000
+
+async def _stream_lines(request: Request):
+    """Yields decoded lines from the request body as it arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r") + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+async def _stream_line_batches(request: Request, size: int):
+    batch = []
+    async for line in _stream_lines(request):
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@app.post("/business/register/bulk", response_model=BulkImportResponse)
+async def business_register_bulk(request: Request, format: Optional[str] = None):
+    """
+    Registers many phone -> business mappings in one transaction. Rows are
+    imported as the body arrives; if the upload fails midway, nothing is registered.
+    Other registrations wait for the upload to finish.
+    Body is CSV (header `phone,business_id`) or JSONL; the format comes from the
+    `format` query parameter or the Content-Type header.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or BULK_IMPORT_FORMATS.get(content_type)
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson (or pass ?format=csv|jsonl)")
+
+    # The import thread pulls batches from the stream, inside its single store write
+    lines = iterate_from_loop(_stream_line_batches(request, BULK_IMPORT_BATCH_LINES), asyncio.get_running_loop())
+    imported, rejected = await run_blocking(import_mappings, lines, fmt)
+    logging.info(f"Bulk mapping import ({fmt}): {imported} imported, {len(rejected)} rejected")
+
+    return BulkImportResponse(
+        imported=imported,
+        rejected=len(rejected),
+        errors=[BulkImportError(line=line, reason=reason) for line, reason in rejected[:MAX_REPORTED_IMPORT_ERRORS]]
+    )
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of the in-process metrics (app/utils/metrics.py)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guards the diagnostic endpoints: X-Admin-Token must match ADMIN_TOKEN (unset disables them)."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/debug/loop", dependencies=[Depends(require_admin)])
+async def debug_loop():
+    """Event-loop lag percentiles and the calls caught blocking it (LOOP_MONITOR_ENABLED=true)."""
+    return loop_report()
+
+@app.get("/debug/profile", dependencies=[Depends(require_admin)])
+async def debug_profile(seconds: float = 5.0, interval_ms: Optional[float] = None, mode: str = "wall", format: str = "collapsed"):
+    """
+    Samples the worker for `seconds` and returns collapsed stacks (flamegraph.pl / speedscope input).
+    mode=wall follows each task's await chain (where requests wait), mode=cpu each thread's stack.
+    """
+    if not 0 < seconds <= settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {settings.PROFILE_MAX_SECONDS:g}")
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    try:
+        result = await profile(seconds, interval_ms, mode)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "json":
+        return result
+    return PlainTextResponse(result["collapsed"])
+
+@app.get("/debug/profile/slow", dependencies=[Depends(require_admin)])
+async def debug_slow_requests():
+    """Profiles of the most recent requests slower than PROFILE_SLOW_REQUEST_MS, newest first."""
+    if settings.PROFILE_SLOW_REQUEST_MS <= 0:
+        return {"enabled": False, "threshold_ms": 0, "requests": []}
+    profiler = get_slow_request_profiler()
+    return {"enabled": True, "threshold_ms": profiler.threshold_ms, "requests": profiler.slow_requests()}
+
+@app.get("/debug/memory", dependencies=[Depends(require_admin)])
+async def debug_memory(limit: int = 20, scan: bool = False):
+    """
+    RSS, open fds/sockets, live client/service counts, pool occupancy and tracemalloc
+    top allocators (plus growth since the baseline). scan=true also counts every
+    AsyncClient/JavaService on the heap, tracked or not (walks the whole heap).
+    """
+    return await run_blocking(memory_report, limit, scan)
+
+@app.post("/debug/memory/baseline", dependencies=[Depends(require_admin)])
+async def debug_memory_baseline():
+    """Starts tracemalloc if needed and takes the snapshot /debug/memory diffs against."""
+    return await run_blocking(take_baseline)
+
+@app.get("/debug/usage", dependencies=[Depends(require_admin)])
+async def debug_usage(day: Optional[str] = None, business_id: Optional[str] = None):
+    """LLM calls, tokens, latency and retries per business for a day (default today), heaviest first."""
+    store = get_usage_store()
+    if store is None:
+        return {"enabled": False, "rows": []}
+    return {"enabled": True, "rows": await run_blocking(store.daily, day, business_id)}
+
 @app.get("/debug/ip")
 async def debug_ip():
-    import httpx
-    r = httpx.get("https://ipinfo.io/json", timeout=5)
+    r = await get_http_client().get("https://ipinfo.io/json", timeout=5)
     return r.json()
 
 if __name__ == "__main__":
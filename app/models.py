@@ -1,11 +1,64 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any, Dict
+from pydantic import BaseModel, PrivateAttr, computed_field, field_serializer
+from typing import List, Optional, Any, Dict, Callable, Union
+from app.utils.serialization import to_jsonable
+
+# Reply channels: web/app chat shows `text`, phone (WhatsApp) chat shows `whatsAppText`
+CHANNEL_WEB = "web"
+CHANNEL_WHATSAPP = "whatsapp"
+
+Rendering = Union[str, Callable[[], str]]
 
 class ToolResult(BaseModel):
+    """
+    Result of a tool call. text and whatsAppText may be given as zero-argument
+    callables; they are rendered on first access and cached, so a request only
+    pays for the channel it replies on. Serializing the model (model_dump, or
+    MCP replies) renders both.
+    """
     type: str
     data: Any
-    text: str
-    whatsAppText: str = ""
+    _text: Rendering = PrivateAttr(default="")
+    _whatsapp_text: Rendering = PrivateAttr(default="")
+    _payload: Any = PrivateAttr(default=None)
+    _dumped: bool = PrivateAttr(default=False)
+
+    def __init__(self, text: Rendering = "", whatsAppText: Rendering = "", **data):
+        super().__init__(**data)
+        self._text = text
+        self._whatsapp_text = whatsAppText
+
+    @computed_field
+    @property
+    def text(self) -> str:
+        if callable(self._text):
+            self._text = self._text()
+        return self._text
+
+    @computed_field
+    @property
+    def whatsAppText(self) -> str:
+        if callable(self._whatsapp_text):
+            self._whatsapp_text = self._whatsapp_text()
+        return self._whatsapp_text
+
+    @property
+    def payload(self) -> Any:
+        """data as JSON-compatible values, dumped once and shared by the LLM message and the API reply."""
+        if not self._dumped:
+            self._payload = to_jsonable(self.data)
+            self._dumped = True
+        return self._payload
+
+    @field_serializer("data")
+    def _serialize_data(self, data: Any) -> Any:
+        # Columnar result sets are not pydantic types; serialize the shared payload instead
+        return self.payload
+
+    def render(self, channel: str) -> str:
+        # Tools without a WhatsApp format reply with their plain text there too
+        if channel == CHANNEL_WHATSAPP:
+            return self.whatsAppText or self.text
+        return self.text
 from datetime import datetime
 
 class Lead(BaseModel):
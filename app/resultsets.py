@@ -0,0 +1,133 @@
+"""
+Columnar result sets for large upstream lists.
+
+JavaService returns lead and appointment lists as result sets that keep one
+array per field instead of one pydantic model per row: numeric fields in
+array('d'), low-cardinality strings (status, source) interned so every row
+shares one object. They behave as read-only sequences of the usual models,
+materialised (without re-validation) only for the rows that are actually
+indexed or iterated, e.g. when a table is rendered.
+
+Aggregates run over the columns directly: column_sum, top_n (heapq partial
+selection, no full sort) and count_by (counts over the interned status
+column). They also accept plain lists of models, so tools call them the same
+way whichever service produced the data.
+"""
+import heapq
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, Iterable, List, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.models import AppointmentSummary, LeadSummary
+
+
+class ColumnarResultSet(Sequence):
+    model: ClassVar[Type[BaseModel]]
+    numeric: ClassVar[Tuple[str, ...]] = ()
+    interned: ClassVar[Tuple[str, ...]] = ()
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, **columns: Iterable[Any]):
+        fields = tuple(self.model.model_fields)
+        if set(columns) != set(fields):
+            raise ValueError(f"{type(self).__name__} needs columns {fields}, got {tuple(columns)}")
+        self._columns: Dict[str, Sequence] = {}
+        for name in fields:
+            values = columns[name]
+            if name in self.numeric:
+                values = array("d", values)
+            elif name in self.interned:
+                values = [sys.intern(v) if isinstance(v, str) else v for v in values]
+            else:
+                values = list(values)
+            self._columns[name] = values
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"{type(self).__name__} columns differ in length: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+
+    def column(self, name: str) -> Sequence:
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _row(self, index: int) -> BaseModel:
+        # Values were decoded when the columns were built; skip validation
+        return self.model.model_construct(**{name: values[index] for name, values in self._columns.items()})
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._row(index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self._row(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ColumnarResultSet):
+            return self.model is other.model and self._columns == other._columns
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Rows as plain dicts, the same as model_dump(mode="json") per row, without building models."""
+        names = tuple(self._columns)
+        return [dict(zip(names, values)) for values in zip(*self._columns.values())]
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} rows={self._length}>"
+
+
+class LeadResultSet(ColumnarResultSet):
+    model = LeadSummary
+    numeric = ("value", "leadValue")
+    interned = ("status", "source")
+    __slots__ = ()
+
+
+class AppointmentResultSet(ColumnarResultSet):
+    model = AppointmentSummary
+    interned = ("status",)
+    __slots__ = ()
+
+
+def column(rows: Sequence, field: str) -> Sequence:
+    """One field of every row."""
+    if isinstance(rows, ColumnarResultSet):
+        return rows.column(field)
+    return [getattr(row, field) for row in rows]
+
+
+def column_sum(rows: Sequence, field: str) -> float:
+    if isinstance(rows, ColumnarResultSet):
+        return sum(rows.column(field))
+    return sum(map(attrgetter(field), rows))
+
+
+def top_n(rows: Sequence, n: int, field: str) -> List[BaseModel]:
+    """The n rows with the largest `field`, largest first; ties keep list order (as a stable sort would)."""
+    if not isinstance(rows, ColumnarResultSet):
+        return heapq.nlargest(n, rows, key=attrgetter(field))
+    values = rows.column(field)
+    # Select on the column, then materialise only the winning rows
+    return [rows[i] for i in heapq.nlargest(n, range(len(values)), key=values.__getitem__)]
+
+
+def count_by(rows: Sequence, field: str) -> Counter:
+    """Rows per distinct value of `field`, counted over the column without building rows."""
+    return Counter(column(rows, field))
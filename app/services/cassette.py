@@ -0,0 +1,233 @@
+"""
+Record/replay of upstream Java API traffic ("cassettes").
+
+Recording wraps the real transport and appends every exchange to a JSONL
+cassette with secrets dropped and PII pseudonymized. Replaying serves those
+responses with their original timings (or none), so perf and correctness
+runs get production-shaped data without network access.
+
+Enable through settings (see app/config.py):
+
+    JAVA_CASSETTE_MODE=record JAVA_CASSETTE_PATH=data/cassettes/prod.jsonl
+    JAVA_CASSETTE_MODE=replay JAVA_CASSETTE_LATENCY=zero
+
+Masking is deterministic (HMAC with CASSETTE_MASK_SALT): the same phone
+always becomes the same fake phone, so lookups keyed on it still line up on
+replay, and masked values keep their original length and shape.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values are personal data wherever they appear
+PII_KEYS = frozenset({"custName", "customerName", "customer_name", "phone", "mobile", "email", "contactNo"})
+# Objects describing a person: every string inside is masked (e.g. customerInfo.name)
+PII_CONTAINERS = frozenset({"customerInfo", "customer"})
+# Keys whose values are credentials; never written to a cassette
+SECRET_KEYS = frozenset({"token", "accessToken", "secret", "password", "apiKey", "api_key", "authorization"})
+# Request headers that take part in replay matching (masked); everything else is dropped
+MATCH_HEADERS = ("x-clientid",)
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"\+?\d{8,15}")
+_RESPONSE_HEADERS = ("content-type",)
+# Placeholder values the API uses for missing data; not personal, left as-is
+_PLACEHOLDERS = frozenset({"N/A", "NA", "Unknown", "-"})
+
+
+class CassetteMiss(Exception):
+    """Raised on replay when no recorded interaction matches the request."""
+
+
+def _digest(value: str) -> bytes:
+    return hmac.new(settings.CASSETTE_MASK_SALT.encode(), value.encode("utf-8"), hashlib.sha256).digest()
+
+
+def mask_phone(value: str) -> str:
+    # Keep the country code and length so canonical_phone still treats it as a phone
+    digits = "".join(str(b % 10) for b in _digest(value))
+    prefix = value[:3] if value.startswith("+") else value[:2]
+    return prefix + digits[: max(len(value) - len(prefix), 0)]
+
+
+def mask_email(value: str) -> str:
+    return f"user-{_digest(value).hex()[:10]}@example.com"
+
+
+def mask_text(value: str) -> str:
+    words = value.split(" ")
+    return " ".join(f"X{_digest(word).hex()}"[: max(len(word), 1)].capitalize() for word in words)
+
+
+def _mask_strings(value: str) -> str:
+    value = _EMAIL_RE.sub(lambda m: mask_email(m.group()), value)
+    return _PHONE_RE.sub(lambda m: mask_phone(m.group()), value)
+
+
+def sanitize(value: Any, key: Optional[str] = None, in_person: bool = False) -> Any:
+    """Returns a copy of a decoded JSON value with secrets removed and PII masked."""
+    if isinstance(value, dict):
+        return {
+            k: sanitize(v, k, in_person or k in PII_CONTAINERS)
+            for k, v in value.items()
+            if k not in SECRET_KEYS
+        }
+    if isinstance(value, list):
+        return [sanitize(item, key, in_person) for item in value]
+    if not isinstance(value, str) or not value or value in _PLACEHOLDERS:
+        return value
+    if key in PII_KEYS or in_person:
+        if "@" in value:
+            return mask_email(value)
+        if _PHONE_RE.fullmatch(value.replace(" ", "")):
+            return mask_phone(value.replace(" ", ""))
+        return mask_text(value)
+    return _mask_strings(value)
+
+
+def _match_key(request: httpx.Request, base_path: str) -> str:
+    path = request.url.path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    params = sorted(
+        (k, "***" if k in SECRET_KEYS else sanitize(v, k))
+        for k, v in request.url.params.multi_items()
+    )
+    headers = [(h, mask_phone(request.headers[h])) for h in MATCH_HEADERS if h in request.headers]
+    return json.dumps([request.method, path.lstrip("/"), params, headers])
+
+
+def _decode_body(content: bytes) -> Any:
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content.decode("utf-8", errors="replace")
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards to the wrapped transport and appends each sanitized exchange to the cassette."""
+
+    _write_lock = threading.Lock()
+
+    def __init__(self, path: str, wrapped: httpx.AsyncBaseTransport = None, base_path: str = ""):
+        self.path = path
+        self.wrapped = wrapped or httpx.AsyncHTTPTransport()
+        self.base_path = base_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await self.wrapped.handle_async_request(request)
+        content = await response.aread()
+        elapsed_ms = (loop.time() - start) * 1000
+        await response.aclose()
+
+        interaction = {
+            "key": _match_key(request, self.base_path),
+            "request": {"body": sanitize(_decode_body(request.content))},
+            "response": {
+                "status": response.status_code,
+                "headers": {h: response.headers[h] for h in _RESPONSE_HEADERS if h in response.headers},
+                "body": sanitize(_decode_body(content)),
+            },
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        line = json.dumps(interaction, ensure_ascii=False) + "\n"
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+        # The wrapped response stream is consumed; hand back a fresh one with the decoded body
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        await self.wrapped.aclose()
+
+
+_cassettes: Dict[str, Tuple[float, Dict[str, List[dict]]]] = {}
+_cursors: Dict[Tuple[str, str], int] = defaultdict(int)
+_cassettes_lock = threading.Lock()
+
+
+def load_cassette(path: str) -> Dict[str, List[dict]]:
+    """Interactions grouped by match key; parsed once per file version and shared between clients."""
+    mtime = os.path.getmtime(path)
+    with _cassettes_lock:
+        cached = _cassettes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        interactions: Dict[str, List[dict]] = defaultdict(list)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    interactions[entry["key"]].append(entry)
+        _cassettes[path] = (mtime, interactions)
+        return interactions
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded responses. Repeated requests cycle through the recordings
+    for their key. latency is "original" (sleep elapsed_ms * latency_scale) or "zero".
+    """
+
+    def __init__(self, path: str, latency: str = "original", latency_scale: float = 1.0, base_path: str = ""):
+        self.path = path
+        self.interactions = load_cassette(path)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.base_path = base_path
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _match_key(request, self.base_path)
+        recorded = self.interactions.get(key)
+        if not recorded:
+            raise CassetteMiss(f"No recorded interaction for {key}")
+        # Cursors are shared by every client replaying this file (JavaService is per call)
+        with _cassettes_lock:
+            cursor = _cursors[(self.path, key)]
+            _cursors[(self.path, key)] = cursor + 1
+        entry = recorded[cursor % len(recorded)]
+
+        if self.latency == "original" and entry["elapsed_ms"]:
+            await asyncio.sleep(entry["elapsed_ms"] * self.latency_scale / 1000)
+        response = entry["response"]
+        body = response["body"]
+        content = b"" if body is None else (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        return httpx.Response(response["status"], headers=response["headers"], content=content, request=request)
+
+
+def cassette_transport(base_url: str = "") -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for JavaService per the JAVA_CASSETTE_* settings, or None for normal traffic."""
+    mode = settings.JAVA_CASSETTE_MODE
+    if not mode:
+        return None
+    base_path = httpx.URL(base_url).path if base_url else ""
+    if mode == "record":
+        return RecordingTransport(settings.JAVA_CASSETTE_PATH, base_path=base_path)
+    if mode == "replay":
+        return ReplayTransport(
+            settings.JAVA_CASSETTE_PATH,
+            latency=settings.JAVA_CASSETTE_LATENCY,
+            latency_scale=settings.JAVA_CASSETTE_LATENCY_SCALE,
+            base_path=base_path,
+        )
+    logger.warning(f"Unknown JAVA_CASSETTE_MODE '{mode}', ignoring")
+    return None
@@ -0,0 +1,161 @@
+"""
+Bulk decoding of upstream (Java API) list payloads.
+
+Each list endpoint's item shape is declared once, as a TypedDict whose keys
+are our field names aliased to the upstream keys. A pydantic TypeAdapter
+validates and coerces a whole array in one call, straight from the response
+bytes: only the declared keys are kept and no model is built per item. The
+validated rows then become columnar result sets (app/resultsets.py), or
+models for the short lists (offers).
+
+Fallbacks apply to missing, null and empty values alike; the upstream sends
+all three.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from pydantic import AliasPath, ConfigDict, Field, TypeAdapter
+from typing_extensions import Annotated, TypedDict
+
+from app.models import AppointmentSummary, LeadSummary, Offer, Service
+from app.resultsets import AppointmentResultSet, LeadResultSet
+
+Payload = Union[bytes, str, list, dict, None]
+
+# Upstream IDs arrive as numbers, everything we keep as text is str
+_WIRE_CONFIG = ConfigDict(coerce_numbers_to_str=True)
+
+
+class ListDecoder:
+    """One upstream array shape: its validator plus the per-field fallbacks applied when columns are taken."""
+
+    def __init__(self, wire: type, fallbacks: Dict[str, Any] = None,
+                 derived: Dict[str, Callable[[dict], Any]] = None):
+        self.adapter = TypeAdapter(List[wire])
+        self.fallbacks = fallbacks or {}
+        self.derived = derived or {}
+
+    def rows(self, payload: Payload) -> List[dict]:
+        """Validated rows keyed by our field names. An empty body, or anything but an array, has no rows."""
+        if isinstance(payload, (bytes, str)):
+            # Error bodies come back as JSON objects; only an array has rows
+            if payload.lstrip()[:1] not in (b"[", "["):
+                return []
+            return self.adapter.validate_json(payload)
+        if isinstance(payload, list):
+            return self.adapter.validate_python(payload)
+        return []
+
+    def column(self, rows: List[dict], name: str) -> List[Any]:
+        if name in self.derived:
+            return list(map(self.derived[name], rows))
+        fallback = self.fallbacks.get(name)
+        if fallback is None:
+            return [row.get(name) for row in rows]
+        return [row.get(name) or fallback for row in rows]
+
+    def columns(self, rows: List[dict], names: Iterable[str]) -> Dict[str, List[Any]]:
+        return {name: self.column(rows, name) for name in names}
+
+
+# --- leads: api/biz/{id}/sales-enq/list ----------------------------------------------
+
+class LeadWire(TypedDict, total=False):
+    __pydantic_config__ = _WIRE_CONFIG
+    lead_id: Annotated[Optional[str], Field(alias="enqNo")]  # using enqNo as unique lead id
+    name: Annotated[Optional[str], Field(alias="custName")]
+    status: Optional[str]
+    created_at: Annotated[Optional[str], Field(alias="enquiredOn")]
+    phone: Optional[str]
+    email: Optional[str]  # Java API might not have email, default to N/A
+    source: Annotated[Optional[str], Field(alias="srcChannel")]
+    value: Optional[float]
+    leadValue: Optional[float]
+
+
+LEADS = ListDecoder(LeadWire, fallbacks={
+    "lead_id": "None", "name": "Unknown", "status": "", "created_at": "",
+    "phone": "N/A", "email": "N/A", "source": "N/A", "value": 0.0, "leadValue": 0.0,
+})
+
+
+def decode_leads(payload: Payload) -> LeadResultSet:
+    return LeadResultSet(**LEADS.columns(LEADS.rows(payload), LeadSummary.model_fields))
+
+
+# --- appointments: api/biz/{id}/bookings/ --------------------------------------------
+
+class BookedServiceWire(TypedDict, total=False):
+    __pydantic_config__ = _WIRE_CONFIG
+    serviceName: Optional[str]
+
+
+class BookingWire(TypedDict, total=False):
+    __pydantic_config__ = _WIRE_CONFIG
+    booking_id: Annotated[Optional[str], Field(alias="bookingId")]
+    # Customer info is flattened while validating; a null customerInfo just leaves these out
+    customer_name: Annotated[Optional[str], Field(validation_alias=AliasPath("customerInfo", "name"))]
+    phone: Annotated[Optional[str], Field(validation_alias=AliasPath("customerInfo", "phone"))]
+    bkStartTime: Optional[str]
+    startTime: Optional[str]
+    status: Optional[str]
+    services: Optional[List[BookedServiceWire]]
+
+
+def _service_names(row: dict) -> str:
+    return ", ".join([s.get("serviceName") or "" for s in row.get("services") or ()]) or "No Service"
+
+
+APPOINTMENTS = ListDecoder(BookingWire, fallbacks={
+    "booking_id": "None", "customer_name": "Unknown", "phone": "N/A",
+}, derived={
+    "service_name": _service_names,
+    "start_time": lambda row: row.get("bkStartTime") or row.get("startTime"),
+})
+
+
+def decode_appointments(payload: Payload) -> AppointmentResultSet:
+    return AppointmentResultSet(**APPOINTMENTS.columns(APPOINTMENTS.rows(payload), AppointmentSummary.model_fields))
+
+
+# --- offers: api/biz/{id}/offers --------------------------------------------------
+
+class OfferWire(TypedDict, total=False):
+    __pydantic_config__ = _WIRE_CONFIG
+    title: Optional[str]
+    image: Optional[str]
+    startDate: Optional[str]
+    endDate: Optional[str]
+    details: Optional[str]
+    activeCampaigns: Optional[Dict[str, str]]
+
+
+OFFERS = ListDecoder(OfferWire)
+
+
+def decode_offers(payload: Payload) -> List[Offer]:
+    offers = []
+    for row in OFFERS.rows(payload):
+        campaigns = row.get("activeCampaigns") or {}
+        # Rows are already validated against the Offer field types
+        offers.append(Offer.model_construct(
+            title=row.get("title") or "Untitled Offer",
+            image=row.get("image"),
+            startDate=row.get("startDate"),
+            endDate=row.get("endDate"),
+            details=row.get("details"),
+            activeCampaigns=campaigns,
+            bp_link=campaigns.get("BP"),  # Extract BP link if available
+        ))
+    return offers
+
+
+# --- services: web/biz/services ----------------------------------------------------
+
+_SERVICES = TypeAdapter(List[Service])
+
+
+def decode_services(payload: Payload) -> List[Service]:
+    """Services map one to one onto the model, so the whole array is validated into models directly."""
+    if isinstance(payload, (bytes, str)):
+        return _SERVICES.validate_json(payload) if payload.strip() else []
+    return _SERVICES.validate_python(payload or [])
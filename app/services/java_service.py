@@ -3,10 +3,22 @@ import logging
 from app.models import Lead, Appointment, AppointmentSummary, Invoice, BusinessSummary, LeadCreateRequest, LeadCreateResponse, LeadSummary, LeadListResponse, Service, BookingRequest, BookingResponse, Offer, OfferListResponse
 from typing import List, Optional, Dict, Any
 from app.services.base import BaseService
+from app.services.decoding import decode_appointments, decode_leads, decode_offers, decode_services
+from app.services.cassette import cassette_transport
 from app.config import settings, mask_key
+from app.utils.diagnostics import track
 
 logger = logging.getLogger(__name__)
 
+LEAD_LIST_PARAMS = {
+    "searchText": "",
+    "status": "",
+    "periodType": "",
+    "periodFilterBy": "A",
+    "fromDate": "",
+    "toDate": "",
+}
+
 class JavaService(BaseService):
     def __init__(self, token: str = None, client_id: str = None):
         # Initialize base_url from settings
@@ -49,7 +61,14 @@ class JavaService(BaseService):
         if self.base_url and not self.base_url.endswith('/'):
             self.base_url += '/'
             
-        self.client = httpx.AsyncClient(base_url=self.base_url, headers=headers, follow_redirects=True)
+        # Cassette record/replay hooks in at the transport level when JAVA_CASSETTE_MODE is set
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url, headers=headers, follow_redirects=True,
+            transport=cassette_transport(self.base_url)
+        )
+        # Live counts on /metrics and /debug/memory (see app/utils/diagnostics.py)
+        track(self, "JavaService")
+        track(self.client, "httpx.AsyncClient")
 
     async def create_lead(self, request: LeadCreateRequest) -> LeadCreateResponse:
         try:
@@ -175,40 +194,20 @@ class JavaService(BaseService):
             raise e
 
     async def list_leads(self, business_id: int) -> LeadListResponse:
-        params = {
-            "searchText": "",
-            "status": "",
-            "periodType": "",
-            "periodFilterBy": "A",
-            "fromDate": "",
-            "toDate": "",
-        }
         data = await self._get(
-            f"api/biz/{int(business_id)}/sales-enq/list", params=params
+            f"api/biz/{int(business_id)}/sales-enq/list", params=LEAD_LIST_PARAMS, raw=True
         )
-        
-        leads: List[LeadSummary] = []
-
-        for item in data:
-            lead = LeadSummary(
-                lead_id=str(item.get("enqNo")),           # using enqNo as unique lead id
-                name=item.get("custName") or "Unknown",
-                status=str(item.get("status", "")),
-                created_at=item.get("enquiredOn", ""),
-                phone=item.get("phone") or "N/A",
-                email=item.get("email") or "N/A",         # Java API might not have email, default to N/A
-                source=item.get("srcChannel") or "N/A",
-                value=float(item.get("value", 0.0)),
-                leadValue=float(item.get("leadValue", 0.0))
-            )
-            leads.append(lead)
 
-        return LeadListResponse(
+        # Validated in one call from the response bytes, one array per field (see app/services/decoding.py)
+        leads = decode_leads(data)
+
+        # Already decoded column by column; validating would materialise every row
+        return LeadListResponse.model_construct(
             total=len(leads),
             items=leads
         )
 
-    async def _get(self, url: str, params: dict = None) -> Any:
+    async def _get(self, url: str, params: dict = None, raw: bool = False) -> Any:
         import logging
         
         request_url = url.lstrip('/')
@@ -231,7 +230,11 @@ class JavaService(BaseService):
 
         if not response.content:
             logging.warning(f"GET {request_url} returned empty content")
-            return {}
+            return b"" if raw else {}
+
+        if raw:
+            # Left to the caller to decode, e.g. with a TypeAdapter straight from bytes
+            return response.content
 
         try:
             return response.json()
@@ -273,28 +276,9 @@ class JavaService(BaseService):
         }
         
         # Use _get for proper logging and error handling
-        response_data = await self._get(f"api/biz/{int(business_id)}/bookings/", params=params)
-        
-        appointments = []
-        for item in response_data:
-            # Extract service names
-            services = item.get("services", [])
-            service_names = ", ".join([s.get("serviceName", "") for s in services])
-            
-            # Extract customer info
-            customer = item.get("customerInfo", {})
-            
-            summary = AppointmentSummary(
-                booking_id=str(item.get("bookingId")),
-                customer_name=customer.get("name") or "Unknown",
-                service_name=service_names or "No Service",
-                start_time=item.get("bkStartTime") or item.get("startTime"),
-                status=item.get("status"),
-                phone=customer.get("phone") or "N/A"
-            )
-            appointments.append(summary)
-            
-        return appointments
+        response_data = await self._get(f"api/biz/{int(business_id)}/bookings/", params=params, raw=True)
+
+        return decode_appointments(response_data)
 
     async def get_appointment(self, appointment_id: str) -> Optional[Appointment]:
         response = await self.client.get(f"appointments/{appointment_id}")
@@ -358,31 +342,13 @@ class JavaService(BaseService):
             logging.error(f"search_services failed with 401. Tried Bearer: {mask_key(headers.get('Authorization'))}")
             
         response.raise_for_status()
-        return [Service(**item) for item in response.json()]
+        return decode_services(response.content)
 
     async def list_offers(self, business_id: str) -> List[Offer]:
         # GET /api/biz/{business_id}/offers
-        response_data = await self._get(f"api/biz/{int(business_id)}/offers")
-        
-        offers = []
-        for item in response_data:
-            # Map fields
-            offer = Offer(
-                title=item.get("title") or "Untitled Offer",
-                image=item.get("image"),
-                startDate=item.get("startDate"),
-                endDate=item.get("endDate"),
-                details=item.get("details"),
-                activeCampaigns=item.get("activeCampaigns", {})
-            )
-            
-            # Extract BP link if available
-            if offer.activeCampaigns:
-                offer.bp_link = offer.activeCampaigns.get("BP")
-                
-            offers.append(offer)
-            
-        return offers
+        response_data = await self._get(f"api/biz/{int(business_id)}/offers", raw=True)
+
+        return decode_offers(response_data)
 
     async def get_my_queues(self, phone: str) -> Optional[int]:
         """
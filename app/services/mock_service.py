@@ -1,34 +1,37 @@
-import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
-from app.models import Lead, Appointment, Invoice, BusinessSummary, LeadCreateRequest, LeadCreateResponse, LeadSummary, LeadListResponse, Service, BookingRequest, BookingResponse, Offer
+from app.models import Lead, Appointment, AppointmentSummary, Invoice, BusinessSummary, LeadCreateRequest, LeadCreateResponse, LeadSummary, LeadListResponse, Service, BookingRequest, BookingResponse, Offer
 from app.services.base import BaseService
+from app.services.mock_store import get_store, parse_day, JAVA_DATETIME_FORMAT
 
 class MockService(BaseService):
+    """
+    Mock backend for USE_MOCK_DATA=true. Instances are cheap views over the
+    process-wide MockDataStore, so data created by one tool call is visible
+    to the next one.
+    """
     def __init__(self, token: str = None):
-        self.leads: List[Lead] = []
-        self.appointments: List[Appointment] = []
-        self.invoices: List[Invoice] = []
+        self.store = get_store()
 
     async def create_lead(self, request: LeadCreateRequest) -> LeadCreateResponse:
-        lead = Lead(
-            id=str(uuid.uuid4()),
+        lead = self.store.add_lead(
+            business_id=request.business_id,
             name=request.name,
-            email=request.email or "",
             phone=request.phone,
-            created_at=datetime.now()
+            email=request.email,
+            source=request.source,
+            enquiry_for=request.enquiry_for,
         )
-        self.leads.append(lead)
         return LeadCreateResponse(
             lead_id=lead.id,
-            status="new",
+            status=lead.status,
             created_at=lead.created_at.isoformat(),
             next_action="Followup",
-            custName=request.name,
-            phone=request.phone,
-            enqFor=request.enquiry_for,
-            value=0.0,
-            leadValue=0.0
+            custName=lead.name,
+            phone=lead.phone,
+            enqFor=lead.enquiry_for,
+            value=lead.value,
+            leadValue=lead.value
         )
 
     async def list_leads(self, business_id: int) -> LeadListResponse:
@@ -37,68 +40,105 @@ class MockService(BaseService):
                 lead_id=l.id,
                 name=l.name,
                 status=l.status,
-                created_at=l.created_at.isoformat() if l.created_at else "",
+                created_at=l.created_at.strftime(JAVA_DATETIME_FORMAT),
                 phone=l.phone or "N/A",
                 email=l.email or "N/A",
-                source="mock",
-                value=0.0,
-                leadValue=0.0
-            ) for l in self.leads
+                source=l.source,
+                value=l.value,
+                leadValue=l.value
+            ) for l in self.store.leads(int(business_id))
         ]
         return LeadListResponse(total=len(summaries), items=summaries)
 
     async def create_appointment(self, request: BookingRequest) -> BookingResponse:
+        start_time = datetime.strptime(request.dateTime[:19], "%Y-%m-%dT%H:%M:%S")
+        booking = self.store.add_booking(request.bizId, request.phone, request.serviceIds, start_time)
         return BookingResponse(
-            bookingId=123,
-            date=request.dateTime.split('T')[0],
-            time=request.dateTime.split('T')[1].split('.')[0],
-            custName="Mock Customer",
+            bookingId=booking.id,
+            date=start_time.strftime("%Y-%m-%d"),
+            time=start_time.strftime("%H:%M:%S"),
+            custName=booking.customer_name,
             bizInfo={"name": "Mock Business", "id": request.bizId},
-            services=[f"Service {sid}" for sid in request.serviceIds]
+            services=list(booking.service_names)
         )
 
-    async def list_appointments(self) -> List[Appointment]:
-        return self.appointments
+    async def list_appointments(self, business_id: int, start_date: str, end_date: str, status: str = "QU,BO,PE") -> List[AppointmentSummary]:
+        statuses = [s for s in status.split(",") if s]
+        bookings = self.store.bookings_between(int(business_id), parse_day(start_date), parse_day(end_date), statuses)
+        return [
+            AppointmentSummary(
+                booking_id=str(b.id),
+                customer_name=b.customer_name,
+                service_name=", ".join(b.service_names) or "No Service",
+                start_time=b.start_time.strftime(JAVA_DATETIME_FORMAT),
+                status=b.status,
+                phone=b.phone
+            ) for b in bookings
+        ]
 
     async def get_appointment(self, appointment_id: str) -> Optional[Appointment]:
-        for appt in self.appointments:
-            if appt.id == appointment_id:
-                return appt
-        return None
+        booking = self.store.get_booking(appointment_id)
+        if not booking:
+            return None
+        return Appointment(
+            id=str(booking.id),
+            customer_id=booking.phone,
+            service_name=", ".join(booking.service_names),
+            start_time=booking.start_time,
+            end_time=booking.start_time + timedelta(minutes=booking.duration_min),
+            status=booking.status
+        )
 
     async def create_invoice(self, invoice: Invoice) -> Invoice:
-        invoice.id = str(uuid.uuid4())
-        invoice.created_at = datetime.now()
-        self.invoices.append(invoice)
+        row = self.store.add_invoice(int(invoice.business_id), invoice.customer_id, invoice.amount, invoice.status)
+        invoice.id = row.id
+        invoice.created_at = row.created_at
         return invoice
 
     async def list_invoices(self) -> List[Invoice]:
-        return self.invoices
+        # No business filter in this API; return the most recently created invoices
+        return [self._invoice(row) for row in self.store.recent_invoices()]
 
     async def get_invoice(self, invoice_id: str) -> Optional[Invoice]:
-        for inv in self.invoices:
-            if inv.id == invoice_id:
-                return inv
-        return None
+        row = self.store.get_invoice(invoice_id)
+        return self._invoice(row) if row else None
+
+    @staticmethod
+    def _invoice(row) -> Invoice:
+        return Invoice(
+            id=row.id,
+            business_id=str(row.business_id),
+            customer_id=row.customer_id,
+            amount=row.amount,
+            status=row.status,
+            created_at=row.created_at
+        )
 
     async def get_summary_for_business(self, business_id: str, from_date: str = None, to_date: str = None) -> BusinessSummary:
-        # Mock logic to calculate summary
-        total_leads = len(self.leads) # In real app, filter by business_id
-        total_appointments = len(self.appointments)
-        total_revenue = sum(inv.amount for inv in self.invoices)
-        
+        today = datetime.now().date()
+        start = parse_day(from_date) if from_date else today
+        end = parse_day(to_date) if to_date else today
+        biz = int(business_id)
+
+        leads = self.store.leads_between(biz, start, end)
+        bookings = self.store.bookings_between(biz, start, end)
+        invoices = self.store.invoices_between(biz, start, end)
+        recent = sorted(bookings, key=lambda b: b.start_time, reverse=True)[:5]
+
         return BusinessSummary(
-            business_id=business_id,
-            total_leads=total_leads,
-            total_appointments=total_appointments,
-            bills_count=total_appointments,
-            total_revenue=total_revenue,
-            recent_activities=["New lead created", "Invoice paid"]
+            business_id=str(business_id),
+            total_leads=len(leads),
+            total_appointments=len(bookings),
+            bills_count=len(invoices),
+            total_revenue=round(sum(inv.amount for inv in invoices if inv.status == "paid"), 2),
+            recent_activities=[f"{b.customer_name} booked {', '.join(b.service_names)}" for b in recent]
         )
 
     async def search_services(self, business_id: int, text: str, group_id: int = 0) -> List[Service]:
+        needle = (text or "").lower()
         return [
-            Service(id=454, name="Simple Facial", price=590.0, gender=None, type="S")
+            Service(id=s.id, name=s.name, price=s.price, gender=s.gender, type="S")
+            for s in self.store.services(int(business_id)) if needle in s.name.lower()
         ]
 
     async def list_offers(self, business_id: str) -> List[Offer]:
@@ -0,0 +1,423 @@
+"""
+Process-wide data store behind MockService (USE_MOCK_DATA=true).
+
+Data is generated deterministically from MOCK_SEED the first time it is
+touched: a business's leads and service catalog on first access, its bookings
+and invoices one day at a time when a date range asks for them. Any business
+ID and any date therefore has realistic data, so memory only grows with what
+a test actually reads, and preload() can materialise millions of rows up
+front for scaling tests:
+
+    python -m app.services.mock_store --businesses 2000 --days 365
+
+Rows are stored as tuples and indexed by id, by business and by
+(business, day). They are converted to API models only on the way out.
+"""
+import argparse
+import bisect
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.config import settings
+
+JAVA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+
+FIRST_NAMES = ["Aisha", "Ravi", "Mei Ling", "John", "Priya", "Ahmad", "Siti", "Karthik", "Wei", "Nur", "Arjun", "Grace"]
+LAST_NAMES = ["Tan", "Kumar", "Lim", "Wong", "Singh", "Rahman", "Lee", "Ng", "Menon", "Chua"]
+SERVICE_NAMES = [
+    "Gents Cut", "Ladies Cut", "Kids Cut", "Hair Colouring", "Highlights", "Keratin Treatment", "Hair Spa",
+    "Head Massage", "Simple Facial", "Gold Facial", "Anti-Ageing Facial", "Manicure", "Pedicure",
+    "Eyebrow Threading", "Full Arm Waxing", "Bridal Makeup", "Beard Trim", "Scalp Treatment",
+]
+LEAD_STATUSES = ["NEW", "FOLLOWUP", "CONVERTED", "LOST"]
+LEAD_SOURCES = ["PH", "WA", "WEB", "WALKIN"]
+BOOKING_STATUSES = ["QU", "BO", "PE", "CO"]
+LEAD_HISTORY_DAYS = 180
+
+
+class LeadRow(NamedTuple):
+    id: str
+    business_id: int
+    name: str
+    phone: Optional[str]
+    email: Optional[str]
+    status: str
+    source: str
+    enquiry_for: Optional[str]
+    created_at: datetime
+    value: float
+
+
+class ServiceRow(NamedTuple):
+    id: int
+    business_id: int
+    name: str
+    price: float
+    gender: Optional[str]
+
+
+class BookingRow(NamedTuple):
+    id: int
+    business_id: int
+    customer_name: str
+    phone: str
+    service_names: Tuple[str, ...]
+    start_time: datetime
+    duration_min: int
+    status: str
+    amount: float
+
+
+class InvoiceRow(NamedTuple):
+    id: str
+    business_id: int
+    customer_id: str
+    amount: float
+    status: str
+    created_at: datetime
+
+
+def booking_id(business_id: int, day: date, index: int) -> int:
+    # yyyymmdd + 6-digit business + 4-digit sequence, so the id alone locates the row
+    return int(f"{day:%Y%m%d}{business_id:06d}{index:04d}")
+
+
+def parse_booking_id(value) -> Optional[Tuple[int, date]]:
+    text = str(value)
+    if len(text) != 18 or not text.isdigit():
+        return None
+    try:
+        return int(text[8:14]), datetime.strptime(text[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def invoice_id(business_id: int, day: date, index: int) -> str:
+    return f"INV-{day:%Y%m%d}-{business_id}-{index}"
+
+
+def parse_invoice_id(value: str) -> Optional[Tuple[int, date]]:
+    parts = str(value).split("-")
+    if len(parts) != 4 or parts[0] != "INV":
+        return None
+    try:
+        return int(parts[2]), datetime.strptime(parts[1], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def parse_day(value: str) -> date:
+    """Accepts YYYY/MM/DD or YYYY-MM-DD, optionally followed by a time."""
+    return datetime.strptime(value.strip()[:10].replace("-", "/"), "%Y/%m/%d").date()
+
+
+class MockDataStore:
+    def __init__(self, seed: int = 42, leads_per_business: int = 50, bookings_per_day: int = 10,
+                 invoices_per_day: int = 8, services_per_business: int = 30, anchor: date = None):
+        self.seed = seed
+        self.leads_per_business = leads_per_business
+        self.bookings_per_day = bookings_per_day
+        self.invoices_per_day = invoices_per_day
+        self.services_per_business = services_per_business
+        # Generated leads are spread over the LEAD_HISTORY_DAYS before the anchor
+        self.anchor = anchor or date.today()
+
+        self._lock = threading.RLock()
+        self._leads: Dict[int, List[LeadRow]] = {}          # business -> leads sorted by created_at
+        self._lead_days: Dict[int, List[date]] = {}         # business -> created_at dates, for bisect
+        self._lead_by_id: Dict[str, LeadRow] = {}
+        self._services: Dict[int, List[ServiceRow]] = {}
+        self._bookings: Dict[Tuple[int, date], List[BookingRow]] = {}
+        self._booking_by_id: Dict[int, BookingRow] = {}
+        self._invoices: Dict[Tuple[int, date], List[InvoiceRow]] = {}
+        self._invoice_by_id: Dict[str, InvoiceRow] = {}
+        self._created_invoices: List[InvoiceRow] = []
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(":".join(str(part) for part in (self.seed,) + key))
+
+    # --- generation ---------------------------------------------------------
+
+    def _business_leads(self, business_id: int) -> List[LeadRow]:
+        leads = self._leads.get(business_id)
+        if leads is not None:
+            return leads
+        with self._lock:
+            if business_id in self._leads:
+                return self._leads[business_id]
+            rng = self._rng("leads", business_id)
+            start = datetime.combine(self.anchor, datetime.min.time()) - timedelta(days=LEAD_HISTORY_DAYS)
+            leads = []
+            for i in range(self.leads_per_business):
+                value = round(rng.choice([0, 0, 35, 60, 120, 250, 590, 1500]) * rng.uniform(0.8, 1.2), 2)
+                leads.append(LeadRow(
+                    id=f"L{business_id}-{i}",
+                    business_id=business_id,
+                    name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    phone=f"65{rng.randint(80000000, 99999999)}" if rng.random() > 0.1 else None,
+                    email=f"customer{i}@example.com" if rng.random() > 0.7 else None,
+                    status=rng.choice(LEAD_STATUSES),
+                    source=rng.choice(LEAD_SOURCES),
+                    enquiry_for=rng.choice(SERVICE_NAMES),
+                    created_at=start + timedelta(minutes=rng.randint(0, LEAD_HISTORY_DAYS * 24 * 60)),
+                    value=value,
+                ))
+            leads.sort(key=lambda lead: lead.created_at)
+            for lead in leads:
+                self._lead_by_id[lead.id] = lead
+            self._lead_days[business_id] = [lead.created_at.date() for lead in leads]
+            self._leads[business_id] = leads
+            return leads
+
+    def _business_services(self, business_id: int) -> List[ServiceRow]:
+        services = self._services.get(business_id)
+        if services is not None:
+            return services
+        with self._lock:
+            if business_id in self._services:
+                return self._services[business_id]
+            rng = self._rng("services", business_id)
+            services = []
+            for i in range(self.services_per_business):
+                tier = i // len(SERVICE_NAMES)
+                name = SERVICE_NAMES[i % len(SERVICE_NAMES)]
+                services.append(ServiceRow(
+                    id=business_id * 1000 + i,
+                    business_id=business_id,
+                    name=name if tier == 0 else f"{name} - Premium {tier}",
+                    price=float(rng.choice([15, 25, 35, 60, 90, 120, 250, 590])),
+                    gender=rng.choice(["M", "F", None]),
+                ))
+            self._services[business_id] = services
+            return services
+
+    def _day_bookings(self, business_id: int, day: date) -> List[BookingRow]:
+        key = (business_id, day)
+        bookings = self._bookings.get(key)
+        if bookings is not None:
+            return bookings
+        with self._lock:
+            if key in self._bookings:
+                return self._bookings[key]
+            rng = self._rng("bookings", business_id, day.toordinal())
+            services = self._business_services(business_id)
+            bookings = []
+            for i in range(self.bookings_per_day):
+                picked = rng.sample(services, k=min(len(services), rng.randint(1, 2))) if services else []
+                booking = BookingRow(
+                    id=booking_id(business_id, day, i),
+                    business_id=business_id,
+                    customer_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    phone=f"65{rng.randint(80000000, 99999999)}",
+                    service_names=tuple(s.name for s in picked),
+                    start_time=datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=15 * rng.randint(0, 44)),
+                    duration_min=rng.choice([30, 45, 60, 90]),
+                    status=rng.choice(BOOKING_STATUSES),
+                    amount=sum(s.price for s in picked),
+                )
+                bookings.append(booking)
+                self._booking_by_id[booking.id] = booking
+            self._bookings[key] = bookings
+            return bookings
+
+    def _day_invoices(self, business_id: int, day: date) -> List[InvoiceRow]:
+        key = (business_id, day)
+        invoices = self._invoices.get(key)
+        if invoices is not None:
+            return invoices
+        with self._lock:
+            if key in self._invoices:
+                return self._invoices[key]
+            rng = self._rng("invoices", business_id, day.toordinal())
+            invoices = []
+            for i in range(self.invoices_per_day):
+                invoice = InvoiceRow(
+                    id=invoice_id(business_id, day, i),
+                    business_id=business_id,
+                    customer_id=f"C{business_id}-{rng.randint(1, 5000)}",
+                    amount=round(rng.choice([35, 60, 120, 250, 590]) * rng.uniform(0.9, 1.5), 2),
+                    status=rng.choice(["paid", "paid", "paid", "draft"]),
+                    created_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=10, minutes=rng.randint(0, 600)),
+                )
+                invoices.append(invoice)
+                self._invoice_by_id[invoice.id] = invoice
+            self._invoices[key] = invoices
+            return invoices
+
+    def preload(self, business_ids: Iterable[int], days: int, end: date = None) -> Dict[str, int]:
+        """Materialises leads, bookings and invoices for the businesses over the last N days."""
+        end = end or self.anchor
+        counts = {"leads": 0, "bookings": 0, "invoices": 0}
+        for business_id in business_ids:
+            counts["leads"] += len(self._business_leads(business_id))
+            for offset in range(days):
+                day = end - timedelta(days=offset)
+                counts["bookings"] += len(self._day_bookings(business_id, day))
+                counts["invoices"] += len(self._day_invoices(business_id, day))
+        return counts
+
+    # --- queries ----------------------------------------------------------------
+
+    @staticmethod
+    def _days(start: date, end: date) -> Iterable[date]:
+        for offset in range((end - start).days + 1):
+            yield start + timedelta(days=offset)
+
+    def leads(self, business_id: int) -> List[LeadRow]:
+        return self._business_leads(business_id)
+
+    def leads_between(self, business_id: int, start: date, end: date) -> List[LeadRow]:
+        leads = self._business_leads(business_id)
+        days = self._lead_days[business_id]
+        return leads[bisect.bisect_left(days, start):bisect.bisect_right(days, end)]
+
+    def bookings_between(self, business_id: int, start: date, end: date, statuses: Optional[Iterable[str]] = None) -> List[BookingRow]:
+        wanted = set(statuses) if statuses else None
+        rows = []
+        for day in self._days(start, end):
+            rows.extend(b for b in self._day_bookings(business_id, day) if wanted is None or b.status in wanted)
+        return rows
+
+    def invoices_between(self, business_id: int, start: date, end: date) -> List[InvoiceRow]:
+        rows = []
+        for day in self._days(start, end):
+            rows.extend(self._day_invoices(business_id, day))
+        return rows
+
+    def recent_invoices(self, limit: int = 100) -> List[InvoiceRow]:
+        return self._created_invoices[-limit:]
+
+    def services(self, business_id: int) -> List[ServiceRow]:
+        return self._business_services(business_id)
+
+    def get_booking(self, value) -> Optional[BookingRow]:
+        located = parse_booking_id(value)
+        if located:
+            self._day_bookings(*located)
+            return self._booking_by_id.get(int(value))
+        return None
+
+    def get_invoice(self, value: str) -> Optional[InvoiceRow]:
+        located = parse_invoice_id(value)
+        if located:
+            self._day_invoices(*located)
+        return self._invoice_by_id.get(str(value))
+
+    # --- writes ---------------------------------------------------------------------
+
+    def add_lead(self, business_id: int, name: str, phone: Optional[str], email: Optional[str],
+                 source: str, enquiry_for: Optional[str], value: float = 0.0) -> LeadRow:
+        with self._lock:
+            leads = self._business_leads(business_id)
+            lead = LeadRow(
+                id=f"L{business_id}-{len(leads)}",
+                business_id=business_id,
+                name=name,
+                phone=phone,
+                email=email,
+                status="NEW",
+                source=source or "manual",
+                enquiry_for=enquiry_for,
+                created_at=datetime.now(),
+                value=value,
+            )
+            # New leads are the most recent, so appending keeps the list sorted
+            leads.append(lead)
+            self._lead_days[business_id].append(lead.created_at.date())
+            self._lead_by_id[lead.id] = lead
+            return lead
+
+    def add_booking(self, business_id: int, phone: str, service_ids: List[int], start_time: datetime) -> BookingRow:
+        with self._lock:
+            day = start_time.date()
+            bookings = self._day_bookings(business_id, day)
+            by_id = {s.id: s for s in self._business_services(business_id)}
+            picked = [by_id[sid] for sid in service_ids if sid in by_id]
+            booking = BookingRow(
+                id=booking_id(business_id, day, len(bookings)),
+                business_id=business_id,
+                customer_name="Mock Customer",
+                phone=phone,
+                service_names=tuple(s.name for s in picked) or tuple(f"Service {sid}" for sid in service_ids),
+                start_time=start_time,
+                duration_min=60,
+                status="BO",
+                amount=sum(s.price for s in picked),
+            )
+            bookings.append(booking)
+            self._booking_by_id[booking.id] = booking
+            return booking
+
+    def add_invoice(self, business_id: int, customer_id: str, amount: float, status: str) -> InvoiceRow:
+        with self._lock:
+            now = datetime.now()
+            invoices = self._day_invoices(business_id, now.date())
+            invoice = InvoiceRow(
+                id=invoice_id(business_id, now.date(), len(invoices)),
+                business_id=business_id,
+                customer_id=customer_id,
+                amount=amount,
+                status=status,
+                created_at=now,
+            )
+            invoices.append(invoice)
+            self._invoice_by_id[invoice.id] = invoice
+            self._created_invoices.append(invoice)
+            return invoice
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "businesses": len(self._leads),
+            "leads": len(self._lead_by_id),
+            "bookings": len(self._booking_by_id),
+            "invoices": len(self._invoice_by_id),
+        }
+
+
+_store: Optional[MockDataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MockDataStore:
+    """The shared store used by every MockService instance in this process."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MockDataStore(
+                    seed=settings.MOCK_SEED,
+                    leads_per_business=settings.MOCK_LEADS_PER_BUSINESS,
+                    bookings_per_day=settings.MOCK_BOOKINGS_PER_DAY,
+                    invoices_per_day=settings.MOCK_INVOICES_PER_DAY,
+                    services_per_business=settings.MOCK_SERVICES_PER_BUSINESS,
+                )
+    return _store
+
+
+def reset_store():
+    """Drops all generated and created data (tests)."""
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate mock data and report volume and time")
+    parser.add_argument("--businesses", type=int, default=100)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    store = get_store()
+    start = time.perf_counter()
+    counts = store.preload(range(1, args.businesses + 1), args.days)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"{counts['leads']:,} leads, {counts['bookings']:,} bookings, {counts['invoices']:,} invoices "
+          f"for {args.businesses} businesses x {args.days} days in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
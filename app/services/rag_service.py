@@ -1,9 +1,27 @@
 import os
-from typing import List
+import re
+from typing import List, Set, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Filler words that would otherwise make every chunk "match" a question
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "be", "do", "does", "can", "i", "you", "me", "my",
+    "your", "we", "our", "it", "of", "to", "in", "on", "for", "and", "or", "with", "what",
+    "how", "about", "tell", "there", "this", "that", "any", "have", "has",
+})
+
+
+def _tokenize(text: str) -> Set[str]:
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS}
+
 
 class SimpleRAGService:
     def __init__(self, file_path: str = "data/qtick_info.txt"):
         self.chunks = []
+        self.chunk_words: List[Set[str]] = []
+        # Plain lowercase words, as retrieve() has always matched them
+        self._retrieval_words: List[Set[str]] = []
         self._load_data(file_path)
 
     def _load_data(self, file_path: str):
@@ -13,10 +31,37 @@ class SimpleRAGService:
 
         with open(file_path, "r", encoding="utf-8") as f:
             content = f.read()
-        
+
         # Split by double newlines to get paragraphs/sections
         raw_chunks = content.split("\n\n")
         self.chunks = [chunk.strip() for chunk in raw_chunks if chunk.strip()]
+        self.chunk_words = [_tokenize(chunk) for chunk in self.chunks]
+        self._retrieval_words = [set(chunk.lower().split()) for chunk in self.chunks]
+
+    def score_chunks(self, query: str) -> List[Tuple[float, str]]:
+        """
+        Scores every chunk against the query for the extractive answer decision.
+        Returns (score, chunk) pairs with a non-zero score, best first. The score is
+        the fraction of the query's keywords (stopwords dropped) found in the chunk
+        (0.0 - 1.0). retrieve() keeps its own word-overlap ranking.
+        """
+        query_words = _tokenize(query)
+        if not query_words:
+            return []
+
+        scored_chunks = []
+        for chunk, chunk_words in zip(self.chunks, self.chunk_words):
+            overlap = len(query_words & chunk_words)
+            if overlap > 0:
+                scored_chunks.append((overlap / len(query_words), chunk))
+
+        # Sort by score descending
+        scored_chunks.sort(key=lambda x: x[0], reverse=True)
+        return scored_chunks
+
+    def matched_keywords(self, query: str, chunk: str) -> Set[str]:
+        """The query's keywords that appear in the chunk (or any text, e.g. its heading line)."""
+        return _tokenize(query) & _tokenize(chunk)
 
     def retrieve(self, query: str, top_k: int = 2) -> str:
         """
@@ -28,16 +73,15 @@ class SimpleRAGService:
             return ""
 
         scored_chunks = []
-        for chunk in self.chunks:
-            chunk_words = set(chunk.lower().split())
+        for chunk, chunk_words in zip(self.chunks, self._retrieval_words):
             # Calculate overlap score
             score = len(query_words.intersection(chunk_words))
             if score > 0:
                 scored_chunks.append((score, chunk))
-        
+
         # Sort by score descending
         scored_chunks.sort(key=lambda x: x[0], reverse=True)
-        
+
         # Return top_k chunks joined
         top_chunks = [chunk for score, chunk in scored_chunks[:top_k]]
         return "\n\n".join(top_chunks)
@@ -0,0 +1,64 @@
+import logging
+import time
+from typing import Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Phrase used to make dateparser load its language data and compile its regexes
+WARMUP_DATE_PHRASE = "tomorrow at 10am"
+
+
+def _warm_dateparser():
+    from app.utils.date_utils import parse_date_flexible
+    parse_date_flexible(WARMUP_DATE_PHRASE)
+
+
+def _warm_openai():
+    from openai import AsyncOpenAI  # noqa: F401
+
+
+def _warm_gemini():
+    import google.generativeai  # noqa: F401
+    from google.generativeai.types import FunctionDeclaration, Tool  # noqa: F401
+    from google.ai.generativelanguage import Part, FunctionResponse  # noqa: F401
+
+
+def _warm_fake_llm():
+    from app.fakes.llm import get_fake_llm
+    get_fake_llm()
+    if settings.FAKE_LLM_STYLE == "gemini":
+        _warm_gemini()
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Startup warm-up phase, run once from the FastAPI lifespan.
+
+    Module imports are kept lightweight so the worker boots fast; the heavy
+    dependencies (dateparser, the active LLM SDK) are imported and primed here
+    instead of on the first request. Returns the time spent per step in ms.
+    A failing step is logged and skipped so a missing optional SDK never
+    prevents the service from starting.
+    """
+    steps = [("dateparser", _warm_dateparser)]
+    if settings.LLM_PROVIDER == "openai":
+        steps.append(("openai", _warm_openai))
+    elif settings.LLM_PROVIDER == "gemini":
+        steps.append(("gemini", _warm_gemini))
+    elif settings.LLM_PROVIDER == "fake":
+        steps.append(("fake_llm", _warm_fake_llm))
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+            continue
+        timings[name] = (time.perf_counter() - start) * 1000
+
+    logger.info("Warm-up complete: " + ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items()))
+    return timings
@@ -1,20 +1,70 @@
+import functools
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from app.config import settings
 from app.services.mock_service import MockService
 from app.services.java_service import JavaService
-from app.models import Appointment, ToolResult, BookingRequest, AppointmentSummary
-from app.utils.date_utils import parse_date_flexible, get_date_range
-import json
+from app.models import Appointment, ToolResult, BookingRequest, BookingResponse, AppointmentSummary
+from app.utils.date_utils import parse_date_flexible_async, get_date_range
+from app.resultsets import column
+from app.utils.whatsapp import Template, render_list
 
 def get_service(token: str = None, client_id: str = None):
     if settings.USE_MOCK_DATA:
         return MockService(token)
     return JavaService(token, client_id)
 
+APPOINTMENT_CREATED = Template(
+    "✅ *Appointment Confirmed*\n"
+    "🆔 ID: {booking.bookingId}\n"
+    "🏢 {business_name}\n"
+    "👤 {booking.custName}\n"
+    "📅 {booking.date} {booking.time}\n"
+    "💇 {services}\n"
+)
+APPOINTMENT_LIST_HEADER = Template("📅 *Appointments ({count})*")
+APPOINTMENT_LIST_ITEM = Template(
+    "\n🕒 *{date} {time}*\n"
+    "👤 {appt.customer_name}\n"
+    "💇 {appt.service_name}\n"
+    "ℹ️ Status: {appt.status}\n"
+)
+
+def format_whatsapp_appointment_create(result: BookingResponse) -> str:
+    """Format appointment confirmation for WhatsApp."""
+    return APPOINTMENT_CREATED.render(booking=result, business_name=result.bizInfo.get('name'), services=", ".join(result.services))
+
+def _parse_start_time(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.000+0000")
+    except (TypeError, ValueError):
+        return None
+
+def format_appointment_list(data: List[AppointmentSummary], start_times: List[Optional[datetime]], from_date: str, to_date: str) -> str:
+    """Plain-text appointment list."""
+    text_lines = [f"Found {len(data)} appointments from {from_date} to {to_date}:"]
+    for appt, dt_obj in zip(data, start_times):
+        if dt_obj:
+            date_str, time_str = dt_obj.strftime("%b %d"), dt_obj.strftime("%I:%M %p")
+        else:
+            date_str, time_str = "", appt.start_time
+        text_lines.append(f"- {date_str} {time_str} | {appt.customer_name} | {appt.service_name} | {appt.status}")
+    return "\n".join(text_lines)
+
+def format_whatsapp_appointment_list(data: List[AppointmentSummary], start_times: List[Optional[datetime]]) -> str:
+    """Format appointment list for WhatsApp."""
+    def rows():
+        for appt, dt_obj in zip(data, start_times):
+            if dt_obj:
+                yield {"appt": appt, "date": dt_obj.strftime("%d %b"), "time": dt_obj.strftime("%I:%M %p")}
+            else:
+                yield {"appt": appt, "date": "", "time": appt.start_time}
+
+    return render_list(APPOINTMENT_LIST_HEADER, APPOINTMENT_LIST_ITEM, rows(), row_count=len(data), count=len(data))
+
 async def create_appointment(business_id: int, phone: str, service_ids: List[int], date_time: str, token: str = None, client_id: str = None) -> ToolResult:
     """Create a new appointment. Supports natural language dates."""
-    date_time = parse_date_flexible(date_time)
+    date_time = await parse_date_flexible_async(date_time)
     service = get_service(token, client_id)
     
     request = BookingRequest(
@@ -25,21 +75,12 @@ async def create_appointment(business_id: int, phone: str, service_ids: List[int
     )
 
     result = await service.create_appointment(request)
-    text = f"Appointment created successfully. ID: {result.bookingId}. Status: Pending. Business: {result.bizInfo.get('name')}."
-    
-    # WhatsApp Format
-    services_str = ", ".join(result.services)
-    wa_message = (
-        f"✅ *Appointment Confirmed*\n"
-        f"🆔 ID: {result.bookingId}\n"
-        f"🏢 {result.bizInfo.get('name')}\n"
-        f"👤 {result.custName}\n"
-        f"📅 {result.date} {result.time}\n"
-        f"💇 {services_str}\n"
+    return ToolResult(
+        type="create_appointment",
+        data=result,
+        text=lambda: f"Appointment created successfully. ID: {result.bookingId}. Status: Pending. Business: {result.bizInfo.get('name')}.",
+        whatsAppText=lambda: format_whatsapp_appointment_create(result)
     )
-    escaped_wa = json.dumps(wa_message, ensure_ascii=True)[1:-1]
-    
-    return ToolResult(type="create_appointment", data=result, text=text, whatsAppText=escaped_wa)
 
 async def list_appointments(business_id: int, from_date: str = None, to_date: str = None, period: str = None, token: str = None, client_id: str = None) -> ToolResult:
     """List appointments with date filtering."""
@@ -65,46 +106,18 @@ async def list_appointments(business_id: int, from_date: str = None, to_date: st
 
     service = get_service(token, client_id)
     data = await service.list_appointments(business_id, from_date, to_date)
-    
-    # Text Format
-    text_lines = [f"Found {len(data)} appointments from {from_date} to {to_date}:"]
-    for appt in data:
-        start_dt = str(appt.start_time) # Convert to string if needed
-        # Try to parse and pretty print time
-        try:
-           dt_obj = datetime.strptime(appt.start_time, "%Y-%m-%dT%H:%M:%S.000+0000")
-           time_str = dt_obj.strftime("%I:%M %p")
-           date_str = dt_obj.strftime("%b %d")
-        except:
-           time_str = appt.start_time
-           date_str = ""
 
-        text_lines.append(f"- {date_str} {time_str} | {appt.customer_name} | {appt.service_name} | {appt.status}")
-    
-    text = "\n".join(text_lines)
-
-    # WhatsApp Format
-    wa_lines = [f"📅 *Appointments ({len(data)})*"]
-    for appt in data:
-        try:
-           dt_obj = datetime.strptime(appt.start_time, "%Y-%m-%dT%H:%M:%S.000+0000")
-           time_str = dt_obj.strftime("%I:%M %p")
-           date_str = dt_obj.strftime("%d %b")
-        except:
-           time_str = appt.start_time
-           date_str = ""
-           
-        wa_lines.append(
-            f"🕒 *{date_str} {time_str}*\n"
-            f"👤 {appt.customer_name}\n"
-            f"💇 {appt.service_name}\n"
-            f"ℹ️ Status: {appt.status}\n"
-        )
-    
-    wa_message = "\n".join(wa_lines)
-    escaped_wa = json.dumps(wa_message, ensure_ascii=True)[1:-1]
+    @functools.cache
+    def start_times() -> List[Optional[datetime]]:
+        # Parsed once per row and shared by whichever rendering is asked for
+        return [_parse_start_time(value) for value in column(data, "start_time")]
 
-    return ToolResult(type="list_appointments", data=data, text=text, whatsAppText=escaped_wa)
+    return ToolResult(
+        type="list_appointments",
+        data=data,
+        text=lambda: format_appointment_list(data, start_times(), from_date, to_date),
+        whatsAppText=lambda: format_whatsapp_appointment_list(data, start_times())
+    )
 
 async def get_appointment(appointment_id: str, token: str = None, client_id: str = None) -> ToolResult:
     """Get details of a specific appointment."""
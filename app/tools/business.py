@@ -1,9 +1,9 @@
-import json
 from datetime import datetime
 from app.config import settings
 from app.services.mock_service import MockService
 from app.services.java_service import JavaService
 from app.models import BusinessSummary, ToolResult
+from app.utils.whatsapp import Template, render_list
 
 def get_service(token: str = None, client_id: str = None):
     if settings.USE_MOCK_DATA:
@@ -11,81 +11,94 @@ def get_service(token: str = None, client_id: str = None):
     
     return JavaService(token, client_id)
 
-def format_whatsapp_summary(data: BusinessSummary, from_date: str, to_date: str) -> str:
-    """Format business summary for WhatsApp with encoding."""
-    business_name = "QTick" 
-    
+SUMMARY = Template(
+    "📊 *{business_name} Summary*\n"
+    "_{start} - {end} Business Summary_\n\n"
+    "✅ *Enquiries:* {data.total_leads}\n"
+    "💰 *Revenue:* ₹{data.total_revenue:,.2f}\n"
+    "📅 *Bookings:* {data.total_appointments}\n"
+    "🧾 *Bills :* {data.bills_count}\n\n"
+    "Thank you for growing with *QTick* 🚀"
+)
+# ID | Enq | Rev | Bkg
+# Aligning exactly for monospaced backticks
+# Headers use 2-byte emojis, columns are padded
+FRANCHISE_HEADER = Template(
+    "📊 *Franchise Report*\n"
+    "_{start} - {end}_\n\n"
+    "` 🆔 | ✅ | 💰 | 📅 `"
+)
+FRANCHISE_ROW = Template("\n` {bid:<2} | {enq} | {rev} | {bkg} `")
+FRANCHISE_FOOTER = Template(
+    "\n\n"
+    "🔥 *Total Performance:*\n"
+    "✅ *Enquiries:* {total.total_leads}\n"
+    "💰 *Revenue:* ₹{total.total_revenue:,.0f}\n"
+    "📅 *Bookings:* {total.total_appointments}\n"
+)
+
+def _format_range(from_date: str, to_date: str, fmt: str) -> tuple:
     try:
         start_dt = datetime.strptime(from_date, "%Y/%m/%d")
         end_dt = datetime.strptime(to_date, "%Y/%m/%d")
-        start_str = start_dt.strftime("%b %d, %Y")
-        end_str = end_dt.strftime("%b %d, %Y")
+        return start_dt.strftime(fmt), end_dt.strftime(fmt)
     except Exception:
-        start_str = from_date
-        end_str = to_date
-
-    message = (
-        f"📊 *{business_name} Summary*\n"
-        f"_{start_str} - {end_str} Business Summary_\n\n"
-        f"✅ *Enquiries:* {data.total_leads}\n"
-        f"💰 *Revenue:* ₹{data.total_revenue:,.2f}\n"
-        f"📅 *Bookings:* {data.total_appointments}\n"
-        f"🧾 *Bills :* {data.bills_count}\n\n"
-        f"Thank you for growing with *QTick* 🚀"
-    )
-    
-    escaped_message = json.dumps(message, ensure_ascii=True)[1:-1]
-    return escaped_message
+        return from_date, to_date
+
+def format_whatsapp_summary(data: BusinessSummary, from_date: str, to_date: str) -> str:
+    """Format business summary for WhatsApp with encoding."""
+    start_str, end_str = _format_range(from_date, to_date, "%b %d, %Y")
+    return SUMMARY.render(business_name="QTick", start=start_str, end=end_str, data=data)
+
+def _franchise_row(s: BusinessSummary) -> dict:
+    # Revenue: k for thousands, centered in 3 chars
+    if s.total_revenue >= 1000:
+        rev_str = f"{s.total_revenue/1000:.1f}k"[:3]
+    else:
+        rev_str = str(int(s.total_revenue))
+    return {
+        "bid": str(s.business_id)[-2:],  # Using 2 digits to keep table narrow as per screenshot
+        "enq": str(s.total_leads).center(2),
+        "rev": rev_str.center(3),
+        "bkg": str(s.total_appointments).center(2),
+    }
 
 def format_whatsapp_franchise_summary(consolidated: BusinessSummary, details: list[BusinessSummary], from_date: str, to_date: str) -> str:
     """Format franchise summary for WhatsApp with a text-based table."""
-    
-    # Format dates
-    try:
-        start_dt = datetime.strptime(from_date, "%Y/%m/%d")
-        end_dt = datetime.strptime(to_date, "%Y/%m/%d")
-        start_str = start_dt.strftime("%b %d")
-        end_str = end_dt.strftime("%b %d")
-    except Exception:
-        start_str = from_date
-        end_str = to_date
-
-    # ID | Enq | Rev | Bkg
-    # Aligning exactly for monospaced backticks
-    # Headers use 2-byte emojis, columns are padded
-    header = f"` 🆔 | ✅ | 💰 | 📅 `"
-    table_lines = [header]
-    
-    for s in details:
-        bid = str(s.business_id)[-2:] # Using 2 digits to keep table narrow as per screenshot
-        enq = str(s.total_leads).center(2)
-        
-        # Revenue: k for thousands, centered in 3 chars
-        if s.total_revenue >= 1000:
-            rev_str = f"{s.total_revenue/1000:.1f}k"[:3]
-        else:
-            rev_str = str(int(s.total_revenue))
-        rev = rev_str.center(3)
-        
-        bkg = str(s.total_appointments).center(2)
-        
-        line = f"` {bid:<2} | {enq} | {rev} | {bkg} `"
-        table_lines.append(line)
-
-    table_str = "\n".join(table_lines)
-
-    message = (
-        f"📊 *Franchise Report*\n"
-        f"_{start_str} - {end_str}_\n\n"
-        f"{table_str}\n\n"
-        f"🔥 *Total Performance:*\n"
-        f"✅ *Enquiries:* {consolidated.total_leads}\n"
-        f"💰 *Revenue:* ₹{consolidated.total_revenue:,.0f}\n"
-        f"📅 *Bookings:* {consolidated.total_appointments}\n"
+    start_str, end_str = _format_range(from_date, to_date, "%b %d")
+    return render_list(
+        FRANCHISE_HEADER, FRANCHISE_ROW, (_franchise_row(s) for s in details), row_count=len(details),
+        footer=FRANCHISE_FOOTER, start=start_str, end=end_str, total=consolidated
     )
+
+def format_summary(data: BusinessSummary, business_id: str, from_date: str, to_date: str) -> str:
+    """Plain-text business summary."""
+    return (
+        f"Business Summary for ID {business_id} from {from_date} to {to_date}:\n"
+        f"✅ Total Leads: {data.total_leads}\n"
+        f"📅 Total Appointments: {data.total_appointments}\n"
+        f"🧾 Total Bills: {data.bills_count}\n"
+        f"💰 Total Revenue: ₹{data.total_revenue:,.2f}"
+    )
+
+def format_franchise_summary(consolidated: BusinessSummary, details: list[BusinessSummary], business_ids: str, from_date: str, to_date: str) -> str:
+    """Franchise summary with a Markdown table per branch."""
+    table_lines = ["| Branch ID | Leads | Appointments | Bills | Revenue |", "|---|---|---|---|---|"]
+    table_lines.extend(
+        f"| {d.business_id} | {d.total_leads} | {d.total_appointments} | {d.bills_count} | ₹{d.total_revenue:,.2f} |"
+        for d in details
+    )
+    table = "\n".join(table_lines) + "\n"
     
-    escaped_message = json.dumps(message, ensure_ascii=True)[1:-1]
-    return escaped_message
+    return (
+        f"Franchise Summary for businesses {business_ids} from {from_date} to {to_date}:\n\n"
+        f"{table}\n"
+        f"**Totals:**\n"
+        f"✅ Total Leads: {consolidated.total_leads}\n"
+        f"📅 Total Appointments: {consolidated.total_appointments}\n"
+        f"🧾 Total Bills: {consolidated.bills_count}\n"
+        f"💰 Total Revenue: ₹{consolidated.total_revenue:,.2f}"
+    )
 
 async def get_summary_for_business(business_id: str, from_date: str = None, to_date: str = None, period: str = None, token: str = None, client_id: str = None) -> ToolResult:
     """Get a summary for a business."""
@@ -111,21 +124,13 @@ async def get_summary_for_business(business_id: str, from_date: str = None, to_d
 
     service = get_service(token, client_id)
     data = await service.get_summary_for_business(business_id, from_date, to_date)
-    text = (
-        f"Business Summary for ID {business_id} from {from_date} to {to_date}:\n"
-        f"✅ Total Leads: {data.total_leads}\n"
-        f"📅 Total Appointments: {data.total_appointments}\n"
-        f"🧾 Total Bills: {data.bills_count}\n"
-        f"💰 Total Revenue: ₹{data.total_revenue:,.2f}"
-    )
-    
-    whatsAppText = format_whatsapp_summary(data, from_date, to_date)
     
+    # Renderings are built on first access, for the reply channel only
     return ToolResult(
         type="get_summary_for_business", 
         data=data, 
-        text=text,
-        whatsAppText=whatsAppText
+        text=lambda: format_summary(data, business_id, from_date, to_date),
+        whatsAppText=lambda: format_whatsapp_summary(data, from_date, to_date)
     )
 
 async def get_franchise_summary(business_ids: str, from_date: str = None, to_date: str = None, period: str = None, token: str = None, client_id: str = None) -> ToolResult:
@@ -194,27 +199,9 @@ async def get_franchise_summary(business_ids: str, from_date: str = None, to_dat
         recent_activities=[]
     )
     
-    # Create Markdown Table
-    table_header = "| Branch ID | Leads | Appointments | Bills | Revenue |\n|---|---|---|---|---|\n"
-    table_rows = ""
-    for d in details:
-         table_rows += f"| {d.business_id} | {d.total_leads} | {d.total_appointments} | {d.bills_count} | ₹{d.total_revenue:,.2f} |\n"
-    
-    text = (
-        f"Franchise Summary for businesses {business_ids} from {from_date} to {to_date}:\n\n"
-        f"{table_header + table_rows}\n"
-        f"**Totals:**\n"
-        f"✅ Total Leads: {total_leads}\n"
-        f"📅 Total Appointments: {total_appointments}\n"
-        f"🧾 Total Bills: {bills_count}\n"
-        f"💰 Total Revenue: ₹{total_revenue:,.2f}"
-    )
-    
-    whatsAppText = format_whatsapp_franchise_summary(consolidated_data, details, from_date, to_date)
-    
     return ToolResult(
         type="get_franchise_summary",
         data=consolidated_data,
-        text=text,
-        whatsAppText=whatsAppText
+        text=lambda: format_franchise_summary(consolidated_data, details, business_ids, from_date, to_date),
+        whatsAppText=lambda: format_whatsapp_franchise_summary(consolidated_data, details, from_date, to_date)
     )
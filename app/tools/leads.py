@@ -1,50 +1,75 @@
 import logging
-import json
 from app.config import settings
 from app.services.mock_service import MockService
 from app.services.java_service import JavaService
 from app.models import Lead, LeadCreateRequest, LeadCreateResponse, LeadListResponse, ToolResult
+from app.resultsets import column_sum, count_by, top_n
+from app.utils.whatsapp import Template, render_list
 
 def get_service(token: str = None, client_id: str = None):
     if settings.USE_MOCK_DATA:
         return MockService(token)
     return JavaService(token, client_id)
 
+LEAD_CREATED = Template(
+    "🆕 *New Lead Captured!*\n\n"
+    "👤 *Name:* {lead.custName}\n"
+    "📞 *Phone:* {lead.phone}\n"
+    "📝 *Enquiry For:* {lead.enqFor}\n"
+    "💰 *Potential Value:* ₹{lead.leadValue:,.2f}\n"
+    "📍 *Status:* {lead.status}\n\n"
+    "Go to QTick to manage this lead! 🚀"
+)
+LEAD_LIST_HEADER = Template(
+    "📋 *Lead List for Biz #{business_id}*\n"
+    "👥 Total Leads: {total}\n"
+    "💰 Total Potential Value: ₹{total_value:,.2f}\n"
+    "📊 By Status: {by_status}\n"
+    "🔝 *Top 5 Leads by Value:*\n"
+)
+LEAD_LIST_ITEM = Template("{index}. *{lead.name}* (₹{lead.leadValue:,.2f}) - {lead.status}\n")
+LEAD_LIST_FOOTER = Template("\n\nGenerated by QTick AI 🤖")
+
 def format_whatsapp_lead_create(result: LeadCreateResponse) -> str:
     """Format lead creation for WhatsApp."""
-    message = (
-        f"🆕 *New Lead Captured!*\n\n"
-        f"👤 *Name:* {result.custName}\n"
-        f"📞 *Phone:* {result.phone}\n"
-        f"📝 *Enquiry For:* {result.enqFor}\n"
-        f"💰 *Potential Value:* ₹{result.leadValue:,.2f}\n"
-        f"📍 *Status:* {result.status}\n\n"
-        f"Go to QTick to manage this lead! 🚀"
-    )
-    return json.dumps(message, ensure_ascii=True)[1:-1]
+    return LEAD_CREATED.render(lead=result)
+
+def format_status_breakdown(items) -> str:
+    """Lead counts per status, most common first, e.g. "NEW 3, FOLLOW_UP 2"."""
+    counts = count_by(items, "status").most_common()
+    return ", ".join(f"{status or 'Unknown'} {count}" for status, count in counts) or "-"
 
 def format_whatsapp_lead_list(data: LeadListResponse, business_id: int) -> str:
     """Format lead list for WhatsApp."""
-    lead_count = len(data.items)
-    total_value = sum(item.leadValue for item in data.items)
-    
-    # Sort leads by value descending for the top 5 list
-    sorted_items = sorted(data.items, key=lambda x: x.leadValue, reverse=True)
+    total_value = column_sum(data.items, "leadValue")
     
-    message = f"📋 *Lead List for Biz #{business_id}*\n"
-    message += f"👥 Total Leads: {data.total}\n"
-    message += f"💰 Total Potential Value: ₹{total_value:,.2f}\n"
+    # Top 5 leads by value, by partial selection rather than sorting every lead
+    top_items = top_n(data.items, 5, "leadValue")
     
-    message += "🔝 *Top 5 Leads by Value:*\n"
-    # List top 5 leads
-    for i, item in enumerate(sorted_items[:5]):
-        message += f"{i+1}. *{item.name}* (₹{item.leadValue:,.2f}) - {item.status}\n"
-    
-    if lead_count > 5:
-        message += f"\n...and {lead_count - 5} more."
-    
-    message += "\n\nGenerated by QTick AI 🤖"
-    return json.dumps(message, ensure_ascii=True)[1:-1]
+    return render_list(
+        LEAD_LIST_HEADER, LEAD_LIST_ITEM, ({"lead": item} for item in top_items),
+        row_count=len(data.items), footer=LEAD_LIST_FOOTER,
+        business_id=business_id, total=data.total, total_value=total_value,
+        by_status=format_status_breakdown(data.items)
+    )
+
+def format_lead_table(data: LeadListResponse, business_id: int) -> str:
+    """Summary line plus a Markdown table of the leads."""
+    total_value = column_sum(data.items, "leadValue")
+    summary = f"👥 {data.total} leads found for business {business_id}. 💰 Total Potential Value: ₹{total_value:,.2f}"
+    if not data.items:
+        return summary
+    summary += f"\n📊 By status: {format_status_breakdown(data.items)}"
+
+    rows = [
+        "| Lead ID | Name | Status | Created At | Phone | Email | Source | Value |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    rows.extend(
+        f"| {item.lead_id} | {item.name} | {item.status} | {item.created_at} | {item.phone} | {item.email} | {item.source} | {item.leadValue} |"
+        for item in data.items
+    )
+    return f"{summary}\n\n" + "\n".join(rows) + "\n"
 
 async def create_lead(
     name: str, 
@@ -100,41 +125,23 @@ async def create_lead(
     result = await service.create_lead(request)
     logging.info(result)    
     
-    whatsAppText = format_whatsapp_lead_create(result)
-    
+    # Renderings are built on first access, for the reply channel only
     return ToolResult(
         type="create_lead",
         data=result,
-        text=f"Lead created successfully. ID: {result.lead_id}, Customer: {result.custName}, Phone: {result.phone}, Enquiry For: {result.enqFor}, Value: {result.leadValue}, Status: {result.status}",
-        whatsAppText=whatsAppText
+        text=lambda: f"Lead created successfully. ID: {result.lead_id}, Customer: {result.custName}, Phone: {result.phone}, Enquiry For: {result.enqFor}, Value: {result.leadValue}, Status: {result.status}",
+        whatsAppText=lambda: format_whatsapp_lead_create(result)
     )
 
 async def list_leads(business_id: int, token: str = None, client_id: str = None) -> ToolResult:
     """List all leads."""
-    print(token)
     service = get_service(token, client_id)
 
     data = await service.list_leads(int(business_id))
-    
-    # Generate text response
-    total_value = sum(item.leadValue for item in data.items)
-    summary = f"👥 {data.total} leads found for business {business_id}. 💰 Total Potential Value: ₹{total_value:,.2f}"
-    
-    # Generate Markdown table
-    if data.items:
-        table = "| Lead ID | Name | Status | Created At | Phone | Email | Source | Value |\n"
-        table += "|---|---|---|---|---|---|---|---|\n"
-        for item in data.items:
-            table += f"| {item.lead_id} | {item.name} | {item.status} | {item.created_at} | {item.phone} | {item.email} | {item.source} | {item.leadValue} |\n"
-        text = f"{summary}\n\n{table}"
-    else:
-        text = summary
-        
-    whatsAppText = format_whatsapp_lead_list(data, business_id)
 
     return ToolResult(
         type="list_leads", 
         data=data.items, 
-        text=text,
-        whatsAppText=whatsAppText
+        text=lambda: format_lead_table(data, business_id),
+        whatsAppText=lambda: format_whatsapp_lead_list(data, business_id)
     )
@@ -1,29 +1,38 @@
-import json
 from app.config import settings
 from app.services.mock_service import MockService
 from app.services.java_service import JavaService
 from app.models import ToolResult, OfferListResponse
+from app.utils.whatsapp import Template, render_list
 
 def get_service(token: str = None, client_id: str = None):
     if settings.USE_MOCK_DATA:
         return MockService(token)
     return JavaService(token, client_id)
 
+NO_OFFERS = Template("No active offers found.")
+OFFER_LIST_HEADER = Template("🎉 *Active Offers for Business #{business_id}*\n\n")
+OFFER_LIST_ITEM = Template("*{index}. {offer.title}*\n{link}\n")
+OFFER_LIST_FOOTER = Template("Grab them while they last! 🚀")
+
 def format_whatsapp_offer_list(offers: list, business_id: str) -> str:
     """Format offer list for WhatsApp."""
     if not offers:
-        return json.dumps("No active offers found.", ensure_ascii=True)[1:-1]
+        return NO_OFFERS.render()
 
-    message = f"🎉 *Active Offers for Business #{business_id}*\n\n"
-    
-    for i, offer in enumerate(offers):
-        message += f"*{i+1}. {offer.title}*\n"
-        if offer.bp_link:
-            message += f"🔗 {offer.bp_link}\n"
-        message += "\n"
-        
-    message += "Grab them while they last! 🚀"
-    return json.dumps(message, ensure_ascii=True)[1:-1]
+    rows = ({"offer": offer, "link": f"🔗 {offer.bp_link}\n" if offer.bp_link else ""} for offer in offers)
+    return render_list(
+        OFFER_LIST_HEADER, OFFER_LIST_ITEM, rows, row_count=len(offers),
+        footer=OFFER_LIST_FOOTER, business_id=business_id
+    )
+
+def format_offer_list(offers: list, business_id: str) -> str:
+    """Plain-text offer list."""
+    if not offers:
+        return f"No active offers found for business {business_id}."
+    parts = [f"Found {len(offers)} active offers for business {business_id}:\n\n"]
+    for offer in offers:
+        parts.append(f"Title: {offer.title}\nDetails: {offer.details}\nBP Link: {offer.bp_link}\n---\n")
+    return "".join(parts)
 
 async def list_offers(business_id: str, token: str = None, client_id: str = None) -> ToolResult:
     """
@@ -45,22 +54,9 @@ async def list_offers(business_id: str, token: str = None, client_id: str = None
             whatsAppText=""
         )
 
-    # Format text response
-    if not offers:
-        text = f"No active offers found for business {business_id}."
-    else:
-        text = f"Found {len(offers)} active offers for business {business_id}:\n\n"
-        for offer in offers:
-            text += f"Title: {offer.title}\n"
-            text += f"Details: {offer.details}\n"
-            text += f"BP Link: {offer.bp_link}\n"
-            text += "---\n"
-
-    whatsAppText = format_whatsapp_offer_list(offers, business_id)
-
     return ToolResult(
         type="list_offers",
         data=offers,
-        text=text,
-        whatsAppText=whatsAppText
+        text=lambda: format_offer_list(offers, business_id),
+        whatsAppText=lambda: format_whatsapp_offer_list(offers, business_id)
     )
@@ -1,26 +1,180 @@
-import dateparser
-from datetime import datetime, timezone
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta, time as dt_time
 import logging
+import re
+import threading
+from typing import Optional, Tuple
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-def parse_date_flexible(date_str: str) -> str:
+# Format required by the Java API: 2025-12-20T03:41:00.000+0000
+JAVA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+
+# Fast-path grammar for the phrases bookings actually use
+_ISO_RE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[t ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?)?"
+    r"(?:z|[+-]\d{2}:?\d{2})?$"
+)
+_DAY = r"today|tomorrow|day after tomorrow|(?:(?:next|this)\s+)?(?:" + "|".join(_WEEKDAYS) + r")"
+_DAY_THEN_TIME_RE = re.compile(rf"^(?P<day>{_DAY})(?:\s+(?P<time>.+))?$")
+_TIME_THEN_DAY_RE = re.compile(rf"^(?P<time>.+?)\s+(?P<day>{_DAY})$")
+_TIME_RE = re.compile(r"^(at\s+)?(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$")
+
+# "today at 5" means 5pm: a bare hour below this (no am/pm, no ":MM", no leading zero)
+# is read as afternoon; "07:00" and "05:30" stay as written
+BARE_HOUR_PM_BEFORE = 8
+
+# Memo of parsed strings keyed on (normalized string, local date, timezone)
+DATE_CACHE_MAXSIZE = 1024
+_date_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_date_cache_lock = threading.Lock()
+_date_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _normalize(date_str: str) -> str:
+    return " ".join(date_str.lower().replace(",", " ").split()).rstrip(".")
+
+
+def _parse_time(text: str) -> Optional[Tuple[int, int]]:
+    match = _TIME_RE.match(text)
+    if not match:
+        return None
+    at, hour_text, minute_text, meridiem = match.groups()
+    # A bare number is only a time when it says so ("at 5", "5pm", "17:00")
+    if not (at or minute_text or meridiem):
+        return None
+
+    hour = int(hour_text)
+    minute = int(minute_text or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif minute_text is None and not hour_text.startswith("0") and 1 <= hour < BARE_HOUR_PM_BEFORE:
+        hour += 12
+
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def _resolve_day(day: str, today):
+    if day == "today":
+        return today
+    if day == "tomorrow":
+        return today + timedelta(days=1)
+    if day == "day after tomorrow":
+        return today + timedelta(days=2)
+
+    prefix, _, weekday = day.rpartition(" ")
+    delta = _WEEKDAYS[weekday] - today.weekday()
+    if prefix == "this":
+        # "this friday": today or later this week
+        return today + timedelta(days=delta % 7)
+    # "monday" / "next monday": the next one strictly after today
+    return today + timedelta(days=(delta - 1) % 7 + 1)
+
+
+def _fast_parse(normalized: str, now: datetime) -> Optional[Tuple[datetime, bool]]:
     """
-    Parses a flexible date string (natural language or ISO) and returns 
-    the format required by the Java API: YYYY-MM-DDTHH:MM:SS.000+0000
+    Parses the common booking phrases without dateparser.
+    Returns (datetime, cacheable) or None when the phrase is not recognised.
+    Results without an explicit time take the current time of day (as dateparser
+    does) and are therefore not cacheable.
     """
-    if not date_str:
-        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+    match = _ISO_RE.match(normalized)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0)), True
+        except ValueError:
+            return None
+
+    match = _DAY_THEN_TIME_RE.match(normalized) or _TIME_THEN_DAY_RE.match(normalized)
+    if not match:
+        return None
+
+    day = _resolve_day(match.group("day"), now.date())
+    if match.group("time") is None:
+        return datetime.combine(day, now.time()), False
+
+    parsed_time = _parse_time(match.group("time"))
+    if parsed_time is None:
+        return None
+    return datetime.combine(day, dt_time(*parsed_time)), True
+
+
+def _parse_with_dateparser(date_str: str, now: datetime) -> Tuple[Optional[datetime], bool]:
+    # dateparser is slow to import, so it is loaded on first use (or during the
+    # startup warm-up) rather than when this module is imported
+    import dateparser
 
-    # Try parsing with dateparser
     dt = dateparser.parse(
-        date_str, 
+        date_str,
+        languages=settings.DATEPARSER_LANGUAGES or None,
         settings={
-            'RELATIVE_BASE': datetime.now(),
+            'RELATIVE_BASE': now,
             'PREFER_DATES_FROM': 'future',
             'RETURN_AS_TIMEZONE_AWARE': True
         }
     )
+    # Relative results ("in 2 hours", "tomorrow") inherit the base's microseconds;
+    # only results with an explicit time of day are safe to memoize for the day
+    cacheable = dt is not None and dt.microsecond == 0 and now.microsecond != 0
+    return dt, cacheable
+
+
+def clear_date_cache():
+    """Empties the parse memo (used by tests and benchmarks)."""
+    with _date_cache_lock:
+        _date_cache.clear()
+        _date_cache_stats["hits"] = 0
+        _date_cache_stats["misses"] = 0
+
+
+def date_cache_info() -> dict:
+    with _date_cache_lock:
+        return {**_date_cache_stats, "size": len(_date_cache), "maxsize": DATE_CACHE_MAXSIZE}
+
+
+def parse_date_flexible(date_str: str) -> str:
+    """
+    Parses a flexible date string (natural language or ISO) and returns 
+    the format required by the Java API: YYYY-MM-DDTHH:MM:SS.000+0000
+
+    Common booking phrases (ISO strings, "tomorrow 10am", "next monday 3pm",
+    "today at 5") are handled by compiled patterns; anything else goes to
+    dateparser restricted to DATEPARSER_LANGUAGES. Results that do not depend
+    on the current time of day are memoized per (phrase, local date, timezone).
+    """
+    if not date_str:
+        return datetime.now(timezone.utc).strftime(JAVA_DATETIME_FORMAT)
+
+    now = datetime.now()
+    normalized = _normalize(date_str)
+    cache_key = (normalized, now.date(), now.astimezone().strftime("%Z%z"))
+
+    with _date_cache_lock:
+        cached = _date_cache.get(cache_key)
+        if cached is not None:
+            _date_cache.move_to_end(cache_key)
+            _date_cache_stats["hits"] += 1
+            return cached
+        _date_cache_stats["misses"] += 1
+
+    fast = _fast_parse(normalized, now)
+    if fast:
+        dt, cacheable = fast
+        logger.debug(f"Fast-path parsed '{date_str}' -> {dt}")
+    else:
+        dt, cacheable = _parse_with_dateparser(date_str, now)
 
     # Fallback for "next X" which dateparser sometimes struggles with
     if not dt and "next" in date_str.lower():
@@ -44,7 +198,36 @@ def parse_date_flexible(date_str: str) -> str:
     
     # Ensure it's in UTC/canonical format for Java
     # Format: 2025-12-20T03:41:00.000+0000
-    return dt.strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+    result = dt.strftime(JAVA_DATETIME_FORMAT)
+
+    if cacheable:
+        with _date_cache_lock:
+            _date_cache[cache_key] = result
+            while len(_date_cache) > DATE_CACHE_MAXSIZE:
+                _date_cache.popitem(last=False)
+    return result
+
+def _parses_inline(date_str: str) -> bool:
+    """True when parse_date_flexible would answer from the memo or the compiled patterns, without dateparser."""
+    if not date_str:
+        return True
+    now = datetime.now()
+    normalized = _normalize(date_str)
+    with _date_cache_lock:
+        if (normalized, now.date(), now.astimezone().strftime("%Z%z")) in _date_cache:
+            return True
+    return _fast_parse(normalized, now) is not None
+
+
+async def parse_date_flexible_async(date_str: str) -> str:
+    """
+    parse_date_flexible for async callers. Cheap phrases are parsed inline;
+    those that need dateparser (CPU-heavy) run on the offload pool.
+    """
+    if _parses_inline(date_str):
+        return parse_date_flexible(date_str)
+    from app.utils.offload import run_blocking
+    return await run_blocking(parse_date_flexible, date_str)
 
 def get_date_range(period: str):
     """
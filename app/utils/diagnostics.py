@@ -0,0 +1,203 @@
+"""
+Memory and connection-leak diagnostics.
+
+Objects that own sockets (httpx.AsyncClient, JavaService) are registered
+with track() when created. The weak registries let the live counts be read
+on every /metrics scrape at no cost. A count that only ever goes up on the
+dashboard is a leak, long before the OOM killer finds it. Alongside them:
+
+- resident memory, open file descriptors and sockets (from /proc on Linux);
+- connection-pool occupancy of every tracked client;
+- tracemalloc top allocators, and the diff against a baseline snapshot
+  (POST /debug/memory/baseline, then GET /debug/memory once memory has grown).
+
+tracemalloc slows allocation down, so it only runs when
+MEMORY_TRACEMALLOC_FRAMES > 0 or once a baseline is requested.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+import weakref
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.metrics import Gauge
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_tracked: Dict[str, "weakref.WeakSet"] = {}
+_baseline: Optional[tracemalloc.Snapshot] = None
+
+_FD_DIR = "/proc/self/fd"
+
+
+def track(obj: Any, kind: str = None) -> Any:
+    """Registers obj in the live count for its kind (class name by default); returns obj."""
+    kind = kind or type(obj).__name__
+    _tracked.setdefault(kind, weakref.WeakSet()).add(obj)
+    return obj
+
+
+def live_count(kind: str) -> int:
+    return len(_tracked.get(kind, ()))
+
+
+def live_counts() -> Dict[str, int]:
+    return {kind: len(objects) for kind, objects in _tracked.items()}
+
+
+def scan_live_instances(*types: type) -> Dict[str, int]:
+    """
+    Counts instances on the whole heap (gc), including ones created by third-party
+    code that never went through track(). O(heap), so on demand only.
+    """
+    counts = {t.__name__: 0 for t in types}
+    for obj in gc.get_objects():
+        for t in types:
+            if isinstance(obj, t):
+                counts[t.__name__] += 1
+    return counts
+
+
+def open_fds() -> Dict[str, int]:
+    """Open file descriptors by kind (socket, pipe, file, ...) plus the soft limit."""
+    counts: Dict[str, int] = {"total": 0}
+    try:
+        names = os.listdir(_FD_DIR)
+    except OSError:
+        return counts
+    for name in names:
+        try:
+            target = os.readlink(os.path.join(_FD_DIR, name))
+        except OSError:
+            continue
+        kind = target.split(":", 1)[0] if ":" in target and not target.startswith("/") else "file"
+        counts[kind] = counts.get(kind, 0) + 1
+        counts["total"] += 1
+    if resource is not None:
+        counts["limit"] = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    return counts
+
+
+def rss_bytes() -> int:
+    if resource is None:
+        return 0
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Peak rather than current RSS; ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def pool_occupancy(client) -> Dict[str, Any]:
+    """Connections held by an httpx.AsyncClient's pool: open, idle, in use and requests waiting for one."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", ()) or ())
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "closed": client.is_closed,
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+        "queued": sum(1 for request in getattr(pool, "_requests", ()) or () if request.is_queued()),
+    }
+
+
+def pool_totals() -> Dict[str, int]:
+    totals = {"clients": 0, "open_clients": 0, "connections": 0, "idle": 0, "active": 0}
+    for client in list(_tracked.get("httpx.AsyncClient", ())):
+        occupancy = pool_occupancy(client)
+        totals["clients"] += 1
+        totals["open_clients"] += not occupancy["closed"]
+        for key in ("connections", "idle", "active"):
+            totals[key] += occupancy[key]
+    return totals
+
+
+def start_tracing(frames: int = None) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames or settings.MEMORY_TRACEMALLOC_FRAMES or 1)
+
+
+def stop_tracing() -> None:
+    """Stops tracemalloc and drops the baseline."""
+    global _baseline
+    _baseline = None
+    tracemalloc.stop()
+
+
+def take_baseline() -> Dict[str, Any]:
+    """Starts tracemalloc if needed and stores the snapshot later reports are diffed against."""
+    global _baseline
+    start_tracing()
+    _baseline = tracemalloc.take_snapshot()
+    return {"traced_bytes": tracemalloc.get_traced_memory()[0], "frames": tracemalloc.get_traceback_limit()}
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+
+
+def _stat(stat) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    entry = {"where": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
+    if hasattr(stat, "size_diff"):
+        entry.update(size_diff_bytes=stat.size_diff, count_diff=stat.count_diff)
+    return entry
+
+
+def allocation_report(limit: int = 20) -> Dict[str, Any]:
+    if not tracemalloc.is_tracing():
+        return {"tracing": False}
+    snapshot = _filtered(tracemalloc.take_snapshot())
+    current, peak = tracemalloc.get_traced_memory()
+    report = {
+        "tracing": True,
+        "traced_bytes": current,
+        "peak_traced_bytes": peak,
+        "top": [_stat(stat) for stat in snapshot.statistics("lineno")[:limit]],
+    }
+    if _baseline is not None:
+        diff = snapshot.compare_to(_filtered(_baseline), "lineno")
+        report["growth_since_baseline"] = [_stat(stat) for stat in diff[:limit] if stat.size_diff > 0]
+    return report
+
+
+def memory_report(limit: int = 20, scan: bool = False) -> Dict[str, Any]:
+    report = {
+        "rss_bytes": rss_bytes(),
+        "fds": open_fds(),
+        "live_objects": live_counts(),
+        "pools": pool_totals(),
+        "allocations": allocation_report(limit),
+    }
+    if scan:
+        import httpx
+        from app.services.java_service import JavaService
+        report["heap_instances"] = scan_live_instances(httpx.AsyncClient, JavaService)
+    return report
+
+
+PROCESS_RSS = Gauge("process_resident_memory_bytes", "Resident memory of this worker", callback=rss_bytes)
+PROCESS_FDS = Gauge("process_open_fds", "Open file descriptors", callback=lambda: open_fds()["total"])
+PROCESS_SOCKETS = Gauge("process_open_sockets", "Open sockets", callback=lambda: open_fds().get("socket", 0))
+LIVE_ASYNC_CLIENTS = Gauge("httpx_async_clients_live", "httpx.AsyncClient objects not yet garbage collected",
+                           callback=lambda: live_count("httpx.AsyncClient"))
+OPEN_ASYNC_CLIENTS = Gauge("httpx_async_clients_open", "Tracked httpx.AsyncClient objects never closed",
+                           callback=lambda: pool_totals()["open_clients"])
+LIVE_JAVA_SERVICES = Gauge("java_services_live", "JavaService objects not yet garbage collected",
+                           callback=lambda: live_count("JavaService"))
+POOL_CONNECTIONS = Gauge("httpx_pool_connections", "Connections held open by tracked httpx clients",
+                         callback=lambda: pool_totals()["connections"])
+POOL_ACTIVE = Gauge("httpx_pool_connections_active", "Tracked httpx connections currently serving a request",
+                    callback=lambda: pool_totals()["active"])
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Each older turn is collapsed to at most this many tokens in the running summary
+SUMMARY_LINE_TOKENS = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap local token estimate (no tokenizer dependency).
+    Counts words and punctuation marks, but never less than len/4 so long unbroken
+    strings (URLs, pasted data) are not under-counted.
+    """
+    if not text:
+        return 0
+    return max(len(_TOKEN_RE.findall(text)), len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trims text to roughly max_tokens, marking the cut with an ellipsis."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # ~4 characters per token keeps this consistent with estimate_tokens
+    return text[: max(max_tokens, 1) * 4].rstrip() + "…"
+
+
+def _summarize_turn(message: Dict[str, str]) -> str:
+    speaker = "User" if message.get("role") == "user" else "Assistant"
+    content = _WHITESPACE_RE.sub(" ", message.get("content", "")).strip()
+    first_sentence = _SENTENCE_END_RE.split(content, maxsplit=1)[0]
+    return f"{speaker}: {truncate_to_tokens(first_sentence, SUMMARY_LINE_TOKENS)}"
+
+
+def _fingerprint(turns: List[Dict[str, str]]) -> str:
+    digest = hashlib.sha1()
+    for turn in turns:
+        digest.update(turn.get("role", "").encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(turn.get("content", "").encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class HistoryCompactor:
+    """
+    Keeps chat history within a token budget.
+
+    The newest turns are kept verbatim until `token_budget` is used up; everything
+    older is collapsed into a short running summary. Summaries are cached per
+    conversation and extended incrementally as the conversation grows, so each
+    request only summarizes the turns that newly fell out of the window.
+    """
+
+    def __init__(self, token_budget: int, summary_token_budget: int, max_conversations: int = 1000):
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.max_conversations = max_conversations
+        # key -> (number of turns summarized, fingerprint of those turns, summary lines)
+        self._summaries: "OrderedDict[str, Tuple[int, str, List[str]]]" = OrderedDict()
+
+    def compact(self, history: List[Dict[str, str]], conversation_id: Optional[str] = None) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Splits history into (summary_of_older_turns, recent_turns).
+        conversation_id keys the summary cache; without it the first turn of the
+        history is used, which stays stable as clients append new turns.
+        """
+        turns = [msg for msg in history if msg.get("content")]
+
+        recent: List[Dict[str, str]] = []
+        used = 0
+        for msg in reversed(turns):
+            cost = estimate_tokens(msg["content"])
+            if used + cost > self.token_budget:
+                if not recent:
+                    # The newest turn alone exceeds the budget: keep a trimmed copy of it
+                    recent.append({**msg, "content": truncate_to_tokens(msg["content"], self.token_budget)})
+                    used = self.token_budget
+                break
+            recent.append(msg)
+            used += cost
+        recent.reverse()
+
+        older = turns[: len(turns) - len(recent)]
+        summary = self._summarize(older, conversation_id) if older else ""
+
+        logger.info(
+            f"History compaction: {len(turns)} turns -> {len(recent)} recent (~{used} tokens)"
+            f" + {len(older)} summarized (~{estimate_tokens(summary)} tokens)"
+        )
+        return summary, recent
+
+    def _summarize(self, older: List[Dict[str, str]], conversation_id: Optional[str]) -> str:
+        key = conversation_id or _fingerprint(older[:1])
+        cached = self._summaries.get(key)
+
+        count, lines = 0, []
+        if cached:
+            cached_count, cached_fingerprint, cached_lines = cached
+            # Reuse only if the cached turns are still the prefix of this history
+            if cached_count <= len(older) and _fingerprint(older[:cached_count]) == cached_fingerprint:
+                count, lines = cached_count, list(cached_lines)
+
+        for msg in older[count:]:
+            lines.append(_summarize_turn(msg))
+
+        # Drop the oldest lines until the summary fits its budget
+        while len(lines) > 1 and sum(estimate_tokens(line) for line in lines) > self.summary_token_budget:
+            lines.pop(0)
+
+        self._summaries[key] = (len(older), _fingerprint(older), lines)
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.max_conversations:
+            self._summaries.popitem(last=False)
+
+        return "\n".join(lines)
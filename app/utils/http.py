@@ -0,0 +1,33 @@
+"""
+Process-wide httpx.AsyncClient for outbound calls that are not made through
+JavaService. It keeps a single connection pool, so requests reuse connections
+instead of opening a new client (and its sockets) each time. The client is
+closed from the app lifespan.
+"""
+from typing import Optional
+
+import httpx
+
+from app.utils.diagnostics import track
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = track(httpx.AsyncClient(timeout=10, follow_redirects=True), "httpx.AsyncClient")
+    return _client
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Replaces the shared client (tests use this to install a mock transport)."""
+    global _client
+    _client = client
+
+
+async def close_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,237 @@
+"""
+LLM usage and latency accounting.
+
+Every LLM request goes through a UsageTracker, one per chat request. The
+tracker records these for each call:
+- prompt, completion and cached tokens (from the SDK response);
+- latency, including retries;
+- how many retries it took.
+
+Retries are done here (LLM_MAX_RETRIES, transient errors only, exponential
+backoff) instead of inside the SDK, so they can be counted. Each call is
+tagged with:
+- provider and model;
+- route: the HTTP route that triggered it;
+- tool: the first tool the model chose for the request;
+- business_id.
+
+When the request finishes, the tracker:
+- exports the calls as metrics, labelled by provider/model/route/tool.
+  business_id is left out of the labels to bound cardinality.
+- adds them to the per-business daily usage table (SQLite,
+  LLM_USAGE_DB_PATH). The write happens on the offload pool, off the
+  request path.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import Counter, Summary
+
+logger = logging.getLogger(__name__)
+
+# HTTP route of the request being served, set by the app's middleware
+current_route: contextvars.ContextVar = contextvars.ContextVar("current_route", default="")
+
+NO_TOOL = "none"
+
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by provider, model, route, first tool and outcome")
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by provider, model, route, first tool and kind (prompt, completion, cached)")
+LLM_RETRIES = Counter("llm_retries_total", "Retried LLM calls by provider and model")
+LLM_LATENCY = Summary("llm_call_latency_seconds", "LLM call latency including retries, by provider, model and route")
+
+# Exception class names (OpenAI and Google SDKs) worth retrying
+_TRANSIENT_ERRORS = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted", "TooManyRequests", "GatewayTimeout",
+}
+_TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in _TRANSIENT_ERRORS:
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return isinstance(status, int) and status in _TRANSIENT_STATUS
+
+
+def token_usage(response: Any) -> Tuple[int, int, int]:
+    """(prompt, completion, cached) tokens of an OpenAI or Gemini response; zeros when not reported."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return (getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0,
+                getattr(details, "cached_tokens", 0) or 0)
+    meta = getattr(response, "usage_metadata", None)
+    if meta is not None:
+        return (getattr(meta, "prompt_token_count", 0) or 0, getattr(meta, "candidates_token_count", 0) or 0,
+                getattr(meta, "cached_content_token_count", 0) or 0)
+    return 0, 0, 0
+
+
+class LLMCall:
+    def __init__(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int,
+                 latency_ms: float, retries: int, error: Optional[str] = None):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+        self.latency_ms = latency_ms
+        self.retries = retries
+        self.error = error
+
+
+class UsageTracker:
+    def __init__(self, provider: str, model: str, business_id: Any = None, route: str = None):
+        self.provider = provider
+        self.model = model
+        self.business_id = business_id
+        self.route = route or current_route.get() or "unknown"
+        self.tool: Optional[str] = None
+        self.calls: List[LLMCall] = []
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits request(), retrying transient failures, and records the call."""
+        started = time.perf_counter()
+        retries = 0
+        while True:
+            try:
+                response = await request()
+                break
+            except Exception as exc:
+                if retries < settings.LLM_MAX_RETRIES and is_transient(exc):
+                    retries += 1
+                    logger.warning(f"{self.provider} call failed ({type(exc).__name__}), retry {retries}/{settings.LLM_MAX_RETRIES}")
+                    await asyncio.sleep(settings.LLM_RETRY_BACKOFF_MS / 1000 * 2 ** (retries - 1))
+                    continue
+                self.calls.append(LLMCall(0, 0, 0, (time.perf_counter() - started) * 1000, retries, type(exc).__name__))
+                raise
+        self.calls.append(LLMCall(*token_usage(response), (time.perf_counter() - started) * 1000, retries))
+        return response
+
+    def chose_tool(self, name: str) -> None:
+        """Tags the request with the first tool the model picked."""
+        if self.tool is None:
+            self.tool = name
+
+    def totals(self) -> Dict[str, Any]:
+        return {
+            "calls": len(self.calls),
+            "prompt_tokens": sum(c.prompt_tokens for c in self.calls),
+            "completion_tokens": sum(c.completion_tokens for c in self.calls),
+            "cached_tokens": sum(c.cached_tokens for c in self.calls),
+            "latency_ms": sum(c.latency_ms for c in self.calls),
+            "max_latency_ms": max((c.latency_ms for c in self.calls), default=0.0),
+            "retries": sum(c.retries for c in self.calls),
+            "errors": sum(1 for c in self.calls if c.error),
+        }
+
+    def finish(self) -> None:
+        """Exports the request's calls to metrics and queues them for the daily usage table."""
+        if not self.calls:
+            return
+        tool = self.tool or NO_TOOL
+        labels = {"provider": self.provider, "model": self.model, "route": self.route}
+        for call in self.calls:
+            LLM_CALLS.inc(**labels, tool=tool, outcome="error" if call.error else "ok")
+            LLM_LATENCY.observe(call.latency_ms / 1000, **labels)
+            for kind, tokens in (("prompt", call.prompt_tokens), ("completion", call.completion_tokens), ("cached", call.cached_tokens)):
+                if tokens:
+                    LLM_TOKENS.inc(tokens, **labels, tool=tool, kind=kind)
+            if call.retries:
+                LLM_RETRIES.inc(call.retries, provider=self.provider, model=self.model)
+
+        store = get_usage_store()
+        if store is not None:
+            from app.utils.offload import submit_blocking
+            row = dict(day=date.today().isoformat(), business_id=str(self.business_id or ""), tool=tool, **labels, **self.totals())
+            submit_blocking(store.add, row)
+
+
+class UsageStore:
+    """Per-business daily LLM usage in SQLite, one row per (day, business, provider, model, route, tool)."""
+
+    KEY = ("day", "business_id", "provider", "model", "route", "tool")
+    SUMS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_ms", "retries", "errors")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_usage_daily ("
+                " day TEXT NOT NULL, business_id TEXT NOT NULL, provider TEXT NOT NULL,"
+                " model TEXT NOT NULL, route TEXT NOT NULL, tool TEXT NOT NULL,"
+                " calls INTEGER NOT NULL, prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL,"
+                " cached_tokens INTEGER NOT NULL, latency_ms REAL NOT NULL, max_latency_ms REAL NOT NULL,"
+                " retries INTEGER NOT NULL, errors INTEGER NOT NULL,"
+                " PRIMARY KEY (day, business_id, provider, model, route, tool))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def add(self, row: Dict[str, Any]) -> None:
+        columns = self.KEY + self.SUMS + ("max_latency_ms",)
+        updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in self.SUMS)
+        self._connect().execute(
+            f"INSERT INTO llm_usage_daily ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(self.KEY)}) DO UPDATE SET {updates}, "
+            "max_latency_ms = MAX(max_latency_ms, excluded.max_latency_ms)",
+            [row[name] for name in columns],
+        )
+
+    def daily(self, day: str = None, business_id: str = None) -> List[Dict[str, Any]]:
+        """Usage per business for a day (default today), heaviest prompt-token users first."""
+        query = "SELECT * FROM llm_usage_daily WHERE day = ?"
+        params: List[Any] = [day or date.today().isoformat()]
+        if business_id:
+            query += " AND business_id = ?"
+            params.append(str(business_id))
+        cursor = self._connect().execute(query + " ORDER BY prompt_tokens DESC, latency_ms DESC", params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, values)) for values in cursor.fetchall()]
+
+
+_store: Optional[UsageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_usage_store() -> Optional[UsageStore]:
+    """The daily usage table, or None when LLM_USAGE_DB_PATH is empty."""
+    global _store
+    if not settings.LLM_USAGE_DB_PATH:
+        return None
+    with _store_lock:
+        if _store is None or _store.db_path != settings.LLM_USAGE_DB_PATH:
+            _store = UsageStore(settings.LLM_USAGE_DB_PATH)
+        return _store
+
+
+class RouteContextMiddleware:
+    """ASGI middleware that exposes the request path to UsageTracker via current_route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = current_route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,193 @@
+"""
+Opt-in event-loop watchdog (LOOP_MONITOR_ENABLED=true).
+
+Two halves:
+
+- A ticker task on the loop sleeps LOOP_MONITOR_INTERVAL_MS at a time and
+  records how late each wake-up was. That lateness is the loop lag every
+  request waiting on the loop also sees. It is published as the
+  event_loop_lag_seconds summary on /metrics.
+- A watchdog thread notices when the ticker has not run for longer than
+  LOOP_MONITOR_BLOCK_MS. While the loop is still stuck, it captures the loop
+  thread's stack, so the report shows the call that is blocking, not just
+  that something did. Stalls are grouped by the innermost frame in our own
+  code into the offender report served by /debug/loop.
+
+A blocking call fixed on the request path disappears from the offenders and
+from the lag tail; the report gives proof of both.
+"""
+import asyncio
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.metrics import Counter, Summary
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = Summary("event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up", quantiles=(0.5, 0.9, 0.99, 0.999))
+LOOP_BLOCKED = Counter("event_loop_blocked_total", "Event loop stalls longer than the block threshold, by offending frame")
+
+# Frames under this directory are "ours" when picking the frame to blame
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _blame(stack: traceback.StackSummary) -> traceback.FrameSummary:
+    """Innermost frame in app code (the call we can change), else the innermost frame."""
+    for frame in reversed(stack):
+        if frame.filename.startswith(_APP_DIR) and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+
+def _ms(seconds: float) -> Optional[float]:
+    return None if math.isnan(seconds) else round(seconds * 1000, 3)
+
+
+class Offender:
+    def __init__(self, where: str, stack: List[str]):
+        self.where = where
+        self.stack = stack
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "where": self.where, "count": self.count, "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1), "last_seen": self.last_seen, "stack": self.stack,
+        }
+
+
+class LoopMonitor:
+    def __init__(self, interval_ms: float = None, block_ms: float = None, max_offenders: int = None, stack_depth: int = 25):
+        self.interval = (interval_ms if interval_ms is not None else settings.LOOP_MONITOR_INTERVAL_MS) / 1000
+        self.block_threshold = (block_ms if block_ms is not None else settings.LOOP_MONITOR_BLOCK_MS) / 1000
+        self.max_offenders = max_offenders if max_offenders is not None else settings.LOOP_MONITOR_MAX_OFFENDERS
+        self.stack_depth = stack_depth
+        self.offenders: Dict[str, Offender] = {}
+        # This monitor's own window for report(); LOOP_LAG is the process-wide metric
+        self.lag = Summary("loop_monitor_lag_seconds", "", quantiles=LOOP_LAG.quantiles, registry=None)
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._stalled: Optional[Offender] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts both halves; call from a coroutine running on the loop to watch."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = loop.create_task(self._tick(), name="loop-monitor")
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event loop monitor started (interval {self.interval * 1000:.0f} ms, block threshold {self.block_threshold * 1000:.0f} ms)")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            LOOP_LAG.observe(lag)
+            self.lag.observe(lag)
+            self._heartbeat = time.monotonic()
+            if self._stalled is not None:
+                self._end_stall(lag)
+
+    def _watch(self) -> None:
+        poll = max(self.block_threshold / 4, 0.005)
+        while not self._stopping.wait(poll):
+            silent_for = time.monotonic() - self._heartbeat
+            if self._stalled is None and silent_for > self.interval + self.block_threshold:
+                self._capture()
+
+    def _capture(self) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)[-self.stack_depth:]
+        blamed = _blame(stack)
+        where = f"{os.path.relpath(blamed.filename, os.path.dirname(_APP_DIR))}:{blamed.lineno} in {blamed.name}"
+        with self._lock:
+            offender = self.offenders.get(where)
+            if offender is None:
+                if len(self.offenders) >= self.max_offenders:
+                    # Make room by dropping the least frequent offender
+                    del self.offenders[min(self.offenders, key=lambda key: self.offenders[key].count)]
+                offender = self.offenders[where] = Offender(where, traceback.format_list(stack))
+            offender.stack = traceback.format_list(stack)
+            offender.count += 1
+            offender.last_seen = time.time()
+            self._stalled = offender
+        LOOP_BLOCKED.inc(where=where)
+        logger.warning(f"Event loop blocked for over {self.block_threshold * 1000:.0f} ms at {where}")
+
+    def _end_stall(self, lag: float) -> None:
+        with self._lock:
+            offender, self._stalled = self._stalled, None
+            if offender is not None:
+                duration_ms = (lag + self.interval) * 1000
+                offender.total_ms += duration_ms
+                offender.max_ms = max(offender.max_ms, duration_ms)
+
+    def report(self) -> Dict[str, Any]:
+        lag = self.lag.snapshot()
+        with self._lock:
+            offenders = sorted(self.offenders.values(), key=lambda o: o.total_ms, reverse=True)
+            return {
+                "enabled": self.running,
+                "interval_ms": self.interval * 1000,
+                "block_threshold_ms": self.block_threshold * 1000,
+                "lag_ms": {name: _ms(value) if name != "count" else value for name, value in lag.items()},
+                "offenders": [offender.as_dict() for offender in offenders],
+            }
+
+
+# The monitor started by the app lifespan, when enabled
+monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor() -> LoopMonitor:
+    global monitor
+    if monitor is None or not monitor.running:
+        monitor = LoopMonitor()
+        monitor.start()
+    return monitor
+
+
+async def stop_loop_monitor() -> None:
+    if monitor is not None:
+        await monitor.stop()
+
+
+def loop_report() -> Dict[str, Any]:
+    if monitor is None:
+        return {"enabled": False, "offenders": []}
+    return monitor.report()
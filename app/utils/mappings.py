@@ -1,6 +1,22 @@
+import csv
 import json
+import logging
 import os
-from typing import Optional
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
 
 MAPPINGS_FILE = "data/phone_mappings.json"
 
@@ -10,44 +26,429 @@ INITIAL_DATA = {
     "919080534415": 11,
 }
 
-def _load_mappings() -> dict:
-    if not os.path.exists(MAPPINGS_FILE):
-        return INITIAL_DATA
-    
+# Journal entries are folded back into the JSON snapshot after this many writes
+COMPACT_AFTER = 1000
+
+
+def normalize_phone(phone_number: str) -> str:
+    return "".join(filter(str.isdigit, phone_number))
+
+
+def _parse_country_codes(spec: str) -> Dict[str, int]:
+    codes = {}
+    for item in spec.split(","):
+        if ":" in item:
+            code, local_length = item.split(":", 1)
+            codes[code.strip()] = int(local_length)
+    return codes
+
+
+COUNTRY_CODES = _parse_country_codes(settings.PHONE_COUNTRY_CODES)
+
+
+def canonical_phone(phone_number: str) -> str:
+    """
+    Digits-only phone with country code, so "+65 9270 1525", "0065 92701525"
+    and "9270 1525" all map to "6592701525". Numbers that match no configured
+    country pattern are kept as plain digits.
+    """
+    digits = normalize_phone(phone_number)
+    if digits.startswith("00"):  # international dialling prefix
+        digits = digits[2:]
+    for code, local_length in COUNTRY_CODES.items():
+        if digits.startswith(code) and len(digits) == len(code) + local_length:
+            return digits
+    default_length = COUNTRY_CODES.get(settings.PHONE_DEFAULT_COUNTRY_CODE)
+    if default_length and len(digits) == default_length:
+        return settings.PHONE_DEFAULT_COUNTRY_CODE + digits
+    return digits
+
+
+# (line number, phone, business_id) rows accepted by bulk import
+ImportRow = Tuple[int, str, int]
+# (line number, reason) for rows that were rejected
+RejectedRow = Tuple[int, str]
+
+
+def iter_import_rows(lines: Iterable[str], fmt: str, errors: List[RejectedRow]) -> Iterator[ImportRow]:
+    """
+    Parses a CSV (header: phone,business_id) or JSONL ({"phone": ..., "business_id": ...})
+    stream of mappings line by line. Malformed lines are appended to `errors`.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            line_no = reader.line_num
+            try:
+                yield line_no, canonical_phone(record["phone"]), int(record["business_id"])
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append((line_no, f"invalid row: {e}"))
+        return
+
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield line_no, canonical_phone(str(record["phone"])), int(record["business_id"])
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append((line_no, f"invalid row: {e}"))
+
+
+class MappingStore(ABC):
+    """Storage backend for phone -> business ID mappings (see MAPPINGS_BACKEND)."""
+
+    @abstractmethod
+    def get(self, phone_number: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def add(self, phone_number: str, business_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def add_many(self, rows: Iterable[ImportRow]) -> Tuple[int, List[RejectedRow]]:
+        """Registers many mappings at once. Returns (imported count, rejected rows)."""
+        pass
+
+
+@contextmanager
+def _interprocess_lock(lock_path: str):
+    """Exclusive lock shared by every worker process using the same mappings file."""
+    with open(lock_path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _file_signature(path: str):
     try:
-        with open(MAPPINGS_FILE, "r") as f:
-            data = json.load(f)
-            return data if data else INITIAL_DATA
-    except (json.JSONDecodeError, IOError):
-        return INITIAL_DATA
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class PhoneMappingRegistry(MappingStore):
+    """
+    In-memory phone -> business index backed by the JSON mappings file.
+
+    Storage is a JSON snapshot (`phone_mappings.json`, same format as before)
+    plus an append-only journal of registrations (`.journal`, one JSON object
+    per line). Lookups check the files' signatures and only read what changed,
+    so they are O(1) and still see registrations made by other workers.
+    Registrations append one journal line under a cross-process lock; every
+    `compact_after` entries the snapshot is rewritten atomically (temp file +
+    rename) and the journal is truncated.
+    """
+
+    def __init__(self, path: str = MAPPINGS_FILE, compact_after: int = COMPACT_AFTER):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.compact_after = compact_after
+
+        self._phone_to_biz: Dict[str, int] = {}
+        self._biz_to_phones: Dict[int, Set[str]] = {}
+        self._snapshot_signature = ()  # never equal to a real signature, forces the first load
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._lock = threading.Lock()
+
+    # Index maintenance
+
+    def _set(self, phone: str, business_id: int):
+        previous = self._phone_to_biz.get(phone)
+        if previous is not None:
+            phones = self._biz_to_phones.get(previous)
+            if phones:
+                phones.discard(phone)
+                if not phones:
+                    del self._biz_to_phones[previous]
+        self._phone_to_biz[phone] = business_id
+        self._biz_to_phones.setdefault(business_id, set()).add(phone)
+
+    def _load_snapshot(self):
+        data = INITIAL_DATA
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f) or INITIAL_DATA
+            except (json.JSONDecodeError, IOError):
+                logger.error(f"Could not read {self.path}, using initial mappings")
+
+        self._phone_to_biz = {}
+        self._biz_to_phones = {}
+        # Keys are canonicalized like lookups, so hand-edited or older files still match
+        for phone, business_id in data.items():
+            self._set(canonical_phone(phone), int(business_id))
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def _apply_journal(self):
+        journal_signature = _file_signature(self.journal_path)
+        journal_size = journal_signature[2] if journal_signature else 0
+        if journal_size < self._journal_offset:
+            # Truncated by another worker's compaction; the snapshot has those entries
+            self._load_snapshot()
+            self._snapshot_signature = _file_signature(self.path)
+        if journal_size <= self._journal_offset:
+            return
+
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            chunk = f.read(journal_size - self._journal_offset)
+
+        # Only consume complete lines; a partial line is picked up on the next refresh
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                self._set(canonical_phone(entry["phone"]), int(entry["business_id"]))
+                self._journal_entries += 1
+            except (ValueError, KeyError) as e:
+                logger.error(f"Skipping bad journal line in {self.journal_path}: {e}")
+        self._journal_offset += len(complete)
+
+    def _refresh(self):
+        # Readers take no lock. A compaction in another worker replaces the snapshot,
+        # then truncates and refills the journal; if the snapshot changed while the
+        # journal was read, those lines may come from the new journal at a stale
+        # offset, so start over from the new snapshot.
+        while True:
+            signature = _file_signature(self.path)
+            if signature != self._snapshot_signature:
+                self._load_snapshot()
+                self._snapshot_signature = signature
+            self._apply_journal()
+            if _file_signature(self.path) == self._snapshot_signature:
+                return
+
+    def _compact(self):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".phone_mappings.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._phone_to_biz, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        # Only truncate once the snapshot holds every journal entry
+        open(self.journal_path, "w").close()
+        self._snapshot_signature = _file_signature(self.path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+        logger.info(f"Compacted phone mappings into {self.path} ({len(self._phone_to_biz)} entries)")
+
+    # Public API
+
+    def get(self, phone_number: str) -> Optional[int]:
+        normalized_phone = canonical_phone(phone_number)
+        with self._lock:
+            self._refresh()
+            return self._phone_to_biz.get(normalized_phone)
+
+    def add(self, phone_number: str, business_id: int) -> bool:
+        imported, rejected = self.add_many([(0, canonical_phone(phone_number), business_id)])
+        return not rejected
+
+    def add_many(self, rows: Iterable[ImportRow]) -> Tuple[int, List[RejectedRow]]:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        imported = 0
+        rejected: List[RejectedRow] = []
+
+        with self._lock, _interprocess_lock(self.lock_path):
+            # Pick up other workers' registrations before checking uniqueness
+            self._refresh()
+
+            lines = []
+            try:
+                for line_no, phone, business_id in rows:
+                    # A business ID can only be assigned to one phone number
+                    if self._biz_to_phones.get(business_id, set()) - {phone}:
+                        rejected.append((line_no, f"business ID {business_id} is already assigned to another phone number"))
+                        continue
+                    imported += 1
+                    if self._phone_to_biz.get(phone) == business_id:
+                        continue
+                    self._set(phone, business_id)
+                    lines.append(json.dumps({"phone": phone, "business_id": business_id}) + "\n")
+            except Exception:
+                # Nothing was written; drop the half-applied index so the next refresh reloads it
+                self._snapshot_signature = ()
+                raise
+
+            if lines:
+                data = "".join(lines).encode("utf-8")
+                with open(self.journal_path, "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_offset += len(data)
+                self._journal_entries += len(lines)
+
+                if self._journal_entries >= self.compact_after:
+                    self._compact()
+        return imported, rejected
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of every mapping (used to seed other backends)."""
+        with self._lock:
+            self._refresh()
+            return dict(self._phone_to_biz)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._phone_to_biz)
+
+
+class SqliteMappingStore(MappingStore):
+    """
+    SQLite (WAL mode) mapping store for large registries.
+
+    `phone` is the primary key. The one-phone-per-business rule is checked
+    inside each write transaction (BEGIN IMMEDIATE serializes writers), so it
+    holds across worker processes. As with the JSON backend it only applies to
+    new registrations: seeded mappings that already share a business ID are
+    all kept. Each thread gets its own connection. On first use an empty
+    database is seeded from the JSON mappings file.
+    """
+
+    def __init__(self, db_path: str = None, seed_json_path: Optional[str] = MAPPINGS_FILE):
+        self.db_path = db_path or settings.MAPPINGS_DB_PATH
+        self.seed_json_path = seed_json_path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            # isolation_level=None: transactions are managed explicitly below
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self._create_schema(conn)
+                    self._schema_ready = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS phone_mappings ("
+                " phone TEXT PRIMARY KEY,"
+                " business_id INTEGER NOT NULL"
+                ")"
+            )
+            # Older databases enforced the rule with a unique index, which silently dropped seeded rows
+            conn.execute("DROP INDEX IF EXISTS idx_phone_mappings_business_id")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_phone_mappings_business ON phone_mappings (business_id)")
+            empty = conn.execute("SELECT 1 FROM phone_mappings LIMIT 1").fetchone() is None
+            if empty and self.seed_json_path:
+                seed = PhoneMappingRegistry(self.seed_json_path).snapshot()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO phone_mappings (phone, business_id) VALUES (?, ?)",
+                    ((canonical_phone(phone), business_id) for phone, business_id in seed.items()),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, phone_number: str) -> Optional[int]:
+        row = self._connect().execute(
+            "SELECT business_id FROM phone_mappings WHERE phone = ?", (canonical_phone(phone_number),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add(self, phone_number: str, business_id: int) -> bool:
+        imported, rejected = self.add_many([(0, canonical_phone(phone_number), business_id)])
+        return not rejected
+
+    def add_many(self, rows: Iterable[ImportRow]) -> Tuple[int, List[RejectedRow]]:
+        conn = self._connect()
+        imported = 0
+        rejected: List[RejectedRow] = []
+
+        # One transaction for the whole batch
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for line_no, phone, business_id in rows:
+                # A business ID can only be assigned to one phone number
+                taken = conn.execute(
+                    "SELECT 1 FROM phone_mappings WHERE business_id = ? AND phone != ? LIMIT 1", (business_id, phone)
+                ).fetchone()
+                if taken:
+                    rejected.append((line_no, f"business ID {business_id} is already assigned to another phone number"))
+                    continue
+                conn.execute(
+                    "INSERT INTO phone_mappings (phone, business_id) VALUES (?, ?) "
+                    "ON CONFLICT (phone) DO UPDATE SET business_id = excluded.business_id",
+                    (phone, business_id),
+                )
+                imported += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return imported, rejected
+
+
+def create_store() -> MappingStore:
+    if settings.MAPPINGS_BACKEND == "sqlite":
+        return SqliteMappingStore(settings.MAPPINGS_DB_PATH)
+    return PhoneMappingRegistry(MAPPINGS_FILE)
+
+
+_store = create_store()
 
-def _save_mappings(mappings: dict):
-    os.makedirs(os.path.dirname(MAPPINGS_FILE), exist_ok=True)
-    with open(MAPPINGS_FILE, "w") as f:
-        json.dump(mappings, f, indent=4)
 
 def get_business_id_by_phone(phone_number: str) -> Optional[int]:
     """
     Returns the business ID for a given phone number.
     Returns None if the phone number is not found.
     """
-    normalized_phone = "".join(filter(str.isdigit, phone_number))
-    mappings = _load_mappings()
-    return mappings.get(normalized_phone)
+    return _store.get(phone_number)
+
 
 def add_mapping(phone_number: str, business_id: int) -> bool:
     """
     Adds a new mapping. A business ID can only be assigned to one phone number.
     Returns True if successful, False if the business ID is already assigned.
     """
-    normalized_phone = "".join(filter(str.isdigit, phone_number))
-    mappings = _load_mappings()
-    
-    # Check if business_id is already assigned to a DIFFERENT phone number
-    for phone, biz_id in mappings.items():
-        if biz_id == business_id and phone != normalized_phone:
-            return False
-            
-    mappings[normalized_phone] = business_id
-    _save_mappings(mappings)
-    return True
+    return _store.add(phone_number, business_id)
+
+
+def import_mappings(lines: Iterable[str], fmt: str) -> Tuple[int, List[RejectedRow]]:
+    """
+    Bulk-registers mappings from CSV or JSONL lines in a single store write
+    (one transaction). Lines are parsed as they are consumed, so `lines` may
+    be a stream; if reading it fails midway, nothing is registered.
+    Returns (imported count, rejected rows including malformed lines).
+    """
+    errors: List[RejectedRow] = []
+    imported, rejected = _store.add_many(iter_import_rows(lines, fmt, errors))
+    return imported, sorted(errors + rejected)
@@ -0,0 +1,179 @@
+"""
+In-process metrics, served as Prometheus text by GET /metrics.
+
+A deliberately small registry (no client library dependency): counters and
+gauges with labels, and rolling-window summaries that report quantiles over
+the most recent samples. Collectors register themselves on the module-level
+REGISTRY when created, so a module declares its metrics once at import time:
+
+    LAG = Summary("event_loop_lag_seconds", "Event loop scheduling lag")
+    LAG.observe(0.004)
+"""
+import math
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def quantile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted list (NaN when empty)."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(math.ceil(q * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Registry:
+    def __init__(self):
+        self._collectors: Dict[str, "Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric") -> None:
+        with self._lock:
+            if metric.name in self._collectors:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._collectors[metric.name] = metric
+
+    def get(self, name: str) -> Optional["Metric"]:
+        return self._collectors.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._collectors.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, documentation, registry)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in list(self._values.items())]
+
+
+class Gauge(Metric):
+    """A value that is set directly, or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float] = None,
+                 registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, documentation, registry)
+        self._values: Dict[LabelKey, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_label_key(labels)] = value
+
+    def value(self, **labels) -> float:
+        if self._callback is not None and not labels:
+            return self._callback()
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        if self._callback is not None:
+            return [f"{self.name} {_format_value(self._callback())}"]
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in list(self._values.items())]
+
+
+class Summary(Metric):
+    """
+    Quantiles over the last `window` observations per label set, plus the
+    all-time _count and _sum.
+    """
+    kind = "summary"
+
+    def __init__(self, name: str, documentation: str, quantiles: Tuple[float, ...] = DEFAULT_QUANTILES,
+                 window: int = 1024, registry: Optional[Registry] = REGISTRY):
+        super().__init__(name, documentation, registry)
+        self.quantiles = quantiles
+        self.window = window
+        self._samples: Dict[LabelKey, Deque[float]] = {}
+        self._totals: Dict[LabelKey, Tuple[int, float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(value)
+            count, total = self._totals.get(key, (0, 0.0))
+            self._totals[key] = (count + 1, total + value)
+
+    def snapshot(self, **labels) -> Dict[str, float]:
+        """{"p50": ..., "p90": ..., "p99": ..., "max": ..., "count": ...} over the current window."""
+        key = _label_key(labels)
+        with self._lock:
+            values = sorted(self._samples.get(key, ()))
+        stats = {f"p{q * 100:g}": quantile(values, q) for q in self.quantiles}
+        stats["max"] = values[-1] if values else float("nan")
+        stats["count"] = self._totals.get(key, (0, 0.0))[0]
+        return stats
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            windows = {key: sorted(values) for key, values in self._samples.items()}
+            totals = dict(self._totals)
+        for key, values in windows.items():
+            for q in self.quantiles:
+                lines.append(f"{self.name}{_format_labels(key, [('quantile', str(q))])} {_format_value(quantile(values, q))}")
+            count, total = totals[key]
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+        return lines
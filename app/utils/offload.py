@@ -0,0 +1,103 @@
+"""
+Execution policy for blocking work on the request path.
+
+Async handlers never call blocking helpers directly. File and database I/O
+(the phone mapping store) and CPU-heavy parsing (dateparser) go through
+run_blocking(). It runs them on one bounded thread pool of
+OFFLOAD_MAX_WORKERS threads, so a burst of requests queues for a worker
+instead of stalling the event loop or spawning a thread per call. The loop's
+default executor is left alone, for libraries that use it themselves.
+
+Helpers that are usually cheap decide for themselves whether a call needs the
+pool. For example, parse_date_flexible_async answers memo hits inline.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, TypeVar
+
+from app.config import settings
+from app.utils.metrics import Gauge, Summary
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+
+OFFLOAD_IN_FLIGHT = Gauge("offload_in_flight", "Blocking calls queued or running on the offload pool", callback=lambda: _in_flight)
+OFFLOAD_WAIT = Summary("offload_queue_wait_seconds", "Time blocking calls waited for an offload worker")
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.OFFLOAD_MAX_WORKERS, thread_name_prefix="offload")
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs fn(*args, **kwargs) on the offload pool, with the caller's context variables."""
+    global _in_flight
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    submitted = loop.time()
+
+    def call():
+        OFFLOAD_WAIT.observe(loop.time() - submitted)
+        return context.run(functools.partial(fn, *args, **kwargs))
+
+    _in_flight += 1
+    try:
+        return await loop.run_in_executor(get_executor(), call)
+    finally:
+        _in_flight -= 1
+
+
+def submit_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Fire-and-forget variant of run_blocking for writes nobody awaits; failures are logged."""
+    context = contextvars.copy_context()
+    future = get_executor().submit(context.run, functools.partial(fn, *args, **kwargs))
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def iterate_from_loop(batches: AsyncIterator[List[T]], loop: asyncio.AbstractEventLoop) -> Iterator[T]:
+    """
+    Items of an async iterator of batches, as a plain iterator for a call
+    running on the offload pool: each batch is awaited on `loop` when the
+    call asks for more, so the producer never runs ahead of the consumer.
+    Errors raised by the producer surface in the consuming call.
+    """
+    done = object()
+
+    async def next_batch():
+        try:
+            return await batches.__anext__()
+        except StopAsyncIteration:
+            return done
+
+    while True:
+        batch = asyncio.run_coroutine_threadsafe(next_batch(), loop).result()
+        if batch is done:
+            return
+        yield from batch
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Offloaded call failed: {future.exception()!r}")
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,202 @@
+"""
+Tool-plan cache: reuses the LLM's tool choice for prompts a business repeats.
+
+Owners send the same few messages every day ("summary today", "list leads").
+The model answers each of them with the same tool calls, yet every one costs
+an LLM round trip. PlanCache maps (business_id, normalized prompt, channel)
+to the tool calls the model made. On a hit the agent runs those calls
+directly and replies with the tools' own rendering, with no LLM call.
+
+What gets cached:
+
+- Only read-only tools. Anything that creates a lead, appointment or invoice
+  always goes through the model.
+- Only single-round plans. A chain such as search_services and then
+  create_appointment depends on the first result.
+- Relative dates stay symbolic. A from_date/to_date pair the model worked out
+  from "today" or "this week" in the prompt is stored as period="today", so a
+  replay tomorrow asks for tomorrow's data. A plan that keeps a concrete date
+  the prompt never spelled out is not cached.
+
+Confidence: an entry is served once its confidence reaches
+PLAN_CACHE_MIN_CONFIDENCE. The model returning the same plan for the key
+adds 1. Agreeing with the keyword intent guess (tool_selection.guess_tools)
+adds 1. A different plan for the key replaces the entry and starts again.
+Entries expire after PLAN_CACHE_TTL_SECONDS. A replay whose tool fails drops
+its entry, and the prompt goes to the model.
+"""
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.date_utils import get_date_range
+from app.utils.metrics import Counter
+from app.utils.tool_selection import guess_tools
+
+CACHEABLE_TOOLS = {
+    "list_leads", "list_appointments", "get_appointment", "list_invoices", "get_invoice",
+    "get_summary_for_business", "get_franchise_summary", "search_services", "get_help_guide", "list_offers",
+}
+
+# Relative periods the tools accept symbolically, longest first so "last week" wins over "week"
+SYMBOLIC_PERIODS = ("last month", "this month", "last week", "this week", "yesterday", "today")
+
+_FILLER_WORDS = {"please", "pls", "plz", "kindly", "can", "could", "would", "you", "me", "my", "the", "a", "an",
+                 "show", "give", "tell", "list", "get", "what", "are", "is", "all"}
+# Digit lookarounds rather than \b, so the date inside "2026-10-19T00:00:00" is found too
+_CONCRETE_DATE_RE = re.compile(r"(?<!\d)(?:(\d{4})[/-](\d{1,2})[/-](\d{1,2})|\d{1,2}[/-]\d{1,2}[/-]\d{2,4})(?!\d)")
+
+PLAN_CACHE_LOOKUPS = Counter("plan_cache_lookups_total", "Tool-plan cache lookups by outcome (hit, miss, unconfident, expired)")
+PLAN_CACHE_STORES = Counter("plan_cache_stores_total", "Tool plans offered to the cache by outcome (stored, confirmed, replaced, uncacheable)")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase words without punctuation or filler, so "Show me my leads!" and "list leads" share a key."""
+    words = re.sub(r"[^a-z0-9/\- ]+", " ", prompt.lower().replace("'s", "")).split()
+    kept = [word for word in words if word not in _FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+
+class ToolPlan:
+    """Tool calls the model made for one prompt, grouped by LLM turn."""
+
+    def __init__(self):
+        self.rounds: List[List[ToolCall]] = []
+        self.failed = False
+
+    def add_round(self, calls: List[ToolCall], failed: bool = False) -> None:
+        """calls: (tool name, arguments as the model wrote them); failed if any tool returned an error."""
+        self.rounds.append(calls)
+        self.failed = self.failed or failed
+
+    @property
+    def calls(self) -> List[ToolCall]:
+        return [call for calls in self.rounds for call in calls]
+
+
+def symbolize_dates(calls: List[ToolCall], prompt: str) -> Optional[List[ToolCall]]:
+    """
+    Calls with date ranges the model resolved from a relative term in the prompt
+    put back as period=<term>; None if a concrete date would stay frozen in the plan.
+    """
+    text = prompt.lower()
+    terms = [term for term in SYMBOLIC_PERIODS if term in text]
+    ranges = {get_date_range(term): term for term in terms}
+    spelled_out = set(_concrete_dates(text))
+
+    symbolic = []
+    for name, arguments in calls:
+        arguments = dict(arguments)
+        from_date, to_date = arguments.get("from_date"), arguments.get("to_date")
+        if from_date and to_date:
+            term = ranges.get((_day(from_date), _day(to_date)))
+            if term:
+                del arguments["from_date"], arguments["to_date"]
+                arguments["period"] = term
+        for value in arguments.values():
+            if isinstance(value, str) and any(date not in spelled_out for date in _concrete_dates(value)):
+                return None
+        symbolic.append((name, arguments))
+    return symbolic
+
+
+def _concrete_dates(text: str) -> List[str]:
+    """Every date written in the text, year-first ones as YYYY/MM/DD (the get_date_range format)."""
+    dates = []
+    for match in _CONCRETE_DATE_RE.finditer(text):
+        year, month, day = match.groups()
+        if year:
+            dates.append(f"{year}/{int(month):02d}/{int(day):02d}")
+        else:
+            dates.append(match.group().replace("-", "/"))
+    return dates
+
+
+def _day(value: Any) -> str:
+    """The date of a from_date/to_date argument, ignoring any time part."""
+    dates = _concrete_dates(str(value))
+    return dates[0] if dates else str(value).strip()
+
+
+class _Entry:
+    def __init__(self, calls: List[ToolCall], confidence: int):
+        self.calls = calls
+        self.confidence = confidence
+        self.created = time.monotonic()
+
+
+class PlanCache:
+    def __init__(self, ttl_seconds: float = None, min_confidence: int = None, max_entries: int = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.PLAN_CACHE_TTL_SECONDS
+        self.min_confidence = min_confidence if min_confidence is not None else settings.PLAN_CACHE_MIN_CONFIDENCE
+        self.max_entries = max_entries or settings.PLAN_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[Tuple[str, str, str], _Entry]" = OrderedDict()
+
+    @staticmethod
+    def key(business_id: Any, prompt: str, channel: str) -> Tuple[str, str, str]:
+        return str(business_id), normalize_prompt(prompt), channel
+
+    def get(self, business_id: Any, prompt: str, channel: str) -> Optional[List[ToolCall]]:
+        """The cached calls (copies) if the entry is live and confident enough."""
+        if not settings.PLAN_CACHE_ENABLED:
+            return None
+        key = self.key(business_id, prompt, channel)
+        entry = self._entries.get(key)
+        if entry is None:
+            PLAN_CACHE_LOOKUPS.inc(outcome="miss")
+            return None
+        if time.monotonic() - entry.created > self.ttl_seconds:
+            del self._entries[key]
+            PLAN_CACHE_LOOKUPS.inc(outcome="expired")
+            return None
+        if entry.confidence < self.min_confidence:
+            PLAN_CACHE_LOOKUPS.inc(outcome="unconfident")
+            return None
+        self._entries.move_to_end(key)
+        PLAN_CACHE_LOOKUPS.inc(outcome="hit")
+        return [(name, dict(arguments)) for name, arguments in entry.calls]
+
+    def put(self, business_id: Any, prompt: str, channel: str, plan: ToolPlan) -> bool:
+        """Offers the plan the model produced for this prompt; True if it is now cached."""
+        if not settings.PLAN_CACHE_ENABLED:
+            return False
+        if not plan.rounds or plan.failed:
+            return False
+        calls = plan.calls
+        if len(plan.rounds) != 1 or not all(name in CACHEABLE_TOOLS for name, _ in calls):
+            PLAN_CACHE_STORES.inc(outcome="uncacheable")
+            return False
+        calls = symbolize_dates(calls, prompt)
+        if calls is None:
+            PLAN_CACHE_STORES.inc(outcome="uncacheable")
+            return False
+
+        key = self.key(business_id, prompt, channel)
+        entry = self._entries.get(key)
+        if entry is not None and _same_calls(entry.calls, calls):
+            entry.confidence += 1
+            PLAN_CACHE_STORES.inc(outcome="confirmed")
+        else:
+            agrees = bool(guess_tools(prompt)) and guess_tools(prompt)[0] == calls[0][0]
+            PLAN_CACHE_STORES.inc(outcome="replaced" if entry is not None else "stored")
+            entry = self._entries[key] = _Entry(calls, 1 + agrees)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, business_id: Any, prompt: str, channel: str) -> None:
+        self._entries.pop(self.key(business_id, prompt, channel), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _same_calls(a: List[ToolCall], b: List[ToolCall]) -> bool:
+    return json.dumps(a, sort_keys=True, default=str) == json.dumps(b, sort_keys=True, default=str)
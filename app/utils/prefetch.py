@@ -0,0 +1,190 @@
+"""
+Speculative prefetch of likely tool reads while the LLM is deciding.
+
+For phone (WhatsApp) chat the business is known before the first LLM call,
+and most first messages end in today's summary, today's appointments or the
+offers list. With PREFETCH_ENABLED, the agent starts up to
+PREFETCH_MAX_PER_REQUEST of those reads alongside the LLM call. Candidates
+come from two places:
+
+- the local intent guess: the keyword match from tool_selection.guess_tools,
+  with the period named in the prompt;
+- the business's history: the first tool the model picked for its recent
+  prompts, used when that call makes up at least PREFETCH_MIN_SHARE of them.
+
+When the model asks for a tool with the same arguments, the agent awaits the
+running task instead of starting the call. Whatever is left when the request
+ends is cancelled if still running, or discarded. Only read-only tools are
+ever prefetched.
+
+/metrics shows whether this pays off:
+- prefetch_started_total and prefetch_outcomes_total{outcome=used|wasted|cancelled}
+  give the win rate (used / started);
+- wasted plus cancelled are the upstream calls spent for nothing;
+- prefetch_saved_seconds is the tool latency taken off the used requests.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter as TallyCounter
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models import CHANNEL_WHATSAPP
+from app.utils.metrics import Counter, Summary
+from app.utils.plan_cache import SYMBOLIC_PERIODS
+from app.utils.tool_selection import guess_tools
+
+logger = logging.getLogger(__name__)
+
+PREFETCHABLE_TOOLS = ("get_summary_for_business", "list_appointments", "list_offers")
+
+# Period words the model copies into the period argument; plan-cache periods plus forward-looking ones
+PREFETCH_PERIODS = ("next week", "tomorrow") + SYMBOLIC_PERIODS
+
+# Arguments the agent injects itself; they never tell two calls apart
+_INJECTED_ARGUMENTS = ("token", "client_id", "prompt")
+
+PREFETCH_STARTED = Counter("prefetch_started_total", "Speculative tool reads started alongside the LLM call")
+PREFETCH_OUTCOMES = Counter("prefetch_outcomes_total", "Speculative tool reads by outcome: used, wasted (finished unused), cancelled")
+PREFETCH_SAVED = Summary("prefetch_saved_seconds", "Tool latency removed from a request by a used prefetch")
+
+Signature = Tuple[str, Tuple[Tuple[str, str], ...]]
+ToolExecutor = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+def call_signature(tool_name: str, arguments: Dict[str, Any]) -> Signature:
+    """Identity of a tool call: business_id 11 and "11", or "Today" and "today", are the same call."""
+    return tool_name, tuple(sorted(
+        (key, str(value).strip().lower()) for key, value in arguments.items()
+        if value not in (None, "") and key not in _INJECTED_ARGUMENTS
+    ))
+
+
+class _Speculation:
+    def __init__(self, tool_name: str, task: asyncio.Task):
+        self.tool_name = tool_name
+        self.task = task
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self.finished = time.perf_counter()
+
+
+class Prefetch:
+    """The speculative reads of one request."""
+
+    def __init__(self):
+        self._pending: Dict[Signature, _Speculation] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def start(self, tool_name: str, arguments: Dict[str, Any], execute: ToolExecutor) -> None:
+        signature = call_signature(tool_name, arguments)
+        if signature in self._pending:
+            return
+        task = asyncio.ensure_future(execute(tool_name, dict(arguments)))
+        self._pending[signature] = _Speculation(tool_name, task)
+        PREFETCH_STARTED.inc(tool=tool_name)
+        logger.info(f"Prefetching {tool_name} {arguments}")
+
+    async def take(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[bool, Any]:
+        """(True, result) if this call was prefetched; the result is awaited if still running."""
+        speculation = self._pending.pop(call_signature(tool_name, arguments), None)
+        if speculation is None:
+            return False, None
+        asked = time.perf_counter()
+        result = await speculation.task
+        # The done callback may not have run yet if the task finished this loop iteration
+        finished = speculation.finished if speculation.finished is not None else time.perf_counter()
+        duration = finished - speculation.started
+        PREFETCH_OUTCOMES.inc(tool=tool_name, outcome="used")
+        PREFETCH_SAVED.observe(max(duration - (time.perf_counter() - asked), 0.0), tool=tool_name)
+        return True, result
+
+    def finish(self) -> None:
+        """Cancels reads still running and discards finished ones nobody asked for."""
+        for speculation in self._pending.values():
+            if speculation.task.done():
+                outcome = "wasted"
+                if not speculation.task.cancelled():
+                    speculation.task.exception()  # retrieved, so asyncio does not log it
+            else:
+                outcome = "cancelled"
+                speculation.task.cancel()
+            PREFETCH_OUTCOMES.inc(tool=speculation.tool_name, outcome=outcome)
+        self._pending.clear()
+
+
+class SpeculativePrefetcher:
+    """Chooses what to prefetch for a phone chat prompt and learns from what the model picks."""
+
+    # Per-business tallies are halved past this many requests, so recent habits dominate
+    HISTORY_WINDOW = 50
+
+    def __init__(self, definitions: List[Dict[str, Any]], max_businesses: int = 10000):
+        self.max_businesses = max_businesses
+        self._integer_arguments = {
+            d["function"]["name"]: {name for name, spec in d["function"]["parameters"].get("properties", {}).items()
+                                    if spec.get("type") == "integer"}
+            for d in definitions
+        }
+        self._history: "OrderedDict[str, TallyCounter]" = OrderedDict()
+
+    def candidates(self, business_id: Any, prompt: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Likely first tool calls, the intent guess first."""
+        found: List[Tuple[str, Dict[str, Any]]] = []
+        guesses = guess_tools(prompt)
+        if guesses and guesses[0] in PREFETCHABLE_TOOLS:
+            arguments = {"business_id": business_id}
+            period = next((p for p in PREFETCH_PERIODS if p in prompt.lower()), None)
+            if period and guesses[0] != "list_offers":
+                arguments["period"] = period
+            found.append((guesses[0], self._typed(guesses[0], arguments)))
+
+        tally = self._history.get(str(business_id))
+        if tally:
+            (tool_name, arguments), count = tally.most_common(1)[0]
+            likely = count / sum(tally.values()) >= settings.PREFETCH_MIN_SHARE
+            if likely and tool_name in PREFETCHABLE_TOOLS and not any(call_signature(*call) == (tool_name, arguments) for call in found):
+                found.append((tool_name, self._typed(tool_name, dict(arguments))))
+        return found[:settings.PREFETCH_MAX_PER_REQUEST]
+
+    def start(self, business_id: Any, prompt: str, channel: str, execute: ToolExecutor) -> Prefetch:
+        prefetch = Prefetch()
+        if settings.PREFETCH_ENABLED and channel == CHANNEL_WHATSAPP:
+            for tool_name, arguments in self.candidates(business_id, prompt):
+                prefetch.start(tool_name, arguments, execute)
+        return prefetch
+
+    def record(self, business_id: Any, channel: str, tool_name: str, arguments: Dict[str, Any]) -> None:
+        """Adds the model's first tool call for a phone chat prompt to the business's history."""
+        if channel != CHANNEL_WHATSAPP:
+            return
+        key = str(business_id)
+        tally = self._history.setdefault(key, TallyCounter())
+        tally[(tool_name, call_signature(tool_name, arguments)[1])] += 1
+        if sum(tally.values()) > self.HISTORY_WINDOW:
+            for call, count in list(tally.items()):
+                if count // 2:
+                    tally[call] = count // 2
+                else:
+                    del tally[call]
+        self._history.move_to_end(key)
+        while len(self._history) > self.max_businesses:
+            self._history.popitem(last=False)
+
+    def _typed(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # Pass arguments with the types the schema declares, as the model would
+        integers = self._integer_arguments.get(tool_name, ())
+        typed = {}
+        for key, value in arguments.items():
+            if key in integers and str(value).isdigit():
+                typed[key] = int(value)
+            else:
+                typed[key] = str(value) if key == "business_id" else value
+        return typed
@@ -0,0 +1,227 @@
+"""
+Sampling profiler for the running worker, in collapsed-stack format.
+
+Every interval, a background thread records one sample of each target. Output
+is one "frame;frame;frame count" line per distinct stack. That is the input
+for flamegraph.pl, speedscope and most flame-graph viewers.
+
+Two kinds of sample:
+
+- "wall": the await chain of each asyncio task, from its outermost coroutine
+  down to whatever it is suspended on or running. A request spends most of
+  its time in Agent.process_prompt waiting on the LLM or the Java API. Wall
+  samples show which await that time goes to.
+- "cpu": the Python stack of every thread (loop thread and offload workers),
+  i.e. what is actually executing.
+
+profile() serves on-demand captures for GET /debug/profile. SlowRequestProfiler
+samples the await chain of every in-flight request. For each request slower
+than PROFILE_SLOW_REQUEST_MS it keeps the collapsed profile in a ring of the
+last PROFILE_SLOW_REQUEST_KEEP.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from app.config import settings
+
+PROFILE_MODES = ("wall", "cpu")
+
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_ROOT_DIR):
+        filename = os.path.relpath(filename, _ROOT_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def thread_stack(frame) -> List[str]:
+    """Frame labels of a thread's stack, outermost first."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def await_chain(coro) -> List[str]:
+    """Frame labels along a coroutine's await chain, outermost first (read from any thread)."""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return labels
+
+
+def collapse(samples: Counter) -> str:
+    """Collapsed-stack text, heaviest stacks first."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class _Sampler(threading.Thread):
+    """Calls sample() every interval until stopped."""
+
+    def __init__(self, interval: float, name: str):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self._stopping = threading.Event()
+
+    def run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sample()
+            except RuntimeError:
+                # A task or thread set changed mid-iteration; skip this tick
+                pass
+
+    def sample(self):
+        raise NotImplementedError
+
+    def stop(self):
+        self._stopping.set()
+        self.join(timeout=1)
+
+
+class _OnDemandSampler(_Sampler):
+    def __init__(self, interval: float, mode: str, loop: asyncio.AbstractEventLoop):
+        super().__init__(interval, name="profiler")
+        self.mode = mode
+        self.loop = loop
+        self.samples: Counter = Counter()
+        self.ticks = 0
+
+    def sample(self):
+        self.ticks += 1
+        if self.mode == "cpu":
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != self.ident:
+                    self.samples[";".join([names.get(ident, str(ident))] + thread_stack(frame))] += 1
+            return
+        for task in asyncio.all_tasks(self.loop):
+            chain = await_chain(task.get_coro())
+            if chain:
+                self.samples[";".join([task.get_name()] + chain)] += 1
+
+
+# One lock per event loop, made on first use: on Python 3.9 an asyncio.Lock binds to
+# the loop current when it is created, so one made at import fails under uvicorn's loop
+_profile_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+async def profile(seconds: float, interval_ms: float = None, mode: str = "wall") -> Dict[str, Any]:
+    """Samples for `seconds` while the loop keeps serving; one capture at a time."""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"mode must be one of {PROFILE_MODES}")
+    loop = asyncio.get_running_loop()
+    lock = _profile_locks.get(loop)
+    if lock is None:
+        lock = _profile_locks[loop] = asyncio.Lock()
+    if lock.locked():
+        raise RuntimeError("A profile is already being captured")
+    async with lock:
+        interval = (interval_ms or settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000
+        sampler = _OnDemandSampler(interval, mode, loop)
+        started = time.time()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return {"mode": mode, "started_at": started, "seconds": seconds, "ticks": sampler.ticks,
+                "collapsed": collapse(sampler.samples)}
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.samples: Counter = Counter()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method, "path": self.path, "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 1), "samples": sum(self.samples.values()),
+            "collapsed": collapse(self.samples),
+        }
+
+
+class SlowRequestProfiler(_Sampler):
+    """Wall-clock samples of every in-flight request task; profiles of slow ones are kept."""
+
+    def __init__(self, threshold_ms: float = None, keep: int = None, interval_ms: float = None):
+        interval_ms = interval_ms if interval_ms is not None else settings.PROFILE_SAMPLE_INTERVAL_MS
+        super().__init__(interval_ms / 1000, name="slow-request-profiler")
+        self.threshold_ms = threshold_ms if threshold_ms is not None else settings.PROFILE_SLOW_REQUEST_MS
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=keep if keep is not None else settings.PROFILE_SLOW_REQUEST_KEEP)
+        self._in_flight: Dict[asyncio.Task, RequestProfile] = {}
+
+    def begin(self, method: str, path: str) -> Optional[RequestProfile]:
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        request = self._in_flight[task] = RequestProfile(method, path)
+        return request
+
+    def end(self, request: Optional[RequestProfile]) -> None:
+        if request is None:
+            return
+        self._in_flight.pop(asyncio.current_task(), None)
+        request.duration_ms = (time.time() - request.started_at) * 1000
+        if request.duration_ms >= self.threshold_ms:
+            self.recent.append(request.as_dict())
+
+    def sample(self):
+        for task, request in list(self._in_flight.items()):
+            chain = await_chain(task.get_coro())
+            if chain:
+                request.samples[";".join(chain)] += 1
+
+    def slow_requests(self) -> List[Dict[str, Any]]:
+        """Most recent first."""
+        return list(reversed(self.recent))
+
+
+class SlowRequestMiddleware:
+    """ASGI middleware (no extra task per request, so the handler runs in the sampled task)."""
+
+    def __init__(self, app, profiler: SlowRequestProfiler, skip_prefixes: Iterable[str] = ("/debug", "/metrics", "/health")):
+        self.app = app
+        self.profiler = profiler
+        self.skip_prefixes = tuple(skip_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            return await self.app(scope, receive, send)
+        request = self.profiler.begin(scope["method"], scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(request)
+
+
+# Installed by the app when PROFILE_SLOW_REQUEST_MS > 0; its sampling thread starts in the lifespan
+slow_request_profiler: Optional[SlowRequestProfiler] = None
+
+
+def get_slow_request_profiler() -> SlowRequestProfiler:
+    global slow_request_profiler
+    if slow_request_profiler is None:
+        slow_request_profiler = SlowRequestProfiler()
+    return slow_request_profiler
@@ -0,0 +1,60 @@
+"""
+Serialization of tool results.
+
+A tool result's data is dumped to JSON-compatible Python values once
+(to_jsonable, cached on the ToolResult as .payload). That one payload is
+both the content sent back to the LLM and the response_value of the HTTP
+reply, which JSONResponse renders with orjson without re-validating it.
+Lists of one model type are dumped in a single pydantic-core call.
+"""
+import json
+from functools import lru_cache
+from typing import Any, List
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, slower
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def to_jsonable(value: Any) -> Any:
+    """Models become dicts (datetimes as ISO strings); lists and dicts are converted recursively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if hasattr(value, "to_records"):
+        # Columnar result sets (app/resultsets.py) dump their columns without building models
+        return value.to_records()
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        model = type(value[0])
+        if issubclass(model, BaseModel) and all(type(item) is model for item in value):
+            return _list_adapter(model).dump_python(value, mode="json")
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return value
+
+
+def dumps(value: Any) -> str:
+    """JSON text for a to_jsonable() value; anything else falls back to str()."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, default=str)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson. Content must already be JSON-compatible (see to_jsonable)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
@@ -0,0 +1,161 @@
+"""
+Pre-selection of the tool schemas sent with an agent prompt.
+
+Sending all of TOOLS_DEFINITIONS costs about as many input tokens as the
+system prompt, and each Gemini turn pays it again. ToolSelector picks a
+subset from cheap local signals:
+
+- keywords in the prompt ("leads", "book", "offers", ...), plus the tools a
+  matched tool needs next (create_appointment needs search_services);
+- the last tool used in the session, so follow-ups such as "and yesterday?"
+  can reach it;
+- the channel, when no keyword matches: WhatsApp owners mostly ask for a
+  handful of reads or jot down a lead or booking in their own words
+  ("Ravi called, wants a haircut tomorrow 5pm"), so they get those reads plus
+  the lead and booking tools; web chat gets the full set.
+
+get_help_guide is always included. If the model asks for a tool outside the
+subset, the agent discards that turn and asks again with every tool (a
+"fallback"): arguments written without the schema cannot be trusted.
+
+Schema tokens actually sent, and what the full set would have cost, are
+counted on /metrics (llm_tool_schema_tokens_total); the difference is the
+saving.
+"""
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models import CHANNEL_WHATSAPP
+from app.utils.history import estimate_tokens
+from app.utils.metrics import Counter
+
+ALWAYS_INCLUDED = ("get_help_guide",)
+
+# First match decides the intent guess; every match is selected
+TOOL_KEYWORDS: List[Tuple[str, str]] = [
+    ("get_help_guide", r"^\W*(hi|hello|hey|help|guide me|menu|what can you do)\b"),
+    ("create_lead", r"\b(add|new|create|capture|save)\b.*\b(leads?|enquiry|prospect)\b|\binterested in\b"),
+    ("get_appointment", r"\b(appointment|booking)\s*(id|no\.?|number)?\s*#?\d+\b"),
+    ("create_appointment", r"\b(book|reserve)\b|\b(add|new|create|schedule)\b.*\b(appointment|booking)\b"),
+    ("get_invoice", r"\b(invoice|bill)\s*(id|no\.?|number)?\s*#?\d+\b"),
+    ("create_invoice", r"\b(create|new|raise|make|generate|send)\b.*\b(invoice|bill)\b"),
+    ("get_franchise_summary", r"\b(franchise|branches|outlets|consolidated)\b|\b\d+\s*(,|and|&)\s*\d+\b"),
+    ("get_summary_for_business", r"\b(summary|summari[sz]e|report|overview|revenue|sales|stats|statistics|performance|dashboard|how (is|was|did|are))\b"),
+    ("list_appointments", r"\b(appointments?|bookings?|schedule|calendar)\b"),
+    ("list_leads", r"\b(leads?|enquir(y|ies)|prospects?)\b"),
+    ("list_invoices", r"\b(invoices?|bills?|billing)\b"),
+    ("list_offers", r"\b(offers?|promo(tion)?s?|deals?|discounts?|campaigns?|coupons?)\b"),
+    ("search_services", r"\b(services?|price|pricing|cost|catalog(ue)?|treatments?)\b"),
+]
+
+# Tools the model may need right after (or instead of) a matched one
+COMPANIONS: Dict[str, Tuple[str, ...]] = {
+    "create_appointment": ("search_services",),
+    "get_appointment": ("list_appointments",),
+    "list_appointments": ("get_appointment",),
+    "get_invoice": ("list_invoices",),
+    "list_invoices": ("get_invoice",),
+    "get_franchise_summary": ("get_summary_for_business",),
+}
+
+# Used when no keyword matches; a channel missing here gets every tool
+CHANNEL_DEFAULTS: Dict[str, Tuple[str, ...]] = {
+    CHANNEL_WHATSAPP: ("get_summary_for_business", "list_appointments", "list_leads", "list_offers",
+                       "create_lead", "create_appointment", "search_services"),
+}
+
+TOOL_SELECTIONS = Counter("tool_selection_total", "Tool selections by outcome (subset, full, fallback after a subset) and channel")
+SCHEMA_TOKENS = Counter("llm_tool_schema_tokens_total", "Estimated tool-schema input tokens: sent, and baseline (the full set)")
+
+_COMPILED = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in TOOL_KEYWORDS]
+
+
+def guess_tools(prompt: str) -> List[str]:
+    """Tools whose keywords appear in the prompt, most specific first (the first is the intent guess)."""
+    return [name for name, pattern in _COMPILED if pattern.search(prompt)]
+
+
+class ToolSelection:
+    def __init__(self, names: List[str], definitions: List[Dict[str, Any]], schema_tokens: int, full_schema_tokens: int,
+                 matched: List[str], channel: str):
+        self.names = names
+        self.definitions = definitions
+        self.schema_tokens = schema_tokens
+        self.full_schema_tokens = full_schema_tokens
+        self.matched = matched
+        self.channel = channel
+
+    @property
+    def is_full(self) -> bool:
+        return self.schema_tokens >= self.full_schema_tokens
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_schema_tokens - self.schema_tokens
+
+    def allows(self, tool_names: Iterable[str]) -> bool:
+        return all(name in self.names for name in tool_names)
+
+    def record_call(self) -> None:
+        """Counts the schemas of one LLM call that carried this selection."""
+        SCHEMA_TOKENS.inc(self.schema_tokens, kind="sent")
+        SCHEMA_TOKENS.inc(self.full_schema_tokens, kind="baseline")
+
+
+class ToolSelector:
+    def __init__(self, definitions: List[Dict[str, Any]], max_sessions: int = None):
+        self.max_sessions = max_sessions or settings.TOOL_SELECTION_MAX_SESSIONS
+        self._by_name = {d["function"]["name"]: d for d in definitions}
+        self._tokens = {name: estimate_tokens(json.dumps(d)) for name, d in self._by_name.items()}
+        self._full_tokens = sum(self._tokens.values())
+        # session key -> last tool the model used there
+        self._last_tool: "OrderedDict[str, str]" = OrderedDict()
+
+    def select(self, prompt: str, channel: str, session: Optional[str] = None) -> ToolSelection:
+        matched = guess_tools(prompt)
+        if not settings.TOOL_SELECTION_ENABLED:
+            return self._selection(list(self._by_name), matched, channel, "full")
+
+        wanted = list(matched)
+        if not matched:
+            default = CHANNEL_DEFAULTS.get(channel)
+            if default is None:
+                return self._selection(list(self._by_name), matched, channel, "full")
+            wanted.extend(default)
+        last_tool = self._last_tool.get(session) if session else None
+        if last_tool:
+            wanted.append(last_tool)
+        for name in list(wanted):
+            wanted.extend(COMPANIONS.get(name, ()))
+        wanted.extend(ALWAYS_INCLUDED)
+
+        # Keep TOOLS_DEFINITIONS order so the same subset always serializes the same way
+        wanted_set = set(wanted)
+        names = [name for name in self._by_name if name in wanted_set]
+        return self._selection(names, matched, channel, "full" if len(names) == len(self._by_name) else "subset")
+
+    def widen(self, selection: ToolSelection) -> ToolSelection:
+        """Every tool, after the model asked for one outside the subset."""
+        return self._selection(list(self._by_name), selection.matched, selection.channel, "fallback")
+
+    def remember(self, session: Optional[str], tool_name: str) -> None:
+        if not session or tool_name not in self._by_name:
+            return
+        self._last_tool[session] = tool_name
+        self._last_tool.move_to_end(session)
+        while len(self._last_tool) > self.max_sessions:
+            self._last_tool.popitem(last=False)
+
+    def _selection(self, names: List[str], matched: List[str], channel: str, outcome: str) -> ToolSelection:
+        TOOL_SELECTIONS.inc(outcome=outcome, channel=channel)
+        return ToolSelection(
+            names=names,
+            definitions=[self._by_name[name] for name in names],
+            schema_tokens=sum(self._tokens[name] for name in names),
+            full_schema_tokens=self._full_tokens,
+            matched=matched,
+            channel=channel,
+        )
@@ -0,0 +1,106 @@
+"""
+WhatsApp message templates.
+
+Replies for the phone channel are sent through n8n as unicode-escaped JSON
+string bodies (json.dumps(message, ensure_ascii=True)[1:-1]). A Template is
+compiled once at import into a single f-string function, and a message is
+escaped in one pass once it is assembled, instead of being built piecewise
+and re-encoded. A template without fields is rendered and escaped once and
+cached (e.g. the help guide).
+
+render_list() stops adding rows once the message would exceed
+WHATSAPP_MAX_MESSAGE_CHARS (WhatsApp rejects longer text bodies) and ends
+with an "...and N more." line instead, so large result sets cost the same as
+one full message.
+"""
+from json.encoder import encode_basestring_ascii
+from string import Formatter
+from typing import Any, Iterable, Mapping, Optional
+
+from app.config import settings
+
+_formatter = Formatter()
+
+
+def escape(text: str) -> str:
+    """The body of json.dumps(text, ensure_ascii=True), without the quotes."""
+    return encode_basestring_ascii(text)[1:-1]
+
+
+class Template:
+    """A str.format-style template ({name}, {obj.attr}, {value:,.2f}) compiled for repeated rendering."""
+
+    __slots__ = ("source", "format", "_escaped")
+
+    def __init__(self, source: str):
+        self.source = source
+        body, names = [], []
+        for literal, expr, spec, conversion in _formatter.parse(source):
+            body.append(literal.replace("{", "{{").replace("}", "}}"))
+            if expr is None:
+                continue
+            path = expr.split(".")
+            if conversion or not all(part.isidentifier() for part in path) or "{" in spec:
+                raise ValueError(f"Unsupported field {{{expr}}} in WhatsApp template: {source!r}")
+            if path[0] not in names:
+                names.append(path[0])
+            access = "".join(f".{attr}" for attr in path[1:])
+            body.append(f"{{v{names.index(path[0])}{access}:{spec}}}")
+
+        # Compiled to a single f-string: one allocation per message, no format() parsing per call
+        lines = ["def format(values):"]
+        lines += [f"    v{i} = values[{name!r}]" for i, name in enumerate(names)]
+        lines.append(f"    return f{''.join(body)!r}")
+        namespace = {}
+        exec("\n".join(lines), namespace)
+        self.format = namespace["format"]
+        # No fields: escaped once here and the same string handed out every time
+        self._escaped = None if names else escape(self.format({}))
+
+    def render(self, **values) -> str:
+        """The message, escaped."""
+        if self._escaped is not None:
+            return self._escaped
+        return escape(self.format(values))
+
+
+MORE = Template("\n...and {n} more.")
+
+
+def render_list(header: Template, item: Template, rows: Iterable[Mapping[str, Any]], row_count: int,
+                footer: Optional[Template] = None, overflow: Template = MORE,
+                limit: Optional[int] = None, **values) -> str:
+    """
+    header, one item per row, then footer; rendered with `values` plus each row's fields
+    (and `index`, counting from 1). Rows that do not fit in `limit` characters, and
+    rows beyond the ones given (row_count > rows), are summarised by `overflow` ({n}).
+    The assembled message is escaped in one pass at the end.
+    """
+    limit = limit or settings.WHATSAPP_MAX_MESSAGE_CHARS
+    head = header.format(values)
+    tail = footer.format(values) if footer else ""
+    budget = limit - len(head) - len(tail)
+
+    pieces = [head]
+    filled = 0
+    item_values = dict(values)
+    for index, row in enumerate(rows, 1):
+        item_values.update(row)
+        item_values["index"] = index
+        text = item.format(item_values)
+        if filled + len(text) > budget:
+            break
+        pieces.append(text)
+        filled += len(text)
+
+    shown = len(pieces) - 1
+    if shown < row_count:
+        # Make room for the overflow line itself
+        more = overflow.format({**values, "n": row_count - shown})
+        while shown and filled + len(more) > budget:
+            filled -= len(pieces.pop())
+            shown -= 1
+            more = overflow.format({**values, "n": row_count - shown})
+        pieces.append(more)
+    pieces.append(tail)
+    return escape("".join(pieces))
@@ -1,8 +1,11 @@
 import logging
 import json
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
 from app.config import settings
 from app.services.rag_service import SimpleRAGService
+from app.utils.history import HistoryCompactor
+from app.utils.llm_usage import UsageTracker
 from app.tools.website_tools import capture_lead
 
 logger = logging.getLogger(__name__)
@@ -28,15 +31,42 @@ logger = logging.getLogger(__name__)
 #     }
 # ]
 
+# "5. Auto-Generated Website" -> "Auto-Generated Website"
+_HEADING_NUMBER_RE = re.compile(r"^\d+\.\s*")
+
+
+def format_extractive_answer(chunk: str) -> str:
+    """Lightly template a knowledge base chunk so it reads as a chat reply."""
+    lines = chunk.splitlines()
+    title = _HEADING_NUMBER_RE.sub("", lines[0]).strip()
+    body = "\n".join(lines[1:]).strip()
+    if not body:
+        return f"{title}\n\nWould you like to know more? I can also arrange a quick call with our team."
+    return (
+        f"**{title}**\n"
+        f"{body}\n\n"
+        "Would you like to know more? I can also arrange a quick call with our team."
+    )
+
+
 class WebsiteAgent:
     def __init__(self):
         self.rag = SimpleRAGService()
         self.provider = settings.LLM_PROVIDER
+        self.history_compactor = HistoryCompactor(
+            token_budget=settings.WEBSITE_HISTORY_TOKEN_BUDGET,
+            summary_token_budget=settings.WEBSITE_HISTORY_SUMMARY_TOKENS,
+        )
+
+    async def process_message(self, message: str, history: List[Dict[str, str]] = [], token: str = None, conversation_id: str = None) -> Dict[str, Any]:
+        # Short questions with one clearly winning chunk are answered without the LLM
+        extractive_text = self._extractive_answer(message)
+        if extractive_text:
+            return {"response_text": extractive_text}
 
-    async def process_message(self, message: str, history: List[Dict[str, str]] = [], token: str = None) -> Dict[str, Any]:
         # 1. Retrieve context via RAG
         context = self.rag.retrieve(message)
-        
+
         # 2. Construct System Prompt
         system_prompt = (
             "You are a helpful QTick Sales Agent. Your goal is to explain QTick features based on the user's questions.\n"
@@ -45,28 +75,78 @@ class WebsiteAgent:
             f"CONTEXT:\n{context}"
         )
 
+        # Keep recent turns within the token budget; older turns become a short summary
+        history_summary, recent_history = self.history_compactor.compact(history, conversation_id)
+        if history_summary:
+            system_prompt += f"\n\nCONVERSATION SO FAR:\n{history_summary}"
+
         messages = [{"role": "system", "content": system_prompt}]
-        # Add history (limit to last 5 turns to save tokens)
-        messages.extend(history[-5:])
+        messages.extend(recent_history)
         messages.append({"role": "user", "content": message})
 
-        if self.provider == "openai":
-            return await self._process_openai(messages, token)
-        elif self.provider == "gemini":
-            return await self._process_gemini(messages, token)
-        else:
+        style = settings.FAKE_LLM_STYLE if self.provider == "fake" else self.provider
+        if style not in ("openai", "gemini"):
             return {"response_text": "Unsupported LLM provider"}
 
-    async def _process_openai(self, messages: List[Dict[str, str]], token: str = None) -> Dict[str, Any]:
-        from openai import AsyncOpenAI
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        usage = UsageTracker(self.provider, settings.OPENAI_MODEL if style == "openai" else settings.GEMINI_MODEL)
+        try:
+            if style == "openai":
+                return await self._process_openai(messages, token, usage=usage)
+            return await self._process_gemini(messages, token, usage=usage)
+        finally:
+            usage.finish()
+
+    def _extractive_answer(self, message: str) -> Optional[str]:
+        """
+        Returns a templated knowledge base answer when the best chunk wins by a clear
+        margin for a short question, otherwise None (answer with the LLM). The chunk
+        must match enough of the question's keywords, or one in its heading: a lone
+        keyword in the body is too weak ("cost" in "how much does it cost?" also
+        matches "cost-effective").
+        """
+        if not settings.WEBSITE_EXTRACTIVE_ENABLED:
+            return None
+        scored_chunks = self.rag.score_chunks(message)
+        if not scored_chunks:
+            return None
+
+        word_count = len(message.split())
+        top_score = scored_chunks[0][0]
+        runner_up = scored_chunks[1][0] if len(scored_chunks) > 1 else 0.0
+        margin = top_score - runner_up
+        top_chunk = scored_chunks[0][1]
+        matched = len(self.rag.matched_keywords(message, top_chunk))
+        in_heading = bool(self.rag.matched_keywords(message, top_chunk.splitlines()[0]))
+        use_extractive = (
+            word_count <= settings.WEBSITE_EXTRACTIVE_MAX_WORDS
+            and (matched >= settings.WEBSITE_EXTRACTIVE_MIN_KEYWORDS or in_heading)
+            and margin >= settings.WEBSITE_EXTRACTIVE_MIN_MARGIN
+        )
+
+        # Logged on every message so the threshold can be tuned from production traffic
+        logger.info(
+            f"Website answer mode: {'extractive' if use_extractive else 'llm'} "
+            f"(words={word_count}, matched={matched}, in_heading={in_heading}, top={top_score:.2f}, runner_up={runner_up:.2f}, "
+            f"margin={margin:.2f}, min_margin={settings.WEBSITE_EXTRACTIVE_MIN_MARGIN})"
+        )
+        if not use_extractive:
+            return None
+        return format_extractive_answer(top_chunk)
+
+    async def _process_openai(self, messages: List[Dict[str, str]], token: str = None, *, usage: UsageTracker) -> Dict[str, Any]:
+        if self.provider == "fake":
+            from app.fakes.llm import FakeAsyncOpenAI
+            client = FakeAsyncOpenAI()
+        else:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
         
-        response = await client.chat.completions.create(
-            model="gpt-4o",
+        response = await usage.call(lambda: client.chat.completions.create(
+            model=usage.model,
             messages=messages,
             # tools=WEBSITE_TOOLS,
             # tool_choice="auto"
-        )
+        ))
         
         response_message = response.choices[0].message
         # tool_calls = response_message.tool_calls
@@ -83,11 +163,15 @@ class WebsiteAgent:
         
         return {"response_text": response_message.content}
 
-    async def _process_gemini(self, messages: List[Dict[str, str]], token: str = None) -> Dict[str, Any]:
+    async def _process_gemini(self, messages: List[Dict[str, str]], token: str = None, *, usage: UsageTracker) -> Dict[str, Any]:
         import google.generativeai as genai
         from google.generativeai.types import FunctionDeclaration, Tool
         
-        genai.configure(api_key=settings.GEMINI_API_KEY)
+        if self.provider == "fake":
+            from app.fakes.llm import FakeGenerativeModel as GenerativeModel
+        else:
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            GenerativeModel = genai.GenerativeModel
         
         # gemini_tools = [
         #     FunctionDeclaration(
@@ -106,7 +190,7 @@ class WebsiteAgent:
         #     )
         # ]
         
-        model = genai.GenerativeModel(
+        model = GenerativeModel(
             model_name=settings.GEMINI_MODEL,
             # tools=[Tool(function_declarations=gemini_tools)]
         )
@@ -128,8 +212,8 @@ class WebsiteAgent:
         # Extract system prompt from the first message we constructed
         system_instruction = messages[0]["content"]
         
-        model = genai.GenerativeModel(
-            model_name=settings.GEMINI_MODEL,
+        model = GenerativeModel(
+            model_name=usage.model,
             # tools=[Tool(function_declarations=gemini_tools)],
             system_instruction=system_instruction
         )
@@ -137,7 +221,7 @@ class WebsiteAgent:
         chat = model.start_chat(history=chat_history[:-1]) # All except last user message
         last_user_msg = messages[-1]["content"]
         
-        response = await chat.send_message_async(last_user_msg)
+        response = await usage.call(lambda: chat.send_message_async(last_user_msg))
         
         # part = response.candidates[0].content.parts[0]
         
@@ -0,0 +1,84 @@
+"""
+Benchmark for app.utils.date_utils.parse_date_flexible.
+
+Compares the previous implementation (dateparser with language autodetection
+for every call) against the fast path, with and without the memo, on a corpus
+of booking phrases taken from chat logs.
+
+    python -m benchmarks.bench_date_parsing
+"""
+import time
+from datetime import datetime
+
+from app.utils.date_utils import parse_date_flexible, clear_date_cache, date_cache_info
+
+BOOKING_PHRASES = [
+    "tomorrow 10am",
+    "tomorrow at 10am",
+    "Tomorrow at 10:30 am",
+    "today at 5",
+    "today at 5pm",
+    "today 17:00",
+    "next monday 3pm",
+    "next friday at 11 am",
+    "saturday 4pm",
+    "10am tomorrow",
+    "day after tomorrow 6pm",
+    "2026-02-10T09:00:00.000+0000",
+    "2026-02-10T14:30:00.000+0000",
+    "2026-03-01 10:00",
+    "2026-03-01",
+    "dec 24 2025",
+    "Dec 24",
+    "tomorrow",
+    "in 2 hours",
+]
+
+ROUNDS = 20
+
+
+def _legacy_parse(date_str: str) -> str:
+    import dateparser
+    dt = dateparser.parse(
+        date_str,
+        settings={
+            'RELATIVE_BASE': datetime.now(),
+            'PREFER_DATES_FROM': 'future',
+            'RETURN_AS_TIMEZONE_AWARE': True
+        }
+    )
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.000+0000") if dt else ""
+
+
+def _time_per_call(fn, clear_between_rounds: bool) -> float:
+    calls = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        if clear_between_rounds:
+            clear_date_cache()
+        for phrase in BOOKING_PHRASES:
+            fn(phrase)
+            calls += 1
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main():
+    # Load dateparser's language data once so no variant pays the one-off cost
+    _legacy_parse("tomorrow 10am")
+    parse_date_flexible("dec 24 2025")
+
+    legacy_us = _time_per_call(_legacy_parse, clear_between_rounds=False)
+    cold_us = _time_per_call(parse_date_flexible, clear_between_rounds=True)
+    clear_date_cache()
+    memo_us = _time_per_call(parse_date_flexible, clear_between_rounds=False)
+    info = date_cache_info()
+
+    print(f"Corpus: {len(BOOKING_PHRASES)} phrases x {ROUNDS} rounds")
+    print(f"{'dateparser (autodetect)':<28}{legacy_us:>10.1f} us/call")
+    print(f"{'fast path, memo cleared':<28}{cold_us:>10.1f} us/call  ({legacy_us / cold_us:.1f}x)")
+    print(f"{'fast path + memo':<28}{memo_us:>10.1f} us/call  ({legacy_us / memo_us:.1f}x)")
+    print(f"Memo: {info['hits']} hits, {info['misses']} misses, {info['size']} entries")
+
+
+if __name__ == "__main__":
+    main()
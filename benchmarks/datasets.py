@@ -0,0 +1,108 @@
+"""
+Seeded synthetic datasets for the benchmarks, shaped like the Java API results.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from app.models import AppointmentSummary, BusinessSummary, LeadListResponse, LeadSummary, Offer
+
+SIZES = (10, 1_000, 50_000)
+
+FIRST_NAMES = ["Aisha", "Ravi", "Mei Ling", "John", "Priya", "Ahmad", "Siti", "Karthik", "Wei", "Nur"]
+LAST_NAMES = ["Tan", "Kumar", "Lim", "Wong", "Singh", "Rahman", "Lee", "Ng"]
+SERVICES = ["Gents Cut", "Ladies Cut", "Hair Colouring", "Keratin Treatment", "Gold Facial", "Manicure", "Pedicure"]
+JAVA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000+0000"
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def make_leads(n: int, seed: int = 0) -> LeadListResponse:
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1)
+    items = []
+    for i in range(n):
+        value = round(rng.choice([0, 35, 60, 120, 250, 590, 1500]) * rng.uniform(0.8, 1.2), 2)
+        items.append(LeadSummary(
+            lead_id=str(100000 + i),
+            name=_name(rng),
+            status=rng.choice(["NEW", "FOLLOWUP", "CONVERTED", "LOST"]),
+            created_at=(base - timedelta(minutes=rng.randint(0, 130000))).strftime(JAVA_DATETIME_FORMAT),
+            phone=f"65{rng.randint(80000000, 99999999)}",
+            email="N/A",
+            source=rng.choice(["PH", "WA", "WEB"]),
+            value=value,
+            leadValue=value,
+        ))
+    return LeadListResponse(total=n, items=items)
+
+
+def make_lead_resultset(n: int, seed: int = 0) -> LeadListResponse:
+    """make_leads() with the items held as a columnar LeadResultSet, as JavaService returns them."""
+    from app.resultsets import LeadResultSet
+    items = make_leads(n, seed).items
+    columns = {name: [getattr(lead, name) for lead in items] for name in LeadSummary.model_fields}
+    return LeadListResponse.model_construct(total=n, items=LeadResultSet(**columns))
+
+
+def make_upstream_leads(n: int, seed: int = 0) -> bytes:
+    """A sales-enq/list response body of n enquiries, as the fake Java API sends it (nulls included)."""
+    from app.fakes.java_api import FakeDataset, FakeJavaSettings
+    return json.dumps(FakeDataset(FakeJavaSettings(leads_per_business=n, seed=seed)).leads(11)).encode("utf-8")
+
+
+def make_upstream_bookings(n: int, seed: int = 0) -> bytes:
+    """A bookings/ response body of n bookings (one day, nested customerInfo and services)."""
+    from app.fakes.java_api import FakeDataset, FakeJavaSettings
+    dataset = FakeDataset(FakeJavaSettings(bookings_per_day=n, seed=seed))
+    day = datetime(2026, 2, 10)
+    return json.dumps(dataset.bookings(11, day, day, [])).encode("utf-8")
+
+
+def make_appointments(n: int, seed: int = 0) -> List[AppointmentSummary]:
+    rng = random.Random(seed)
+    base = datetime(2026, 2, 10, 9, 0)
+    return [
+        AppointmentSummary(
+            booking_id=str(700000 + i),
+            customer_name=_name(rng),
+            service_name=", ".join(rng.sample(SERVICES, k=rng.randint(1, 2))),
+            start_time=(base + timedelta(minutes=15 * rng.randint(0, 44))).strftime(JAVA_DATETIME_FORMAT),
+            status=rng.choice(["QU", "BO", "PE"]),
+            phone=f"65{rng.randint(80000000, 99999999)}",
+        )
+        for i in range(n)
+    ]
+
+
+def make_offers(n: int, seed: int = 0) -> List[Offer]:
+    rng = random.Random(seed)
+    offers = []
+    for i in range(n):
+        link = f"https://qa.qtick.biz/biz-11?cb={rng.randint(100, 999)}" if rng.random() > 0.3 else None
+        offers.append(Offer(title=f"{rng.choice(SERVICES)} Special {i}", activeCampaigns={"BP": link} if link else {}, bp_link=link))
+    return offers
+
+
+def make_summaries(n: int, seed: int = 0) -> List[BusinessSummary]:
+    rng = random.Random(seed)
+    return [
+        BusinessSummary(
+            business_id=str(1000 + i),
+            total_leads=rng.randint(0, 500),
+            total_appointments=rng.randint(0, 300),
+            bills_count=rng.randint(0, 300),
+            total_revenue=round(rng.uniform(0, 50000), 2),
+            recent_activities=[],
+        )
+        for i in range(n)
+    ]
+
+
+def make_phone_mappings(n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    phones = rng.sample(range(80000000, 99999999), n)
+    return {f"65{phone}": 10000 + i for i, phone in enumerate(phones)}
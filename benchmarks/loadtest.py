@@ -0,0 +1,347 @@
+"""
+Load generator for the chat endpoints (/agent/chat, /agent/phone/chat, /website/chat).
+
+Replays a weighted prompt mix with N concurrent virtual users and reports
+throughput, latency percentiles, error rates and event-loop lag per endpoint.
+
+    # In-process, fully offline: fake LLM + fake Java API on a local port
+    python -m benchmarks.loadtest --concurrency 50 --duration 30 --output results.json
+
+    # Against a running server (configure its LLM/upstream yourself)
+    python -m benchmarks.loadtest --url http://localhost:8000 --concurrency 20
+
+    # Compare with an earlier run
+    python -m benchmarks.loadtest --compare baseline.json --output results.json
+
+In-process mode drives the FastAPI app through httpx.ASGITransport, so the
+measured event-loop lag is the service's own. Over HTTP it is the load
+generator's loop, which only tells you whether the client kept up.
+A mix file is a JSON list of {"endpoint", "weight", "payload"} entries.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import socket
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = [
+    {"endpoint": "/agent/chat", "weight": 3, "payload": {"prompt": "show my leads", "business_id": 11}},
+    {"endpoint": "/agent/chat", "weight": 2, "payload": {"prompt": "appointments for today", "business_id": 11}},
+    {"endpoint": "/agent/chat", "weight": 2, "payload": {"prompt": "business summary for this week", "business_id": 96}},
+    {"endpoint": "/agent/chat", "weight": 1, "payload": {"prompt": "hi", "business_id": 96}},
+    {"endpoint": "/agent/phone/chat", "weight": 4, "payload": {"prompt": "show my leads", "phone": "6592701525"}},
+    {"endpoint": "/agent/phone/chat", "weight": 3, "payload": {"prompt": "appointments for tomorrow", "phone": "6590306703"}},
+    {"endpoint": "/agent/phone/chat", "weight": 2, "payload": {"prompt": "any offers running?", "phone": "6592701525"}},
+    {"endpoint": "/agent/phone/chat", "weight": 1, "payload": {"prompt": "search for facial", "phone": "6590306703"}},
+    {"endpoint": "/website/chat", "weight": 2, "payload": {"message": "How does QTick help a salon manage appointments and reminders?"}},
+    {"endpoint": "/website/chat", "weight": 1, "payload": {"message": "What does the pricing look like for a small clinic?"}},
+]
+
+LAG_SAMPLE_INTERVAL = 0.01
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(math.ceil(pct / 100 * len(sorted_values)), 1), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    values = sorted(latencies_ms)
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(values[-1], 2) if values else 0.0,
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+    }
+
+
+class LoopLagMonitor:
+    """Samples how late a periodic sleep wakes up; the overshoot is time the loop was blocked."""
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples_ms.append(max(loop.time() - start - self.interval, 0.0) * 1000)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies_ms: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, latency_ms: float, error: Optional[str] = None):
+        self.latencies_ms[endpoint].append(latency_ms)
+        if error:
+            self.errors[endpoint][error] += 1
+
+    def report(self, elapsed: float, lag_ms: List[float]) -> Dict[str, Any]:
+        endpoints = {}
+        all_latencies = []
+        total_errors = 0
+        for endpoint, latencies in sorted(self.latencies_ms.items()):
+            errors = sum(self.errors[endpoint].values())
+            total_errors += errors
+            all_latencies.extend(latencies)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(errors / len(latencies), 4),
+                "errors": dict(self.errors[endpoint]),
+                "latency_ms": summarize_latencies(latencies),
+            }
+        lag = sorted(lag_ms)
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": len(all_latencies),
+            "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0.0,
+            "latency_ms": summarize_latencies(all_latencies),
+            "loop_lag_ms": {
+                "p50": round(percentile(lag, 50), 2),
+                "p99": round(percentile(lag, 99), 2),
+                "max": round(lag[-1], 2) if lag else 0.0,
+                "samples": len(lag),
+            },
+            "endpoints": endpoints,
+        }
+
+
+async def _virtual_user(client: httpx.AsyncClient, mix: List[Dict[str, Any]], rng: random.Random,
+                        recorder: Recorder, deadline: float, budget: List[int], user_id: int, think_time: float):
+    weights = [entry.get("weight", 1) for entry in mix]
+    while time.perf_counter() < deadline and budget[0] > 0:
+        budget[0] -= 1
+        entry = rng.choices(mix, weights=weights)[0]
+        payload = dict(entry["payload"])
+        if entry["endpoint"] == "/website/chat":
+            payload.setdefault("conversation_id", f"loadtest-{user_id}")
+
+        start = time.perf_counter()
+        error = None
+        try:
+            response = await client.post(entry["endpoint"], json=payload)
+            if response.status_code >= 400:
+                error = f"http_{response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        recorder.record(entry["endpoint"], (time.perf_counter() - start) * 1000, error)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def run_load(client: httpx.AsyncClient, mix: List[Dict[str, Any]], concurrency: int, duration: float,
+                   max_requests: Optional[int] = None, warmup_requests: int = 0, think_time: float = 0.0,
+                   seed: int = 0) -> Dict[str, Any]:
+    """Runs the closed-loop load and returns the report dict."""
+    for i in range(warmup_requests):
+        entry = mix[i % len(mix)]
+        await client.post(entry["endpoint"], json=entry["payload"])
+
+    recorder = Recorder()
+    monitor = LoopLagMonitor()
+    budget = [max_requests if max_requests else float("inf")]
+    monitor.start()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _virtual_user(client, mix, random.Random(seed + i), recorder, deadline, budget, i, think_time)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+    return recorder.report(elapsed, monitor.samples_ms)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_java_server(latency_ms: float, error_rate: float, seed: int) -> str:
+    """Starts the fake Java API on a free local port in a daemon thread; returns its base URL."""
+    import uvicorn
+    from app.fakes.java_api import FakeJavaSettings, create_app
+
+    port = _free_port()
+    config = FakeJavaSettings.from_env(latency_ms=latency_ms, error_rate=error_rate, seed=seed)
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    for _ in range(200):
+        if server.started:
+            break
+        time.sleep(0.025)
+    return f"http://127.0.0.1:{port}/"
+
+
+def configure_offline(args) -> Dict[str, Any]:
+    """Points the app at the fake LLM and the fake Java API. Must run before app.main is imported."""
+    from app.config import settings
+
+    settings.LLM_PROVIDER = "fake"
+    settings.FAKE_LLM_STYLE = args.llm_style
+    settings.FAKE_LLM_LATENCY_MS = args.llm_latency_ms
+    settings.USE_MOCK_DATA = False
+    # The mix repeats a few prompts, so cached plans would skip the loop being measured
+    settings.PLAN_CACHE_ENABLED = args.plan_cache
+    settings.PREFETCH_ENABLED = args.prefetch
+    settings.JAVA_API_BASE_URL = start_fake_java_server(args.upstream_latency_ms, args.upstream_error_rate, args.seed)
+    settings.QTICK_JAVA_SERVICE_TOKEN = settings.QTICK_JAVA_SERVICE_TOKEN or "loadtest-token"
+    settings.QTICK_BIZ_PROFILE_SECRET = settings.QTICK_BIZ_PROFILE_SECRET or "bizprofile-loadtest"
+    return {
+        "llm_style": args.llm_style,
+        "llm_latency_ms": args.llm_latency_ms,
+        "upstream_latency_ms": args.upstream_latency_ms,
+        "upstream_error_rate": args.upstream_error_rate,
+        "plan_cache": args.plan_cache,
+        "prefetch": args.prefetch,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'endpoint':<20}{'reqs':>7}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report)]
+    for name, stats in rows:
+        lat = stats["latency_ms"]
+        print(f"{name:<20}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>6.1f}%"
+              f"{lat['p50']:>9.1f}{lat['p95']:>9.1f}{lat['p99']:>9.1f}")
+    lag = report["loop_lag_ms"]
+    print(f"event loop lag: p50={lag['p50']:.1f}ms p99={lag['p99']:.1f}ms max={lag['max']:.1f}ms")
+
+
+def print_comparison(report: Dict[str, Any], baseline: Dict[str, Any]):
+    base = baseline["results"]
+
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"vs {baseline.get('commit') or 'baseline'}: "
+          f"throughput {delta(report['throughput_rps'], base['throughput_rps'])}, "
+          f"p95 {delta(report['latency_ms']['p95'], base['latency_ms']['p95'])}, "
+          f"p99 {delta(report['latency_ms']['p99'], base['latency_ms']['p99'])}, "
+          f"errors {report['error_rate'] * 100:.2f}% (was {base['error_rate'] * 100:.2f}%)")
+
+
+async def _main(args) -> Dict[str, Any]:
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, "r", encoding="utf-8") as f:
+            mix = json.load(f)
+
+    offline = None
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+        lifespan = None
+    else:
+        offline = configure_offline(args)
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    logging.getLogger().setLevel(args.log_level.upper())
+    if lifespan:
+        await lifespan.__aenter__()
+    try:
+        async with client:
+            report = await run_load(
+                client, mix, args.concurrency, args.duration, args.requests, args.warmup, args.think_time, args.seed
+            )
+    finally:
+        if lifespan:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "target": args.url or "in-process",
+        "offline": offline,
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "max_requests": args.requests,
+            "warmup_requests": args.warmup,
+            "think_time_s": args.think_time,
+            "seed": args.seed,
+            "mix": args.mix or "default",
+        },
+        "results": report,
+    }
+
+
+def main(argv: List[str] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Load test the QTick chat endpoints")
+    parser.add_argument("--url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests sent first")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests (s)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--mix", help="JSON prompt mix file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--log-level", default="warning", help="App log level while measuring")
+    parser.add_argument("--llm-style", choices=["openai", "gemini"], default="openai")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=40.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--plan-cache", action="store_true", help="Let repeated prompts replay cached tool plans")
+    parser.add_argument("--prefetch", action="store_true", help="Prefetch likely tool reads during phone chat LLM calls")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(_main(args))
+    print_report(result["results"])
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(result["results"], json.load(f))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
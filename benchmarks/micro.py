@@ -0,0 +1,374 @@
+"""
+Micro-benchmarks for the hot pure-Python paths, with stored baselines.
+
+Each benchmark is timed pytest-benchmark style: the callable is calibrated to
+run for at least --min-time per round, several rounds are taken and the
+median per-call time is reported. Dataset-driven benchmarks run at 10, 1k and
+50k rows (see benchmarks/datasets.py) and also report the median per row.
+
+    python -m benchmarks.micro                   # run and print
+    python -m benchmarks.micro -k whatsapp       # only names containing "whatsapp"
+    python -m benchmarks.micro --save            # store as the baseline
+    python -m benchmarks.micro --check           # fail if slower than baseline + tolerance
+
+Baselines live in benchmarks/baselines/micro.json. They are only comparable on
+the machine that produced them, so re-save after changing hardware.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks import datasets
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+DEFAULT_TOLERANCE = 0.25
+
+# name -> (group, sizes or None, setup). setup(size) returns the zero-argument callable to time.
+BENCHMARKS: Dict[str, Tuple[str, Optional[Tuple[int, ...]], Callable[..., Callable[[], Any]]]] = {}
+
+
+def bench(group: str, sizes: Optional[Tuple[int, ...]] = None):
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (group, sizes, setup)
+        return setup
+    return register
+
+
+def _run_sync(coro):
+    """Drives a coroutine that never actually suspends (stub services) without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended; benchmark stubs must not await real I/O")
+
+
+class _StubService:
+    """Returns canned data in place of MockService/JavaService."""
+
+    def __init__(self, leads=None, appointments=None, offers=None):
+        self._leads, self._appointments, self._offers = leads, appointments, offers
+
+    async def list_leads(self, business_id):
+        return self._leads
+
+    async def list_appointments(self, business_id, from_date, to_date, status="QU,BO,PE"):
+        return self._appointments
+
+    async def list_offers(self, business_id):
+        return self._offers
+
+
+# --- date utils ------------------------------------------------------------
+
+DATE_PHRASES = ["tomorrow 10am", "today at 5pm", "next monday 3pm", "10am tomorrow",
+                "2026-02-10T09:00:00.000+0000", "2026-03-01 10:00", "saturday 4pm"]
+PERIODS = ["today", "yesterday", "this week", "last week", "this month", "last month"]
+
+
+@bench("date_utils")
+def parse_date_flexible_memo():
+    from app.utils.date_utils import parse_date_flexible
+    for phrase in DATE_PHRASES:
+        parse_date_flexible(phrase)
+    return lambda: [parse_date_flexible(phrase) for phrase in DATE_PHRASES]
+
+
+@bench("date_utils")
+def parse_date_flexible_cold():
+    from app.utils.date_utils import clear_date_cache, parse_date_flexible
+
+    def run():
+        clear_date_cache()
+        return [parse_date_flexible(phrase) for phrase in DATE_PHRASES]
+    return run
+
+
+@bench("date_utils")
+def get_date_range_periods():
+    from app.utils.date_utils import get_date_range
+    return lambda: [get_date_range(period) for period in PERIODS]
+
+
+# --- WhatsApp formatters and tool text ----------------------------------------
+
+@bench("whatsapp", sizes=datasets.SIZES)
+def whatsapp_lead_list(size):
+    from app.tools.leads import format_whatsapp_lead_list
+    data = datasets.make_leads(size)
+    return lambda: format_whatsapp_lead_list(data, 11)
+
+
+@bench("whatsapp", sizes=datasets.SIZES)
+def tool_list_leads(size):
+    from app.tools import leads
+    stub = _StubService(leads=datasets.make_leads(size))
+    original = leads.get_service
+    leads.get_service = lambda token=None, client_id=None: stub
+    # Renderings are lazy; build the web-chat one as a request would
+    run = lambda: _run_sync(leads.list_leads(11)).text
+    run.teardown = lambda: setattr(leads, "get_service", original)
+    return run
+
+
+@bench("whatsapp", sizes=datasets.SIZES)
+def tool_list_appointments(size):
+    from app.tools import appointments
+    stub = _StubService(appointments=datasets.make_appointments(size))
+    original = appointments.get_service
+    appointments.get_service = lambda token=None, client_id=None: stub
+    run = lambda: _run_sync(appointments.list_appointments(11, period="today")).text
+    run.teardown = lambda: setattr(appointments, "get_service", original)
+    return run
+
+
+@bench("whatsapp", sizes=(10, 1_000))
+def whatsapp_offer_list(size):
+    from app.tools.offers import format_whatsapp_offer_list
+    offers = datasets.make_offers(size)
+    return lambda: format_whatsapp_offer_list(offers, "11")
+
+
+@bench("whatsapp")
+def whatsapp_business_summary():
+    from app.tools.business import format_whatsapp_summary
+    summary = datasets.make_summaries(1)[0]
+    return lambda: format_whatsapp_summary(summary, "2026/02/01", "2026/02/07")
+
+
+@bench("whatsapp", sizes=(10, 1_000))
+def whatsapp_franchise_summary(size):
+    from app.tools.business import format_whatsapp_franchise_summary
+    details = datasets.make_summaries(size)
+    consolidated = details[0]
+    return lambda: format_whatsapp_franchise_summary(consolidated, details, "2026/02/01", "2026/02/07")
+
+
+@bench("whatsapp", sizes=datasets.SIZES)
+def whatsapp_lead_list_columnar(size):
+    from app.tools.leads import format_whatsapp_lead_list
+    data = datasets.make_lead_resultset(size)
+    return lambda: format_whatsapp_lead_list(data, 11)
+
+
+# --- RAG ---------------------------------------------------------------------
+
+@bench("rag")
+def rag_retrieve():
+    from app.services.rag_service import SimpleRAGService
+    rag = SimpleRAGService()
+    queries = ["How does QTick manage appointments?", "pricing for a small salon",
+               "Can I send WhatsApp reminders to customers?", "loyalty points and offers"]
+    return lambda: [rag.retrieve(query) for query in queries]
+
+
+# --- phone mappings --------------------------------------------------------------
+
+def _mapping_file(size: int) -> Tuple[str, Dict[str, int]]:
+    mappings = datasets.make_phone_mappings(size)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-mappings-"), "phone_mappings.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(mappings, f)
+    return path, mappings
+
+
+def _lookup_phones(mappings: Dict[str, int]) -> List[str]:
+    # The same number of lookups at every size (49 spread-out hits, one miss)
+    phones = list(mappings)
+    return [phones[(i * 7919) % len(phones)] for i in range(49)] + ["+65 0000 0000"]
+
+
+@bench("mappings", sizes=datasets.SIZES)
+def mappings_registry_lookup(size):
+    from app.utils.mappings import PhoneMappingRegistry
+    path, mappings = _mapping_file(size)
+    registry = PhoneMappingRegistry(path)
+    phones = _lookup_phones(mappings)
+    return lambda: [registry.get(phone) for phone in phones]
+
+
+@bench("mappings", sizes=datasets.SIZES)
+def mappings_sqlite_lookup(size):
+    from app.utils.mappings import SqliteMappingStore
+    path, mappings = _mapping_file(size)
+    store = SqliteMappingStore(path.replace(".json", ".db"), seed_json_path=path)
+    phones = _lookup_phones(mappings)
+    return lambda: [store.get(phone) for phone in phones]
+
+
+# --- ToolResult serialization ------------------------------------------------------
+
+@bench("serialization", sizes=datasets.SIZES)
+def tool_result_to_json_leads(size):
+    from app.agent import tool_result_to_json
+    from app.models import ToolResult
+    items = datasets.make_leads(size).items
+    # A fresh result per call: the payload is cached on the ToolResult after the first dump
+    return lambda: tool_result_to_json(ToolResult(type="list_leads", data=items, text=""))
+
+
+@bench("serialization", sizes=datasets.SIZES)
+def tool_result_to_message_leads(size):
+    from app.agent import tool_result_to_message
+    from app.models import ToolResult
+    items = datasets.make_leads(size).items
+    return lambda: tool_result_to_message(ToolResult(type="list_leads", data=items, text=""))
+
+
+@bench("serialization", sizes=datasets.SIZES)
+def chat_response_leads(size):
+    # Full per-request path: dump once for the LLM, reuse it for the HTTP body
+    from app.agent import build_agent_response, tool_result_to_json
+    from app.main import chat_response
+    from app.models import ToolResult
+    items = datasets.make_leads(size).items
+
+    def run():
+        result = ToolResult(type="list_leads", data=items, text="")
+        tool_result_to_json(result)
+        return chat_response("show leads", build_agent_response("list_leads", "", result)).body
+    return run
+
+
+# --- upstream decoding ---------------------------------------------------------------
+# Response bodies straight off the wire; compare per_row_ns across sizes
+
+DECODING_SIZES = (10, 10_000)
+
+
+@bench("decoding", sizes=DECODING_SIZES)
+def decode_leads(size):
+    from app.services.decoding import decode_leads
+    body = datasets.make_upstream_leads(size)
+    return lambda: decode_leads(body)
+
+
+@bench("decoding", sizes=DECODING_SIZES)
+def decode_appointments(size):
+    from app.services.decoding import decode_appointments
+    body = datasets.make_upstream_bookings(size)
+    return lambda: decode_appointments(body)
+
+
+# --- runner ------------------------------------------------------------------------
+
+def time_callable(fn: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, float]:
+    """Calibrates iterations per round to last min_time, then returns per-call stats in microseconds."""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 10 if elapsed < min_time / 10 else 2
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - start) / iterations * 1_000_000)
+    return {
+        "median_us": statistics.median(per_call),
+        "min_us": min(per_call),
+        "stddev_us": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "iterations": iterations,
+        "rounds": rounds,
+    }
+
+
+def run_benchmarks(name_filter: str = "", max_size: Optional[int] = None, rounds: int = 5,
+                   min_time: float = 0.05) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, (group, sizes, setup) in BENCHMARKS.items():
+        for size in sizes or (None,):
+            key = f"{group}/{name}" + (f"[{size}]" if size is not None else "")
+            if name_filter and name_filter not in key:
+                continue
+            if size is not None and max_size is not None and size > max_size:
+                continue
+            fn = setup(size) if size is not None else setup()
+            try:
+                results[key] = time_callable(fn, rounds, min_time)
+                if size is not None:
+                    results[key]["per_row_ns"] = results[key]["median_us"] * 1000 / size
+            finally:
+                getattr(fn, "teardown", lambda: None)()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[Tuple[str, float, float, float]]:
+    """Returns (name, baseline_us, current_us, ratio) for every benchmark slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median_us"], stats["median_us"]
+        if old and new > old * (1 + tolerance):
+            regressions.append((name, old, new, new / old))
+    return regressions
+
+
+def _format_us(value: float) -> str:
+    if value >= 1000:
+        return f"{value / 1000:.2f} ms"
+    return f"{value:.2f} us"
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the micro-benchmark suite")
+    parser.add_argument("-k", dest="name_filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--max-size", type=int, help="Skip dataset sizes above this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on regressions beyond the tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = run_benchmarks(args.name_filter, args.max_size, args.rounds, args.min_time)
+
+    print(f"{'benchmark':<52}{'median':>12}{'min':>12}{'per row':>12}{'vs baseline':>14}")
+    for name, stats in results.items():
+        old = baseline.get(name, {}).get("median_us")
+        change = f"{(stats['median_us'] - old) / old * 100:+.1f}%" if old else "-"
+        per_row = f"{stats['per_row_ns']:.0f} ns" if "per_row_ns" in stats else "-"
+        print(f"{name:<52}{_format_us(stats['median_us']):>12}{_format_us(stats['min_us']):>12}{per_row:>12}{change:>14}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        merged = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.machine()},
+                "results": dict(sorted(merged.items())),
+            }, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.check:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {_format_us(old)} -> {_format_us(new)} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
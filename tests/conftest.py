@@ -0,0 +1,9 @@
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def no_usage_db(mocker):
+    # Keep test traffic out of data/llm_usage.db; tests that read usage back point it at tmp_path
+    mocker.patch.object(settings, "LLM_USAGE_DB_PATH", "")
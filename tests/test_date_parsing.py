@@ -1,5 +1,6 @@
 import unittest
-from app.utils.date_utils import parse_date_flexible
+from unittest.mock import patch
+from app.utils.date_utils import parse_date_flexible, clear_date_cache, date_cache_info
 from datetime import datetime, timedelta
 
 class TestDateParsing(unittest.TestCase):
@@ -33,5 +34,46 @@ class TestDateParsing(unittest.TestCase):
         self.assertEqual(result, iso_str)
         print(f"ISO: {result}")
 
+    def test_fast_path_relative_day_with_time(self):
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.assertEqual(parse_date_flexible("tomorrow 10am"), f"{tomorrow}T10:00:00.000+0000")
+        self.assertEqual(parse_date_flexible("Tomorrow at 10:30 am"), f"{tomorrow}T10:30:00.000+0000")
+        self.assertEqual(parse_date_flexible("10am tomorrow"), f"{tomorrow}T10:00:00.000+0000")
+
+    def test_fast_path_bare_hour_is_afternoon(self):
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.assertEqual(parse_date_flexible("today at 5"), f"{today}T17:00:00.000+0000")
+        self.assertEqual(parse_date_flexible("today 09:15"), f"{today}T09:15:00.000+0000")
+
+    def test_fast_path_explicit_minutes_are_24_hour(self):
+        today = datetime.now().strftime("%Y-%m-%d")
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.assertEqual(parse_date_flexible("tomorrow 07:00"), f"{tomorrow}T07:00:00.000+0000")
+        self.assertEqual(parse_date_flexible("today 05:30"), f"{today}T05:30:00.000+0000")
+        self.assertEqual(parse_date_flexible("today at 05"), f"{today}T05:00:00.000+0000")
+
+    def test_fast_path_next_weekday_keeps_time(self):
+        now = datetime.now()
+        days_ahead = (0 - now.weekday() - 1) % 7 + 1
+        expected = (now + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+        self.assertEqual(parse_date_flexible("next monday 3pm"), f"{expected}T15:00:00.000+0000")
+
+    def test_fast_path_skips_dateparser(self):
+        clear_date_cache()
+        with patch("dateparser.parse") as mock_parse:
+            parse_date_flexible("next friday at 11 am")
+            parse_date_flexible("2026-02-10T09:00:00.000+0000")
+            mock_parse.assert_not_called()
+
+    def test_memoizes_explicit_times_only(self):
+        clear_date_cache()
+        parse_date_flexible("tomorrow 10am")
+        parse_date_flexible("tomorrow 10am")
+        parse_date_flexible("tomorrow")
+        parse_date_flexible("tomorrow")
+        info = date_cache_info()
+        self.assertEqual(info["hits"], 1)
+        self.assertEqual(info["size"], 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import Offer, Service
+from app.services.decoding import decode_appointments, decode_leads, decode_offers, decode_services
+from benchmarks import datasets
+
+
+def test_leads_decode_with_the_upstream_fallbacks():
+    body = json.dumps([
+        {"enqNo": 1100001, "custName": "Ravi Kumar", "status": "NEW", "enquiredOn": "2026-01-02T10:00:00.000+0000",
+         "phone": "6591234567", "email": "ravi@example.com", "srcChannel": "WA", "value": 120, "leadValue": "99.5",
+         "enqFor": "Gents Cut"},
+        {"enqNo": 1100002, "custName": None, "status": "LOST", "phone": None, "srcChannel": None, "value": None},
+    ]).encode()
+
+    first, second = decode_leads(body)
+
+    assert first.model_dump() == {
+        "lead_id": "1100001", "name": "Ravi Kumar", "status": "NEW", "created_at": "2026-01-02T10:00:00.000+0000",
+        "phone": "6591234567", "email": "ravi@example.com", "source": "WA", "value": 120.0, "leadValue": 99.5,
+    }
+    assert (second.name, second.phone, second.email, second.source) == ("Unknown", "N/A", "N/A", "N/A")
+    assert (second.created_at, second.value, second.leadValue) == ("", 0.0, 0.0)
+
+
+def test_decoders_accept_bytes_or_parsed_json_and_ignore_non_arrays():
+    body = datasets.make_upstream_leads(30)
+    assert decode_leads(body) == decode_leads(json.loads(body))
+    for payload in (b"", b"{}", b'{"message": "No data"}', {}, None):
+        assert len(decode_leads(payload)) == 0
+        assert decode_offers(payload) == []
+
+
+def test_appointments_flatten_customer_and_services():
+    body = json.dumps([
+        {"bookingId": 7001, "bkStartTime": "2026-02-10T09:00:00.000+0000", "status": "BO",
+         "customerInfo": {"name": "Mei Ling Tan", "phone": None},
+         "services": [{"serviceId": 1, "serviceName": "Gents Cut"}, {"serviceId": 2, "serviceName": "Beard Trim"}]},
+        {"bookingId": 7002, "startTime": "2026-02-10T11:00:00.000+0000", "status": "QU", "customerInfo": None, "services": []},
+    ])
+
+    first, second = decode_appointments(body)
+
+    assert (first.booking_id, first.customer_name, first.phone) == ("7001", "Mei Ling Tan", "N/A")
+    assert first.service_name == "Gents Cut, Beard Trim"
+    assert (second.customer_name, second.service_name) == ("Unknown", "No Service")
+    assert second.start_time == "2026-02-10T11:00:00.000+0000"
+
+
+def test_offers_and_services_decode_to_models():
+    offers = decode_offers(json.dumps([
+        {"title": "", "pubStatus": "U", "activeCampaigns": {"BP": "https://qa.qtick.biz/biz-11", "WS": "x"}},
+        {"title": "Gold Facial Special", "activeCampaigns": None},
+    ]))
+    assert offers == [
+        Offer(title="Untitled Offer", activeCampaigns={"BP": "https://qa.qtick.biz/biz-11", "WS": "x"}, bp_link="https://qa.qtick.biz/biz-11"),
+        Offer(title="Gold Facial Special"),
+    ]
+
+    services = decode_services(b'[{"id": 11000, "name": "Gents Cut", "price": 25, "gender": null, "type": "S"}]')
+    assert services == [Service(id=11000, name="Gents Cut", price=25.0, type="S")]
+    with pytest.raises(ValidationError):
+        decode_services(b'[{"id": 1, "price": 25}]')
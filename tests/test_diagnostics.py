@@ -0,0 +1,60 @@
+import gc
+
+import httpx
+import pytest
+
+from app import main
+from app.config import settings
+from app.services.java_service import JavaService
+from app.utils import diagnostics
+from app.utils.metrics import REGISTRY
+
+
+@pytest.mark.asyncio
+async def test_live_counts_follow_service_lifetimes():
+    before = diagnostics.live_count("JavaService"), diagnostics.live_count("httpx.AsyncClient")
+
+    services = [JavaService() for _ in range(3)]
+    assert diagnostics.live_count("JavaService") == before[0] + 3
+    assert diagnostics.live_count("httpx.AsyncClient") == before[1] + 3
+    assert diagnostics.pool_totals()["open_clients"] >= 3
+    assert "java_services_live" in REGISTRY.render()
+
+    for service in services:
+        await service.client.aclose()
+    del services, service
+    gc.collect()
+    assert (diagnostics.live_count("JavaService"), diagnostics.live_count("httpx.AsyncClient")) == before
+
+
+@pytest.mark.asyncio
+async def test_pool_occupancy_counts_connections():
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    occupancy = diagnostics.pool_occupancy(client)
+    assert occupancy == {"closed": False, "connections": 0, "idle": 0, "active": 0, "queued": 0}
+    await client.aclose()
+    assert diagnostics.pool_occupancy(client)["closed"]
+
+
+def test_memory_report_shows_growth_since_baseline():
+    diagnostics.take_baseline()
+    leaked = [bytearray(1024) for _ in range(2000)]
+    try:
+        report = diagnostics.memory_report(limit=50)
+    finally:
+        diagnostics.stop_tracing()
+
+    growth = report["allocations"]["growth_since_baseline"]
+    assert any("test_diagnostics.py" in entry["where"] and entry["size_diff_bytes"] >= 2_000_000 for entry in growth)
+    assert report["fds"]["total"] > 0 and report["rss_bytes"] > 0
+    del leaked
+
+
+@pytest.mark.asyncio
+async def test_memory_endpoint_is_admin_only(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        assert (await client.get("/debug/memory")).status_code == 403
+        response = await client.get("/debug/memory", params={"scan": "true"}, headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert set(response.json()["heap_instances"]) == {"AsyncClient", "JavaService"}
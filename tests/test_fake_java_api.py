@@ -0,0 +1,93 @@
+import httpx
+import pytest
+
+from app.fakes.java_api import FakeJavaSettings, create_app, sample_latency
+from app.models import BookingRequest, LeadCreateRequest
+from app.services.java_service import JavaService
+
+
+def make_service(config: FakeJavaSettings, token: str = "test-token") -> JavaService:
+    service = JavaService(token=token)
+    headers = service.client.headers
+    service.client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(config)), base_url="http://fake/", headers=headers
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_java_service_round_trips_against_fake():
+    config = FakeJavaSettings(latency_ms=0, leads_per_business=50, bookings_per_day=5, services_per_business=30)
+    service = make_service(config)
+
+    leads = await service.list_leads(11)
+    assert leads.total == 50
+    assert all(lead.name for lead in leads.items)
+
+    appointments = await service.list_appointments(11, "2026/02/10 00:00:00", "2026/02/11 23:59:59")
+    assert len(appointments) == 10
+
+    summary = await service.get_summary_for_business("11", "2026-02-01", "2026-02-07")
+    assert summary.business_id == "11"
+    assert len(summary.recent_activities) == config.recent_activities
+
+    offers = await service.list_offers("11")
+    assert len(offers) == config.offers_per_business
+    assert all(offer.bp_link is None or offer.bp_link.startswith("https://") for offer in offers)
+
+    services = await service.search_services(11, "facial")
+    assert services and all("facial" in s.name.lower() for s in services)
+
+    booking = await service.create_appointment(
+        BookingRequest(bizId=11, phone="6592701525", serviceIds=[services[0].id], dateTime="2026-02-10T10:00:00.000+0000")
+    )
+    assert booking.services == [services[0].name]
+    assert booking.time == "10:00"
+
+    lead = await service.create_lead(LeadCreateRequest(business_id=11, name="Test Lead", phone="6590000000"))
+    assert lead.custName == "Test Lead"
+
+    assert await service.get_my_queues("6592701525") is not None
+
+
+@pytest.mark.asyncio
+async def test_dataset_is_deterministic_per_seed():
+    first = await make_service(FakeJavaSettings(latency_ms=0, seed=7)).list_leads(96)
+    second = await make_service(FakeJavaSettings(latency_ms=0, seed=7)).list_leads(96)
+    other = await make_service(FakeJavaSettings(latency_ms=0, seed=8)).list_leads(96)
+    assert first == second
+    assert first != other
+
+
+@pytest.mark.asyncio
+async def test_error_injection_and_auth():
+    failing = make_service(FakeJavaSettings(latency_ms=0, error_rate=1.0, error_status=503))
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        await failing.list_leads(11)
+    assert exc_info.value.response.status_code == 503
+
+    fake = create_app(FakeJavaSettings(latency_ms=0))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), base_url="http://fake/") as client:
+        response = await client.get("api/biz/11/offers")
+    assert response.status_code == 401
+
+
+def test_latency_distributions():
+    import random
+    rng = random.Random(1)
+    assert sample_latency(FakeJavaSettings(latency_distribution="fixed", latency_ms=80), rng) == 0.08
+    uniform = FakeJavaSettings(latency_distribution="uniform", latency_ms=100, latency_spread=0.2)
+    assert all(0.08 <= sample_latency(uniform, rng) <= 0.12 for _ in range(200))
+    lognormal = [sample_latency(FakeJavaSettings(latency_ms=50), rng) for _ in range(2000)]
+    assert 0.04 < sorted(lognormal)[1000] < 0.06
+    assert sample_latency(FakeJavaSettings(latency_ms=0), rng) == 0.0
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("FAKE_JAVA_ERROR_RATE", "0.25")
+    monkeypatch.setenv("FAKE_JAVA_REQUIRE_AUTH", "false")
+    config = FakeJavaSettings.from_env(seed=3, latency_ms=None)
+    assert config.error_rate == 0.25
+    assert config.require_auth is False
+    assert config.seed == 3
+    assert config.latency_ms == 50.0
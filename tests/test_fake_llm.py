@@ -0,0 +1,74 @@
+import pytest
+
+from app.agent import Agent
+from app.config import settings
+from app.fakes.llm import FakeAsyncOpenAI, FakeLLM, get_fake_llm
+from app.website_agent import WebsiteAgent
+
+
+@pytest.fixture
+def fake_provider(mocker):
+    mocker.patch.object(settings, "LLM_PROVIDER", "fake")
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", ["openai", "gemini"])
+async def test_agent_loops_run_scripted_tool_calls(fake_provider, mocker, style):
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", style)
+    agent = Agent()
+
+    result = await agent.process_prompt("show my leads", business_id=11)
+    assert result["type"] == "list_leads"
+    assert "leads found for business 11" in result["response_text"]
+
+    result = await agent.process_prompt("hi", business_id=11)
+    assert result["type"] == "get_help_guide"
+
+    result = await agent.process_prompt("what's the weather like", business_id=11)
+    assert result["type"] == "Chat"
+    assert result["response_text"].startswith("Thanks for your message")
+
+
+@pytest.mark.asyncio
+async def test_named_groups_and_business_id_fill_arguments():
+    llm = FakeLLM({"rules": [{
+        "match": r"appointments(?: for (?P<period>today|this week))?",
+        "steps": [
+            {"tool_calls": [{"name": "list_appointments", "arguments": {"business_id": "{business_id}", "period": "{period}"}}]},
+            {"text": "Done for {period}."},
+        ],
+    }]})
+    client = FakeAsyncOpenAI(llm=llm)
+    messages = [
+        {"role": "system", "content": "CURRENT BUSINESS CONTEXT: ID 96."},
+        {"role": "user", "content": "Appointments for this week"},
+    ]
+    first = await client.chat.completions.create(model="gpt-4o", messages=messages, tools=[{}])
+    call = first.choices[0].message.tool_calls[0]
+    assert call.function.name == "list_appointments"
+    assert call.function.arguments == '{"business_id": 96, "period": "this week"}'
+
+    messages.append(first.choices[0].message)
+    second = await client.chat.completions.create(model="gpt-4o", messages=messages)
+    assert second.choices[0].message.content == "Done for this week."
+
+    # Unmatched optional groups drop the argument instead of passing ""
+    messages[1]["content"] = "appointments"
+    bare = await client.chat.completions.create(model="gpt-4o", messages=messages[:2], tools=[{}])
+    assert bare.choices[0].message.tool_calls[0].function.arguments == '{"business_id": 96}'
+    assert llm.calls == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", ["openai", "gemini"])
+async def test_website_agent_gets_final_text_without_tools(fake_provider, mocker, style):
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", style)
+    result = await WebsiteAgent().process_message("How much does the pricing cost for a small salon?")
+    assert "pricing" in result["response_text"]
+
+
+def test_shared_instance_reads_script_once():
+    assert get_fake_llm() is get_fake_llm()
+    assert get_fake_llm().rules
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.config import settings
+from app.utils.history import HistoryCompactor, estimate_tokens, truncate_to_tokens
+from app.website_agent import WebsiteAgent
+
+
+def make_history(turns: int, words_per_turn: int = 20):
+    history = []
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "model"
+        history.append({"role": role, "content": f"Turn {i}. " + " ".join(["word"] * words_per_turn)})
+    return history
+
+
+def test_estimate_tokens_counts_long_unbroken_strings():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world!") == 3
+    assert estimate_tokens("x" * 400) == 100
+
+
+def test_truncate_to_tokens_marks_the_cut():
+    text = " ".join(["word"] * 500)
+    trimmed = truncate_to_tokens(text, 50)
+    assert trimmed.endswith("…")
+    assert estimate_tokens(trimmed) <= 60
+
+
+def test_recent_turns_fit_budget_and_older_turns_are_summarized():
+    compactor = HistoryCompactor(token_budget=100, summary_token_budget=500)
+    history = make_history(10)
+
+    summary, recent = compactor.compact(history, conversation_id="c1")
+
+    assert sum(estimate_tokens(m["content"]) for m in recent) <= 100
+    assert recent[-1] == history[-1]
+    assert summary.startswith("User: Turn 0.")
+    assert summary.count("\n") + 1 == len(history) - len(recent)
+
+
+def test_short_history_is_kept_verbatim():
+    compactor = HistoryCompactor(token_budget=1000, summary_token_budget=200)
+    history = make_history(4, words_per_turn=3)
+
+    summary, recent = compactor.compact(history)
+
+    assert summary == ""
+    assert recent == history
+
+
+def test_single_huge_paste_is_truncated():
+    compactor = HistoryCompactor(token_budget=50, summary_token_budget=50)
+    history = [{"role": "user", "content": "data " * 5000}]
+
+    summary, recent = compactor.compact(history)
+
+    assert summary == ""
+    assert len(recent) == 1
+    assert estimate_tokens(recent[0]["content"]) <= 60
+
+
+def test_summary_is_bounded_and_cached_incrementally():
+    compactor = HistoryCompactor(token_budget=30, summary_token_budget=60)
+    history = make_history(40)
+
+    summary, _ = compactor.compact(history, conversation_id="c2")
+    assert estimate_tokens(summary) <= 60
+
+    # Next request appends a turn: the cached summary lines are reused and extended
+    history.append({"role": "user", "content": "Turn 40. Another question"})
+    cached_count = compactor._summaries["c2"][0]
+    summary, _ = compactor.compact(history, conversation_id="c2")
+    assert compactor._summaries["c2"][0] > cached_count
+    assert estimate_tokens(summary) <= 60
+
+
+def test_cache_is_not_reused_for_a_different_conversation_prefix():
+    compactor = HistoryCompactor(token_budget=30, summary_token_budget=500)
+    first = make_history(10)
+    compactor.compact(first, conversation_id="shared")
+
+    other = [{"role": m["role"], "content": m["content"].replace("word", "other")} for m in first]
+    summary, _ = compactor.compact(other, conversation_id="shared")
+
+    assert "word" not in summary
+
+
+@pytest.mark.asyncio
+async def test_website_agent_sends_bounded_history(mocker):
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", False)
+    agent = WebsiteAgent()
+    agent.provider = "openai"
+    agent.history_compactor = HistoryCompactor(token_budget=100, summary_token_budget=100)
+    agent._process_openai = AsyncMock(return_value={"response_text": "ok"})
+
+    await agent.process_message("And the loyalty program?", make_history(30), conversation_id="abc")
+
+    messages = agent._process_openai.call_args[0][0]
+    assert "CONVERSATION SO FAR" in messages[0]["content"]
+    assert messages[-1] == {"role": "user", "content": "And the loyalty program?"}
+    assert sum(estimate_tokens(m["content"]) for m in messages[1:-1]) <= 100
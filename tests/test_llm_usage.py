@@ -0,0 +1,110 @@
+import httpx
+import pytest
+
+from app import main
+from app.agent import Agent
+from app.config import settings
+from app.fakes.llm import FakeLLM
+from app.utils import llm_usage
+from app.utils.llm_usage import LLM_RETRIES, LLM_TOKENS, UsageStore, UsageTracker, get_usage_store
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@pytest.fixture
+def usage_db(mocker, tmp_path):
+    mocker.patch.object(settings, "LLM_PROVIDER", "fake")
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", "openai")
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+    mocker.patch.object(settings, "LLM_RETRY_BACKOFF_MS", 0)
+    # Repeated prompts must reach the model, not the tool-plan cache
+    mocker.patch.object(settings, "PLAN_CACHE_ENABLED", False)
+    mocker.patch.object(settings, "LLM_USAGE_DB_PATH", str(tmp_path / "usage.db"))
+    # Write the daily rows inline so they can be read back straight away
+    mocker.patch("app.utils.offload.submit_blocking", side_effect=lambda fn, *args: fn(*args))
+    return get_usage_store()
+
+
+@pytest.mark.asyncio
+async def test_agent_request_is_recorded_per_business_and_first_tool(usage_db):
+    before = LLM_TOKENS.value(provider="fake", model=settings.OPENAI_MODEL, route="unknown", tool="list_leads", kind="prompt")
+    agent = Agent()
+    await agent.process_prompt("show my leads", business_id=11)
+    await agent.process_prompt("show my leads", business_id=11)
+    await agent.process_prompt("hi", business_id=12)
+
+    rows = {(row["business_id"], row["tool"]): row for row in usage_db.daily()}
+    leads = rows[("11", "list_leads")]
+    # Two requests, each a tool-choosing call and a final answer
+    assert leads["calls"] == 4
+    assert leads["prompt_tokens"] > 0 and leads["completion_tokens"] > 0
+    assert leads["retries"] == 0 and leads["errors"] == 0
+    assert leads["provider"] == "fake" and leads["model"] == settings.OPENAI_MODEL
+    assert rows[("12", "get_help_guide")]["calls"] == 2
+    assert usage_db.daily(business_id="12")[0]["tool"] == "get_help_guide"
+
+    after = LLM_TOKENS.value(provider="fake", model=settings.OPENAI_MODEL, route="unknown", tool="list_leads", kind="prompt")
+    assert after - before == leads["prompt_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_and_counted(usage_db, mocker):
+    failures = [RateLimitError("slow down"), RateLimitError("slow down")]
+    original_wait = FakeLLM.wait
+
+    async def flaky_wait(self):
+        if failures:
+            raise failures.pop()
+        await original_wait(self)
+
+    mocker.patch.object(FakeLLM, "wait", flaky_wait)
+    before = LLM_RETRIES.value(provider="fake", model=settings.OPENAI_MODEL)
+
+    result = await Agent().process_prompt("show my leads", business_id=21)
+    assert result["type"] == "list_leads"
+    [row] = usage_db.daily(business_id="21")
+    assert row["retries"] == 2 and row["errors"] == 0
+    assert LLM_RETRIES.value(provider="fake", model=settings.OPENAI_MODEL) - before == 2
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_are_not_retried():
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    usage = UsageTracker("openai", "gpt-4o", business_id=5)
+    with pytest.raises(ValueError):
+        await usage.call(request)
+    assert len(attempts) == 1
+    assert usage.totals()["errors"] == 1
+
+
+def test_daily_rows_accumulate(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"))
+    row = dict(day="2026-01-05", business_id="7", provider="openai", model="gpt-4o", route="/agent/chat", tool="list_leads",
+               calls=2, prompt_tokens=900, completion_tokens=40, cached_tokens=512, latency_ms=800.0,
+               max_latency_ms=500.0, retries=1, errors=0)
+    store.add(row)
+    store.add(dict(row, max_latency_ms=700.0, retries=0))
+    [total] = store.daily("2026-01-05")
+    assert total["calls"] == 4 and total["prompt_tokens"] == 1800 and total["cached_tokens"] == 1024
+    assert total["max_latency_ms"] == 700.0 and total["retries"] == 1
+    assert store.daily("2026-01-06") == []
+
+
+@pytest.mark.asyncio
+async def test_usage_is_tagged_with_the_route(usage_db, mocker):
+    mocker.patch.object(settings, "ADMIN_TOKEN", "secret")
+    mocker.patch.object(main.agent, "provider", "fake")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        response = await client.post("/agent/chat", json={"prompt": "show my leads", "business_id": 31})
+        assert response.status_code == 200
+        usage = await client.get("/debug/usage", params={"business_id": "31"}, headers={"X-Admin-Token": "secret"})
+    [row] = usage.json()["rows"]
+    assert row["route"] == "/agent/chat" and row["tool"] == "list_leads"
+    assert llm_usage.current_route.get() == ""
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.loadtest import percentile, run_load
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_load_counts_requests_and_errors():
+    stub = FastAPI()
+
+    @stub.post("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @stub.post("/fail")
+    async def fail():
+        raise HTTPException(status_code=503)
+
+    mix = [{"endpoint": "/ok", "weight": 1, "payload": {}}, {"endpoint": "/fail", "weight": 1, "payload": {}}]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://stub") as client:
+        report = await run_load(client, mix, concurrency=4, duration=5, max_requests=200)
+
+    assert report["requests"] == 200
+    assert report["endpoints"]["/ok"]["error_rate"] == 0.0
+    assert report["endpoints"]["/fail"]["error_rate"] == 1.0
+    assert report["endpoints"]["/fail"]["errors"] == {"http_503": report["endpoints"]["/fail"]["requests"]}
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+
+def test_offline_cli_run_writes_results(tmp_path):
+    output = tmp_path / "results.json"
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.loadtest", "--concurrency", "4", "--duration", "10", "--requests", "40",
+         "--warmup", "2", "--llm-latency-ms", "0", "--upstream-latency-ms", "0", "--output", str(output)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120,
+        # The fake traffic must not land in data/llm_usage.db
+        env={**os.environ, "LLM_USAGE_DB_PATH": ""},
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    result = json.loads(output.read_text())
+    assert result["target"] == "in-process"
+    assert result["results"]["requests"] == 40
+    assert result["results"]["error_rate"] == 0.0
+    assert set(result["results"]["endpoints"]) <= {"/agent/chat", "/agent/phone/chat", "/website/chat"}
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.loop_monitor import LOOP_LAG, LoopMonitor
+from app.utils.metrics import Counter, Registry, Summary
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", registry=registry)
+    latency = Summary("latency_seconds", "Latency", quantiles=(0.5, 0.99), window=10, registry=registry)
+    requests.inc(route="/agent/chat")
+    requests.inc(2, route="/agent/chat")
+    for value in range(1, 21):
+        latency.observe(value / 10)
+
+    text = registry.render()
+
+    assert 'requests_total{route="/agent/chat"} 3.0' in text
+    assert "# TYPE latency_seconds summary" in text
+    # Quantiles cover the last 10 observations only, the count and sum all of them
+    assert 'latency_seconds{quantile="0.5"} 1.5' in text
+    assert "latency_seconds_count 20" in text
+    assert latency.snapshot()["p99"] == 2.0
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_monitor_reports_the_blocking_call():
+    monitor = LoopMonitor(interval_ms=10, block_ms=50)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        _blocking_handler()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    report = monitor.report()
+    [offender] = report["offenders"]
+    assert "_blocking_handler" in offender["where"]
+    assert offender["count"] == 1
+    assert offender["max_ms"] >= 200
+    assert any("time.sleep(0.3)" in line for line in offender["stack"])
+    assert report["lag_ms"]["max"] >= 200
+
+
+def test_metrics_endpoint_publishes_loop_lag():
+    from app.main import app
+    LOOP_LAG.observe(0.002)
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert 'event_loop_lag_seconds{quantile="0.99"}' in response.text
@@ -0,0 +1,18 @@
+from app.tools import appointments, leads
+from benchmarks.micro import BENCHMARKS, compare, run_benchmarks
+
+
+def test_compare_flags_only_slowdowns_beyond_tolerance():
+    baseline = {"a": {"median_us": 100.0}, "b": {"median_us": 100.0}, "c": {"median_us": 100.0}}
+    results = {"a": {"median_us": 120.0}, "b": {"median_us": 130.0}, "c": {"median_us": 50.0}, "new": {"median_us": 1.0}}
+    assert compare(results, baseline, tolerance=0.25) == [("b", 100.0, 130.0, 1.3)]
+
+
+def test_every_benchmark_runs_at_the_smallest_size():
+    original_services = (leads.get_service, appointments.get_service)
+    results = run_benchmarks(max_size=10, rounds=1, min_time=0.0)
+
+    assert len(results) == len(BENCHMARKS)
+    assert all(stats["median_us"] > 0 for stats in results.values())
+    # Tool benchmarks swap in a stub service and must put the real one back
+    assert (leads.get_service, appointments.get_service) == original_services
@@ -0,0 +1,98 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.config import settings
+from app.models import BookingRequest, Invoice, LeadCreateRequest
+from app.services import mock_store
+from app.services.mock_service import MockService
+from app.services.mock_store import MockDataStore, parse_booking_id, parse_invoice_id
+from app.tools import appointments
+
+ANCHOR = date(2026, 3, 31)
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    mock_store.reset_store()
+    yield
+    mock_store.reset_store()
+
+
+def test_generation_is_deterministic_per_business_and_day():
+    a = MockDataStore(seed=7, anchor=ANCHOR)
+    b = MockDataStore(seed=7, anchor=ANCHOR)
+    # Touch in a different order: rows depend only on (seed, business, day)
+    b.bookings_between(12, date(2026, 3, 1), date(2026, 3, 3))
+    assert a.bookings_between(11, date(2026, 3, 2), date(2026, 3, 2)) == b.bookings_between(11, date(2026, 3, 2), date(2026, 3, 2))
+    assert a.leads(11) == b.leads(11)
+    assert a.leads(11) != MockDataStore(seed=8, anchor=ANCHOR).leads(11)
+
+
+def test_range_queries_and_id_lookup():
+    store = MockDataStore(bookings_per_day=5, invoices_per_day=3, anchor=ANCHOR)
+    week = store.bookings_between(11, date(2026, 3, 1), date(2026, 3, 7))
+    assert len(week) == 35
+    assert all(date(2026, 3, 1) <= b.start_time.date() <= date(2026, 3, 7) for b in week)
+    assert all(b.status in ("QU", "BO") for b in store.bookings_between(11, date(2026, 3, 1), date(2026, 3, 7), ["QU", "BO"]))
+
+    leads = store.leads_between(11, date(2026, 2, 1), date(2026, 2, 28))
+    assert leads and all(l.created_at.month == 2 for l in leads)
+
+    # IDs encode business and day, so a fresh store resolves them without a scan
+    booking, invoice = week[-1], store.invoices_between(11, date(2026, 3, 4), date(2026, 3, 4))[0]
+    assert parse_booking_id(booking.id) == (11, booking.start_time.date())
+    assert parse_invoice_id(invoice.id) == (11, date(2026, 3, 4))
+    fresh = MockDataStore(bookings_per_day=5, invoices_per_day=3, anchor=ANCHOR)
+    assert fresh.get_booking(str(booking.id)) == booking
+    assert fresh.get_invoice(invoice.id) == invoice
+    assert fresh.stats()["bookings"] == 5
+    assert fresh.get_booking("not-an-id") is None
+
+
+def test_preload_counts():
+    store = MockDataStore(leads_per_business=4, bookings_per_day=2, invoices_per_day=1, anchor=ANCHOR)
+    assert store.preload(range(1, 4), days=10) == {"leads": 12, "bookings": 60, "invoices": 30}
+    assert store.stats() == {"businesses": 3, "leads": 12, "bookings": 60, "invoices": 30}
+
+
+@pytest.mark.asyncio
+async def test_mock_service_instances_share_state():
+    created = await MockService().create_lead(LeadCreateRequest(business_id=11, name="Mei Ling", phone="6590000000"))
+    leads = await MockService("other-token").list_leads(11)
+    assert leads.total == settings.MOCK_LEADS_PER_BUSINESS + 1
+    assert leads.items[-1].lead_id == created.lead_id
+
+    service = (await MockService().search_services(11, ""))[0]
+    booking = await MockService().create_appointment(
+        BookingRequest(bizId=11, phone="6590000000", serviceIds=[service.id], dateTime="2026-03-02T10:00:00")
+    )
+    assert booking.services == [service.name]
+    fetched = await MockService().get_appointment(str(booking.bookingId))
+    assert fetched.customer_id == "6590000000"
+
+    invoice = await MockService().create_invoice(Invoice(business_id="11", customer_id="c1", amount=40.0))
+    assert (await MockService().get_invoice(invoice.id)).amount == 40.0
+    assert [inv.id for inv in await MockService().list_invoices()] == [invoice.id]
+
+
+@pytest.mark.asyncio
+async def test_list_appointments_tool_in_mock_mode(mocker):
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+    result = await appointments.list_appointments(11, "2026-03-01", "2026-03-03")
+    assert result.type == "list_appointments"
+    assert result.data
+    assert all(datetime.strptime(a.start_time[:10], "%Y-%m-%d").day in (1, 2, 3) for a in result.data)
+    assert {a.status for a in result.data} <= {"QU", "BO", "PE"}
+
+
+@pytest.mark.asyncio
+async def test_summary_counts_match_range():
+    store = mock_store.get_store()
+    summary = await MockService().get_summary_for_business("11", "2026/03/01", "2026/03/07")
+    bookings = store.bookings_between(11, date(2026, 3, 1), date(2026, 3, 7))
+    invoices = store.invoices_between(11, date(2026, 3, 1), date(2026, 3, 7))
+    assert summary.total_appointments == len(bookings)
+    assert summary.bills_count == len(invoices)
+    assert summary.total_revenue == round(sum(i.amount for i in invoices if i.status == "paid"), 2)
+    assert len(summary.recent_activities) == 5
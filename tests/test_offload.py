@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app import main
+from app.utils import date_utils, http, mappings
+from app.utils.loop_monitor import LoopMonitor
+from app.utils.offload import run_blocking
+
+# Each store call blocks its thread this long (a slow disk); the loop must not feel it
+STORE_DELAY = 0.1
+MAX_LOOP_LAG_MS = 50
+
+
+class SlowStore:
+    def __init__(self):
+        self.mappings = {}
+
+    def get(self, phone):
+        time.sleep(STORE_DELAY)
+        return self.mappings.get(phone)
+
+    def add(self, phone, business_id):
+        time.sleep(STORE_DELAY)
+        self.mappings[phone] = business_id
+        return True
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_uses_the_bounded_pool():
+    loop_thread = threading.current_thread().name
+    name = await run_blocking(lambda: threading.current_thread().name)
+    assert name != loop_thread and name.startswith("offload")
+
+
+@pytest.mark.asyncio
+async def test_dateparser_phrases_are_offloaded(mocker):
+    spy = mocker.spy(date_utils, "parse_date_flexible")
+    date_utils.clear_date_cache()
+    run_blocking_spy = mocker.patch("app.utils.offload.run_blocking", wraps=run_blocking)
+
+    assert await date_utils.parse_date_flexible_async("tomorrow 10am") == date_utils.parse_date_flexible("tomorrow 10am")
+    run_blocking_spy.assert_not_called()
+    await date_utils.parse_date_flexible_async("dec 24 2025")
+    run_blocking_spy.assert_called_once()
+    assert spy.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_stays_low_under_concurrent_blocking_endpoints(monkeypatch):
+    monkeypatch.setattr(mappings, "_store", SlowStore())
+    ip_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ip": "203.0.113.7"})))
+    http.set_http_client(ip_client)
+
+    monitor = LoopMonitor(interval_ms=5, block_ms=MAX_LOOP_LAG_MS)
+    monitor.start()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            requests = []
+            for i in range(16):
+                phone = f"659000{i:04d}"
+                requests.append(client.post("/business/register", json={"phone": phone, "business_id": 5000 + i}))
+                requests.append(client.post("/business/lookup", json={"phone": phone}))
+                requests.append(client.get("/debug/ip"))
+            responses = await asyncio.gather(*requests)
+    finally:
+        await monitor.stop()
+        await http.close_http_client()
+
+    assert all(response.status_code in (200, 404) for response in responses)
+    assert responses[2].json() == {"ip": "203.0.113.7"}
+    report = monitor.report()
+    assert report["offenders"] == []
+    assert report["lag_ms"]["max"] < MAX_LOOP_LAG_MS
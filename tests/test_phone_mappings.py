@@ -0,0 +1,112 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from app.utils.mappings import PhoneMappingRegistry, INITIAL_DATA
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_lookup_uses_initial_data_when_file_missing(tmp_path):
+    registry = PhoneMappingRegistry(str(tmp_path / "mappings.json"))
+    assert registry.get("+65 9270 1525") == INITIAL_DATA["6592701525"]
+    assert registry.get("0000000000") is None
+
+
+def test_stored_keys_are_canonicalized_on_load(tmp_path):
+    path = tmp_path / "mappings.json"
+    path.write_text(json.dumps({"+65 9270 1525": 96}))
+    (tmp_path / "mappings.json.journal").write_text(json.dumps({"phone": "0065-8123-4567", "business_id": 7}) + "\n")
+    registry = PhoneMappingRegistry(str(path))
+    assert registry.get("6592701525") == 96
+    assert registry.get("92701525") == 96
+    assert registry.get("+65 8123 4567") == 7
+    # Business 96 is already taken by the formatted key
+    assert not registry.add("6599999999", 96)
+
+
+def test_add_enforces_one_phone_per_business(tmp_path):
+    registry = PhoneMappingRegistry(str(tmp_path / "mappings.json"))
+    assert registry.add("5556667777", 999)
+    assert registry.add("555-666-7777", 999)  # same phone again is a no-op
+    assert not registry.add("1112223333", 999)
+    # Re-pointing a phone frees its old business ID
+    assert registry.add("5556667777", 1000)
+    assert registry.add("1112223333", 999)
+
+
+def test_registrations_are_visible_to_other_instances(tmp_path):
+    path = str(tmp_path / "mappings.json")
+    writer = PhoneMappingRegistry(path)
+    reader = PhoneMappingRegistry(path)
+    assert reader.get("5550001111") is None
+
+    writer.add("5550001111", 42)
+
+    assert reader.get("5550001111") == 42
+    assert not reader.add("5559999999", 42)
+
+
+def test_compaction_writes_snapshot_and_truncates_journal(tmp_path):
+    path = tmp_path / "mappings.json"
+    registry = PhoneMappingRegistry(str(path), compact_after=5)
+    for i in range(12):
+        assert registry.add(f"6000000{i:03d}", 5000 + i)
+
+    snapshot = json.loads(path.read_text())
+    assert snapshot["6000000000"] == 5000
+    assert len((tmp_path / "mappings.json.journal").read_text().splitlines()) == 2
+
+    fresh = PhoneMappingRegistry(str(path))
+    assert len(fresh) == len(INITIAL_DATA) + 12
+    assert fresh.get("6000000011") == 5011
+
+
+def test_lookup_racing_a_compaction_rereads_the_new_snapshot(tmp_path, mocker):
+    path = str(tmp_path / "mappings.json")
+    writer = PhoneMappingRegistry(path, compact_after=3)
+    reader = PhoneMappingRegistry(path)
+    assert writer.add("7000000001", 1)
+    assert reader.get("7000000001") == 1
+
+    apply_journal = reader._apply_journal
+    raced = []
+
+    def compaction_in_between():
+        # Another worker compacts and keeps registering after this reader checked the snapshot
+        if not raced:
+            raced.append(True)
+            for i in range(2, 6):
+                assert writer.add(f"700000000{i}", i)
+        apply_journal()
+
+    mocker.patch.object(reader, "_apply_journal", side_effect=compaction_in_between)
+    # The racing lookup itself must see the compacted entries, not the new journal at the old offset
+    assert reader.get("7000000004") == 4
+    for i in range(1, 6):
+        assert reader.get(f"700000000{i}") == i
+
+
+WORKER_SCRIPT = """
+import sys
+from app.utils.mappings import PhoneMappingRegistry
+registry = PhoneMappingRegistry(sys.argv[1], compact_after=7)
+worker = int(sys.argv[2])
+for i in range(50):
+    assert registry.add(f"7{worker:02d}{i:05d}", 10000 + worker * 1000 + i)
+"""
+
+
+def test_concurrent_workers_do_not_lose_writes(tmp_path):
+    path = str(tmp_path / "mappings.json")
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT, path, str(worker)], cwd=PROJECT_ROOT)
+        for worker in range(4)
+    ]
+    assert all(proc.wait(timeout=120) == 0 for proc in workers)
+
+    registry = PhoneMappingRegistry(path)
+    assert len(registry) == len(INITIAL_DATA) + 200
+    for worker in range(4):
+        assert registry.get(f"7{worker:02d}00049") == 10000 + worker * 1000 + 49
@@ -0,0 +1,112 @@
+import pytest
+
+from app.agent import Agent
+from app.config import settings
+from app.fakes.llm import get_fake_llm
+from app.models import CHANNEL_WEB, CHANNEL_WHATSAPP
+from app.utils.date_utils import get_date_range
+from app.utils.plan_cache import PlanCache, ToolPlan, normalize_prompt
+
+
+def plan_of(*calls, failed=False):
+    plan = ToolPlan()
+    plan.add_round(list(calls), failed)
+    return plan
+
+
+@pytest.fixture
+def fake_provider(mocker):
+    mocker.patch.object(settings, "LLM_PROVIDER", "fake")
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", "openai")
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+
+
+def test_normalized_prompts_share_a_key():
+    assert normalize_prompt("Show me my leads!") == normalize_prompt("list leads") == "leads"
+    assert normalize_prompt("Today's appointments") != normalize_prompt("appointments this week")
+
+
+def test_relative_dates_stay_symbolic():
+    cache = PlanCache(min_confidence=1)
+    from_date, to_date = get_date_range("this week")
+    cache.put(5, "summary this week", CHANNEL_WEB,
+              plan_of(("get_summary_for_business", {"business_id": "5", "from_date": from_date, "to_date": to_date})))
+    assert cache.get(5, "summary this week", CHANNEL_WEB) == [
+        ("get_summary_for_business", {"business_id": "5", "period": "this week"})]
+
+    # A date the model worked out from words it cannot put back must not be frozen
+    assert not cache.put(5, "appointments on monday", CHANNEL_WEB,
+                         plan_of(("list_appointments", {"business_id": 5, "from_date": "2026/10/19", "to_date": "2026/10/19"})))
+    assert cache.put(5, "appointments 2026/10/19", CHANNEL_WEB,
+                     plan_of(("list_appointments", {"business_id": 5, "from_date": "2026/10/19", "to_date": "2026/10/19"})))
+
+
+def test_iso_datetimes_are_recognized():
+    cache = PlanCache(min_confidence=1)
+    from_date, _ = get_date_range("today")
+    day = from_date.replace("/", "-")
+    cache.put(5, "appointments today", CHANNEL_WEB, plan_of(
+        ("list_appointments", {"business_id": 5, "from_date": f"{day}T00:00:00", "to_date": f"{day}T23:59:59"})))
+    assert cache.get(5, "appointments today", CHANNEL_WEB) == [("list_appointments", {"business_id": 5, "period": "today"})]
+
+    # A datetime the prompt never spelled out is a frozen date, even with a time part
+    assert not cache.put(5, "appointments on friday", CHANNEL_WEB, plan_of(
+        ("list_appointments", {"business_id": 5, "from_date": "2026-10-23T00:00:00", "to_date": "2026-10-23T23:59:59"})))
+
+
+def test_writes_chains_and_failures_are_not_cached():
+    cache = PlanCache(min_confidence=1)
+    assert not cache.put(5, "add lead john", CHANNEL_WEB, plan_of(("create_lead", {"name": "john"})))
+    chain = plan_of(("search_services", {"text": "facial"}))
+    chain.add_round([("create_appointment", {"service_ids": [3]})])
+    assert not cache.put(5, "book a facial", CHANNEL_WEB, chain)
+    assert not cache.put(5, "show my leads", CHANNEL_WEB, plan_of(("list_leads", {}), failed=True))
+    assert len(cache) == 0
+
+
+def test_confidence_and_ttl(mocker):
+    cache = PlanCache(ttl_seconds=60, min_confidence=2)
+    # No keyword agreement: the model has to give the same plan twice
+    cache.put(5, "how much did we make", CHANNEL_WEB, plan_of(("list_invoices", {})))
+    assert cache.get(5, "how much did we make", CHANNEL_WEB) is None
+    cache.put(5, "how much did we make", CHANNEL_WEB, plan_of(("list_invoices", {})))
+    assert cache.get(5, "how much did we make", CHANNEL_WEB) == [("list_invoices", {})]
+
+    # Keyword guess agrees: served after the first answer, but only for that business and channel
+    cache.put(5, "list leads", CHANNEL_WEB, plan_of(("list_leads", {"business_id": 5})))
+    assert cache.get(5, "show my leads", CHANNEL_WEB) == [("list_leads", {"business_id": 5})]
+    assert cache.get(6, "show my leads", CHANNEL_WEB) is None
+    assert cache.get(5, "show my leads", CHANNEL_WHATSAPP) is None
+
+    clock = mocker.patch("app.utils.plan_cache.time.monotonic", return_value=1e9)
+    assert cache.get(5, "show my leads", CHANNEL_WEB) is None
+    clock.assert_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", ["openai", "gemini"])
+async def test_repeated_prompt_skips_the_llm(fake_provider, mocker, style):
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", style)
+    agent = Agent()
+    llm = get_fake_llm()
+
+    first = await agent.process_prompt("summary today", business_id=11, channel=CHANNEL_WHATSAPP)
+    calls = llm.calls
+    second = await agent.process_prompt("Summary today!", business_id=11, channel=CHANNEL_WHATSAPP)
+    assert llm.calls == calls
+    assert second["type"] == first["type"] == "get_summary_for_business"
+    assert second["whatsAppText"] == first["whatsAppText"]
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_falls_back_to_the_llm(fake_provider, mocker):
+    agent = Agent()
+    await agent.process_prompt("show my leads", business_id=11)
+    execute = mocker.patch.object(agent, "_execute_tool", side_effect=["Error executing tool list_leads: boom", "Error again"])
+
+    llm = get_fake_llm()
+    calls = llm.calls
+    await agent.process_prompt("show my leads", business_id=11)
+    assert execute.call_count == 2
+    assert llm.calls == calls + 2
+    assert len(agent.plan_cache) == 0
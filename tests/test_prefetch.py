@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.agent import TOOLS_DEFINITIONS, Agent
+from app.config import settings
+from app.fakes import llm as fake_llm
+from app.fakes.llm import FakeLLM
+from app.models import CHANNEL_WEB, CHANNEL_WHATSAPP, ToolResult
+from app.tools import business
+from app.utils.prefetch import PREFETCH_OUTCOMES, PREFETCH_STARTED, Prefetch, SpeculativePrefetcher
+
+LLM_LATENCY_MS = 50
+
+
+@pytest.fixture
+def phone_agent(mocker):
+    mocker.patch.object(settings, "LLM_PROVIDER", "fake")
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", "openai")
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+    mocker.patch.object(settings, "PLAN_CACHE_ENABLED", False)
+    mocker.patch.object(settings, "PREFETCH_ENABLED", True)
+    mocker.patch.object(fake_llm, "_fake_llm", FakeLLM.from_file(settings.FAKE_LLM_SCRIPT, latency_ms=LLM_LATENCY_MS))
+
+    summaries = []
+
+    async def slow_summary(**arguments):
+        summaries.append(arguments)
+        await asyncio.sleep(LLM_LATENCY_MS / 2000)
+        return ToolResult(type="get_summary_for_business", data={"leads": 3}, text="3 leads today")
+
+    mocker.patch.object(business, "get_summary_for_business", side_effect=slow_summary)
+    agent = Agent()
+    agent.summaries = summaries
+    return agent
+
+
+def test_candidates_from_intent_and_history(mocker):
+    mocker.patch.object(settings, "PREFETCH_MAX_PER_REQUEST", 2)
+    prefetcher = SpeculativePrefetcher(TOOLS_DEFINITIONS)
+    assert prefetcher.candidates(7, "summary today") == [("get_summary_for_business", {"business_id": "7", "period": "today"})]
+    assert prefetcher.candidates(7, "today's appointments") == [("list_appointments", {"business_id": 7, "period": "today"})]
+    assert prefetcher.candidates(7, "good morning") == []
+
+    for _ in range(3):
+        prefetcher.record(7, CHANNEL_WHATSAPP, "list_offers", {"business_id": "7"})
+    prefetcher.record(7, CHANNEL_WHATSAPP, "list_leads", {"business_id": 7})
+    prefetcher.record(7, CHANNEL_WEB, "list_invoices", {})
+    assert prefetcher.candidates(7, "good morning") == [("list_offers", {"business_id": "7"})]
+    assert prefetcher.candidates(7, "summary today")[1] == ("list_offers", {"business_id": "7"})
+    assert prefetcher.candidates(8, "good morning") == []
+
+
+@pytest.mark.asyncio
+async def test_prefetched_read_is_used_when_the_model_agrees(phone_agent):
+    used = PREFETCH_OUTCOMES.value(tool="get_summary_for_business", outcome="used")
+
+    result = await phone_agent.process_prompt("summary today", 11, None, "6590000001", channel=CHANNEL_WHATSAPP)
+    assert result["type"] == "get_summary_for_business"
+    assert result["whatsAppText"] == "3 leads today"
+    # Started before the LLM answered, and not fetched a second time
+    assert len(phone_agent.summaries) == 1
+    assert PREFETCH_OUTCOMES.value(tool="get_summary_for_business", outcome="used") == used + 1
+
+
+@pytest.mark.asyncio
+async def test_take_just_after_the_read_finished():
+    async def instant(tool_name, arguments):
+        return "done"
+
+    prefetch = Prefetch()
+    prefetch.start("list_offers", {"business_id": "7"}, instant)
+    # The task completes here, but its done callback is only scheduled
+    await asyncio.sleep(0)
+    assert await prefetch.take("list_offers", {"business_id": 7}) == (True, "done")
+
+
+@pytest.mark.asyncio
+async def test_unused_prefetch_is_discarded(phone_agent, mocker):
+    # The model answers a summary question with the offers list instead
+    mocker.patch.object(fake_llm, "_fake_llm", FakeLLM({"rules": [{"match": "summary", "steps": [
+        {"tool_calls": [{"name": "list_offers", "arguments": {"business_id": "{business_id}"}}]},
+        {"text": "Here are your offers."},
+    ]}]}, latency_ms=1))
+    mocker.patch.object(settings, "TOOL_SELECTION_ENABLED", False)
+
+    def unused():
+        return sum(PREFETCH_OUTCOMES.value(tool="get_summary_for_business", outcome=o) for o in ("cancelled", "wasted"))
+
+    before = unused()
+
+    result = await phone_agent.process_prompt("summary today", 11, None, "6590000001", channel=CHANNEL_WHATSAPP)
+    assert result["type"] == "list_offers"
+    # Normally still running (cancelled); on a slow machine it may have finished (wasted)
+    assert unused() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_web_chat_and_disabled_do_not_prefetch(phone_agent, mocker):
+    started = PREFETCH_STARTED.value(tool="get_summary_for_business")
+    await phone_agent.process_prompt("summary today", 11, channel=CHANNEL_WEB)
+    mocker.patch.object(settings, "PREFETCH_ENABLED", False)
+    await phone_agent.process_prompt("summary today", 11, None, "6590000001", channel=CHANNEL_WHATSAPP)
+    assert PREFETCH_STARTED.value(tool="get_summary_for_business") == started
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import main
+from app.config import settings
+from app.utils.profiler import SlowRequestMiddleware, SlowRequestProfiler, await_chain, profile
+
+
+async def fetch_upstream(delay):
+    await asyncio.sleep(delay)
+
+
+async def handle_request(delay):
+    await fetch_upstream(delay)
+
+
+@pytest.mark.asyncio
+async def test_await_chain_reaches_the_suspended_call():
+    task = asyncio.create_task(handle_request(0.1))
+    await asyncio.sleep(0.01)
+    chain = await_chain(task.get_coro())
+    await task
+
+    assert [label.split(" ")[0] for label in chain[:2]] == ["handle_request", "fetch_upstream"]
+    assert "tests/test_profiler.py" in chain[0]
+
+
+@pytest.mark.asyncio
+async def test_wall_profile_attributes_time_to_awaits():
+    task = asyncio.create_task(handle_request(0.3))
+    result = await profile(0.15, interval_ms=5, mode="wall")
+    await task
+
+    # One line per task: the request task and the one awaiting profile() itself
+    stacks = dict(line.rsplit(" ", 1) for line in result["collapsed"].splitlines())
+    [request_stack] = [stack for stack in stacks if "handle_request" in stack]
+    assert request_stack.split(";")[-2].startswith("fetch_upstream")
+    assert int(stacks[request_stack]) >= 10
+
+
+def test_profile_works_on_each_new_event_loop():
+    # uvicorn and pytest-asyncio each run their own loop; a lock made at import belongs to neither
+    async def capture_while_busy():
+        capture = asyncio.ensure_future(profile(0.05, interval_ms=5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(RuntimeError):
+            await profile(0.01)
+        return await capture
+
+    for _ in range(2):
+        assert asyncio.run(capture_while_busy())["ticks"] > 0
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_kept_in_a_bounded_ring():
+    profiler = SlowRequestProfiler(threshold_ms=80, keep=2, interval_ms=5)
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work(delay: float):
+        await handle_request(delay)
+        return {"ok": True}
+
+    app.add_middleware(SlowRequestMiddleware, profiler=profiler)
+    profiler.start()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for delay in (0.0, 0.15, 0.01, 0.12, 0.1):
+                await client.get("/work", params={"delay": delay})
+    finally:
+        profiler.stop()
+
+    slow = profiler.slow_requests()
+    assert len(slow) == 2
+    assert all(entry["path"] == "/work" and entry["duration_ms"] >= 80 for entry in slow)
+    assert "fetch_upstream" in slow[0]["collapsed"]
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint_requires_the_admin_token(monkeypatch):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+        assert (await client.get("/debug/profile", params={"seconds": 0.05})).status_code == 403
+
+        monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+        assert (await client.get("/debug/loop", headers={"X-Admin-Token": "wrong"})).status_code == 403
+        response = await client.get("/debug/profile", params={"seconds": 0.05, "interval_ms": 5}, headers={"X-Admin-Token": "s3cret"})
+        assert response.status_code == 200
+        assert "debug_profile" in response.text
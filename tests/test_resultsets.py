@@ -0,0 +1,61 @@
+import pytest
+
+from app.models import LeadSummary
+from app.resultsets import AppointmentResultSet, LeadResultSet, column_sum, count_by, top_n
+from app.tools.leads import format_lead_table, format_status_breakdown, format_whatsapp_lead_list
+from app.utils.serialization import to_jsonable
+from benchmarks import datasets
+
+
+def _as_resultset(leads):
+    return LeadResultSet(**{name: [getattr(lead, name) for lead in leads] for name in LeadSummary.model_fields})
+
+
+def test_resultset_behaves_like_a_list_of_models():
+    leads = datasets.make_leads(50).items
+    rows = _as_resultset(leads)
+
+    assert len(rows) == 50
+    assert rows[0] == leads[0] and rows[-1] == leads[-1]
+    assert rows[10:13] == leads[10:13]
+    assert rows == leads
+    assert to_jsonable(rows) == to_jsonable(leads)
+    with pytest.raises(IndexError):
+        rows[50]
+    # Low-cardinality strings share one object per distinct value
+    statuses = rows.column("status")
+    assert all(s is next(t for t in statuses if t == s) for s in statuses)
+
+
+def test_aggregates_match_row_by_row_computation():
+    leads = datasets.make_leads(1_000).items
+    rows = _as_resultset(leads)
+
+    for data in (leads, rows):
+        assert column_sum(data, "leadValue") == pytest.approx(sum(l.leadValue for l in leads))
+        assert top_n(data, 5, "leadValue") == sorted(leads, key=lambda l: l.leadValue, reverse=True)[:5]
+        assert count_by(data, "status") == {s: sum(l.status == s for l in leads) for s in {l.status for l in leads}}
+
+
+def test_lead_formatters_accept_resultsets():
+    data = datasets.make_leads(40)
+    columnar = data.model_construct(total=data.total, items=_as_resultset(data.items))
+    assert format_whatsapp_lead_list(columnar, 11) == format_whatsapp_lead_list(data, 11)
+    assert format_lead_table(columnar, 11) == format_lead_table(data, 11)
+
+
+def test_columns_must_line_up():
+    with pytest.raises(ValueError):
+        AppointmentResultSet(booking_id=["1"], customer_name=["A"], service_name=["Cut"], start_time=["x"], status=["BO"], phone=[])
+    with pytest.raises(ValueError):
+        AppointmentResultSet(booking_id=["1"])
+
+
+def test_lead_lists_show_counts_by_status():
+    leads = [LeadSummary(lead_id=str(i), name=f"Lead {i}", status=status, created_at="now")
+             for i, status in enumerate(["NEW", "LOST", "NEW", "", "NEW", "LOST"])]
+    data = datasets.make_leads(0).model_construct(total=len(leads), items=_as_resultset(leads))
+
+    assert format_status_breakdown(data.items) == "NEW 3, LOST 2, Unknown 1"
+    assert "📊 By status: NEW 3, LOST 2, Unknown 1" in format_lead_table(data, 11)
+    assert "By Status: NEW 3, LOST 2, Unknown 1" in format_whatsapp_lead_list(data, 11)
@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+
+import pydantic_core
+
+from app import models
+from app.agent import build_agent_response, tool_result_to_json, tool_result_to_message
+from app.main import chat_response
+from app.models import Appointment, LeadSummary, ToolResult
+from app.resultsets import LeadResultSet
+from app.utils import serialization
+
+
+def _leads(n):
+    return [LeadSummary(lead_id=str(i), name=f"Lead {i}", status="NEW", created_at="now", leadValue=float(i)) for i in range(n)]
+
+
+def test_payload_is_dumped_once_and_shared(mocker):
+    dump = mocker.spy(models, "to_jsonable")
+    result = ToolResult(type="list_leads", data=_leads(3), text="3 leads")
+
+    llm_json = tool_result_to_json(result)
+    gemini = tool_result_to_message(result)
+    reply = build_agent_response("list_leads", "", result)
+
+    assert dump.call_count == 1
+    assert json.loads(llm_json) == gemini == reply["response_value"]
+    assert reply["response_value"] is gemini
+    assert gemini[2]["leadValue"] == 2.0
+
+
+def test_models_dates_and_plain_values():
+    when = datetime(2026, 3, 2, 10, 30)
+    appt = Appointment(id="7", customer_id="c", service_name="Cut", start_time=when, end_time=when)
+    assert serialization.to_jsonable(appt)["start_time"] == "2026-03-02T10:30:00"
+    assert serialization.to_jsonable({"guide": [appt, "x"]})["guide"][1] == "x"
+
+    assert tool_result_to_json("Error: Tool x not found") == "Error: Tool x not found"
+    assert tool_result_to_message(ToolResult(type="get_invoice", data=None, text="")) == {"result": "None"}
+    assert tool_result_to_json(ToolResult(type="get_help_guide", data={"guide": "Getting Started"}, text="")) == '{"guide":"Getting Started"}'
+
+
+def test_chat_response_renders_payload_as_is():
+    result = ToolResult(type="list_leads", data=_leads(2), text="2 leads")
+    response = chat_response("show leads", build_agent_response("Chat", "", result))
+    body = json.loads(response.body)
+    assert response.media_type == "application/json"
+    assert body["type"] == "list_leads"
+    assert body["response_text"] == body["whatsAppText"] == "2 leads"
+    assert [lead["lead_id"] for lead in body["response_value"]] == ["0", "1"]
+
+
+def test_columnar_tool_results_serialize_for_mcp():
+    leads = _leads(2)
+    rows = LeadResultSet(**{name: [getattr(lead, name) for lead in leads] for name in LeadSummary.model_fields})
+    result = ToolResult(type="list_leads", data=rows, text="2 leads")
+
+    expected = [lead.model_dump(mode="json") for lead in leads]
+    assert json.loads(result.model_dump_json())["data"] == expected
+    # What FastMCP sends for a tool's return value
+    assert json.loads(pydantic_core.to_json(result, fallback=str))["data"] == expected
@@ -0,0 +1,119 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.mappings import SqliteMappingStore, PhoneMappingRegistry, canonical_phone, import_mappings
+
+client = TestClient(app)
+
+
+def test_canonical_phone_variants():
+    assert canonical_phone("+65 9270 1525") == "6592701525"
+    assert canonical_phone("0065-9270-1525") == "6592701525"
+    assert canonical_phone("9270 1525") == "6592701525"
+    assert canonical_phone("+91 90805 34415") == "919080534415"
+    assert canonical_phone("5556667777") == "5556667777"
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    seed = tmp_path / "seed.json"
+    seed.write_text(json.dumps({"6592701525": 96, "6590306703": 11, "919080534415": 11}))
+    return SqliteMappingStore(str(tmp_path / "mappings.db"), seed_json_path=str(seed))
+
+
+def test_sqlite_store_seeds_from_json_and_keeps_business_unique(sqlite_store):
+    assert sqlite_store.get("92701525") == 96
+    # Both seeded phones of business 11 are kept, as in the JSON backend
+    assert sqlite_store.get("6590306703") == 11
+    assert sqlite_store.get("919080534415") == 11
+    assert not sqlite_store.add("6512345678", 11)
+
+    assert sqlite_store.add("5556667777", 999)
+    assert sqlite_store.get("555-666-7777") == 999
+    assert not sqlite_store.add("1112223333", 999)
+    assert sqlite_store.add("6592701525", 888)
+    assert sqlite_store.get("6592701525") == 888
+
+
+def test_sqlite_store_uses_wal(sqlite_store):
+    sqlite_store.get("6592701525")
+    mode = sqlite_store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_add_many_reports_rejected_rows(sqlite_store):
+    rows = [(1, "6511110001", 5001), (2, "6511110002", 5002), (3, "6511110003", 5001)]
+    imported, rejected = sqlite_store.add_many(rows)
+    assert imported == 2
+    assert [line for line, _ in rejected] == [3]
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: SqliteMappingStore(str(tmp_path / "bulk.db"), seed_json_path=None),
+    lambda tmp_path: PhoneMappingRegistry(str(tmp_path / "bulk.json")),
+])
+def test_bulk_import_endpoint(tmp_path, mocker, make_store):
+    store = make_store(tmp_path)
+    mocker.patch("app.utils.mappings._store", store)
+
+    csv_body = "phone,business_id\n+65 8000 0001,7001\n65-8000-0002,7002\nnot-a-row\n80000003,7001\n"
+    response = client.post("/business/register/bulk", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["imported"] == 2
+    assert body["rejected"] == 2
+    assert [error["line"] for error in body["errors"]] == [4, 5]
+    assert store.get("80000001") == 7001
+
+    jsonl_body = "\n".join(json.dumps({"phone": f"6580001{i:03d}", "business_id": 8000 + i}) for i in range(500))
+    response = client.post("/business/register/bulk?format=jsonl", content=jsonl_body)
+    assert response.json() == {"imported": 500, "rejected": 0, "errors": []}
+    assert store.get("80001499") == 8499
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_streamed_upload_is_one_store_write(tmp_path, mocker, fmt):
+    store = PhoneMappingRegistry(str(tmp_path / "batches.json"))
+    mocker.patch("app.utils.mappings._store", store)
+    mocker.patch("app.main.BULK_IMPORT_BATCH_LINES", 2)
+    add_many = mocker.spy(store, "add_many")
+
+    rows = [("6581000001", 9001), ("6581000002", 9002), ("bad", "x"), ("6581000004", 9001), ("6581000005", 9005)]
+    if fmt == "csv":
+        body = "phone,business_id\n" + "".join(f"{phone},{business_id}\n" for phone, business_id in rows)
+        first_row_line = 2
+    else:
+        body = "".join(json.dumps({"phone": phone, "business_id": business_id}) + "\n" for phone, business_id in rows)
+        first_row_line = 1
+    response = client.post(f"/business/register/bulk?format={fmt}", content=body)
+
+    body = response.json()
+    assert body["imported"] == 3 and body["rejected"] == 2
+    assert [error["line"] for error in body["errors"]] == [first_row_line + 2, first_row_line + 3]
+    assert store.get("6581000005") == 9005
+    assert add_many.call_count == 1
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: SqliteMappingStore(str(tmp_path / "partial.db"), seed_json_path=None),
+    lambda tmp_path: PhoneMappingRegistry(str(tmp_path / "partial.json")),
+])
+def test_upload_failing_midway_registers_nothing(tmp_path, mocker, make_store):
+    store = make_store(tmp_path)
+    mocker.patch("app.utils.mappings._store", store)
+
+    def dropped_upload():
+        yield "phone,business_id\n"
+        yield "6582000001,9101\n"
+        raise ConnectionResetError("client went away")
+
+    with pytest.raises(ConnectionResetError):
+        import_mappings(dropped_upload(), "csv")
+    assert store.get("6582000001") is None
+    assert store.add("6582000002", 9101)
+
+
+def test_bulk_import_rejects_unknown_format():
+    response = client.post("/business/register/bulk", content="x", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415
@@ -0,0 +1,69 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cold-import budget for `import app.main`, in milliseconds. Override on slow CI runners.
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+
+# Modules that must only be loaded by the lifespan warm-up, never at import time
+DEFERRED_MODULES = ["dateparser", "openai", "google.generativeai"]
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S.*)$")
+
+
+def _run_python(args):
+    env = {**os.environ, "STARTUP_WARMUP": "false"}
+    return subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+
+
+def import_profile(module: str) -> dict:
+    """Runs `python -X importtime -c "import <module>"` and returns {module: cumulative_us}."""
+    result = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    assert result.returncode == 0, result.stderr
+    profile = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            profile[match.group(3).strip()] = int(match.group(2))
+    return profile
+
+
+def test_app_import_does_not_load_deferred_modules():
+    check = "import sys, app.main; print(','.join(m for m in %r if m in sys.modules))" % (DEFERRED_MODULES,)
+    result = _run_python(["-c", check])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", f"Imported at startup: {result.stdout.strip()}"
+
+
+def test_config_import_is_silent():
+    result = _run_python(["-c", "import app.config"])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
+
+
+def test_cold_import_within_budget():
+    profile = import_profile("app.main")
+    cumulative_ms = profile["app.main"] / 1000
+    slowest = sorted(profile.items(), key=lambda item: item[1], reverse=True)[1:6]
+    assert cumulative_ms <= IMPORT_BUDGET_MS, (
+        f"import app.main took {cumulative_ms:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms). "
+        f"Slowest: {[(name, us // 1000) for name, us in slowest]}"
+    )
+
+
+def test_warm_up_loads_dateparser(mocker):
+    from app.config import settings
+    from app.startup import warm_up
+
+    mocker.patch.object(settings, "LLM_PROVIDER", "none")
+    timings = warm_up()
+
+    assert "dateparser" in timings
+    assert "dateparser" in sys.modules
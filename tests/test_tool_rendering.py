@@ -0,0 +1,67 @@
+import pytest
+
+from app.agent import build_agent_response
+from app.models import AppointmentSummary, CHANNEL_WEB, CHANNEL_WHATSAPP, ToolResult
+from app.tools import appointments
+
+
+def test_renderings_are_built_once_on_first_access():
+    calls = []
+
+    def render(label):
+        def build():
+            calls.append(label)
+            return label
+        return build
+
+    result = ToolResult(type="t", data=[], text=render("web"), whatsAppText=render("wa"))
+    assert calls == []
+    assert result.whatsAppText == "wa"
+    assert result.whatsAppText == "wa"
+    assert calls == ["wa"]
+    assert result.text == "web"
+    assert calls == ["wa", "web"]
+
+
+def test_serialization_renders_both_channels():
+    # MCP clients get the tool result as JSON, renderings included
+    result = ToolResult(type="t", data={"n": 1}, text=lambda: "hello", whatsAppText=lambda: "wa")
+    assert result.model_dump() == {"type": "t", "data": {"n": 1}, "text": "hello", "whatsAppText": "wa"}
+    assert '"whatsAppText":"wa"' in result.model_dump_json()
+
+
+def test_agent_response_only_renders_the_requested_channel():
+    def fail():
+        raise AssertionError("rendered a channel nobody asked for")
+
+    phone = build_agent_response("Chat", "model reply", ToolResult(type="list_leads", data=[], text=fail, whatsAppText=lambda: "wa"), CHANNEL_WHATSAPP)
+    assert phone["type"] == "list_leads"
+    assert phone["whatsAppText"] == "wa"
+    assert phone["response_text"] == "model reply"
+
+    web = build_agent_response("Chat", "model reply", ToolResult(type="list_leads", data=[], text=lambda: "web", whatsAppText=fail), CHANNEL_WEB)
+    assert web["response_text"] == web["whatsAppText"] == "web"
+
+    # Tools without a WhatsApp format fall back to their plain text on the phone channel
+    plain = build_agent_response("Chat", "model reply", ToolResult(type="search_services", data=[], text="found 2"), CHANNEL_WHATSAPP)
+    assert plain["whatsAppText"] == "found 2"
+
+
+@pytest.mark.asyncio
+async def test_list_appointments_parses_each_start_time_once(mocker):
+    rows = [
+        AppointmentSummary(booking_id=str(i), customer_name=f"C{i}", service_name="Cut",
+                           start_time=f"2026-03-0{i + 1}T10:30:00.000+0000", status="BO", phone="6590000000")
+        for i in range(3)
+    ] + [AppointmentSummary(booking_id="x", customer_name="Raw", service_name="Cut", start_time="soon", status="QU", phone="6590000001")]
+    service = mocker.Mock()
+    service.list_appointments = mocker.AsyncMock(return_value=rows)
+    mocker.patch.object(appointments, "get_service", return_value=service)
+    parse = mocker.spy(appointments, "_parse_start_time")
+
+    result = await appointments.list_appointments(11, "2026/03/01", "2026/03/04")
+    assert parse.call_count == 0
+    assert "- Mar 01 10:30 AM | C0 | Cut | BO" in result.text
+    assert "-  soon | Raw | Cut | QU" in result.text
+    assert "01 Mar 10:30 AM" in result.whatsAppText
+    assert parse.call_count == len(rows)
@@ -0,0 +1,87 @@
+import pytest
+
+from app.agent import TOOLS_DEFINITIONS, Agent
+from app.config import settings
+from app.fakes import llm as fake_llm
+from app.fakes.llm import FakeLLM
+from app.models import CHANNEL_WEB, CHANNEL_WHATSAPP
+from app.utils.tool_selection import SCHEMA_TOKENS, TOOL_SELECTIONS, ToolSelector, guess_tools
+
+ALL_TOOLS = [d["function"]["name"] for d in TOOLS_DEFINITIONS]
+
+
+@pytest.fixture
+def selector():
+    return ToolSelector(TOOLS_DEFINITIONS)
+
+
+@pytest.fixture
+def fake_provider(mocker):
+    mocker.patch.object(settings, "LLM_PROVIDER", "fake")
+    mocker.patch.object(settings, "USE_MOCK_DATA", True)
+
+
+def test_keywords_select_a_small_subset(selector):
+    selection = selector.select("summary today", CHANNEL_WEB)
+    assert selection.names == ["get_summary_for_business", "get_help_guide"]
+    assert 0 < selection.schema_tokens < selection.full_schema_tokens / 4
+    assert guess_tools("show me today's appointments")[0] == "list_appointments"
+
+
+def test_companion_tools_come_along(selector):
+    assert set(selector.select("book a haircut tomorrow 10am", CHANNEL_WEB).names) == {
+        "create_appointment", "search_services", "get_help_guide"}
+    assert "get_summary_for_business" in selector.select("summary for 96 and 97", CHANNEL_WEB).names
+
+
+def test_no_keyword_uses_channel_default_and_last_tool(selector):
+    assert selector.select("what's the weather", CHANNEL_WEB).names == ALL_TOOLS
+    whatsapp = selector.select("and yesterday?", CHANNEL_WHATSAPP, session="s1").names
+    assert "list_appointments" in whatsapp and "create_invoice" not in whatsapp
+
+    selector.remember("s1", "list_invoices")
+    assert "list_invoices" in selector.select("and yesterday?", CHANNEL_WHATSAPP, session="s1").names
+    assert "list_invoices" not in selector.select("and yesterday?", CHANNEL_WHATSAPP, session="s2").names
+
+
+@pytest.mark.parametrize("prompt", ["add customer Ravi 9876543210 for facial", "Ravi called, wants a haircut tomorrow 5pm"])
+def test_unmatched_whatsapp_write_prompt_keeps_write_tools(selector, prompt):
+    names = selector.select(prompt, CHANNEL_WHATSAPP).names
+    assert {"create_lead", "create_appointment", "search_services"} <= set(names)
+
+
+def test_disabled_sends_every_tool(selector, mocker):
+    mocker.patch.object(settings, "TOOL_SELECTION_ENABLED", False)
+    selection = selector.select("show my leads", CHANNEL_WEB)
+    assert selection.names == ALL_TOOLS and selection.saved_tokens == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", ["openai", "gemini"])
+async def test_agent_sends_subset_and_records_savings(fake_provider, mocker, style):
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", style)
+    sent, baseline = SCHEMA_TOKENS.value(kind="sent"), SCHEMA_TOKENS.value(kind="baseline")
+
+    result = await Agent().process_prompt("show my leads", business_id=11)
+    assert result["type"] == "list_leads"
+    assert SCHEMA_TOKENS.value(kind="sent") - sent < (SCHEMA_TOKENS.value(kind="baseline") - baseline) / 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("style", ["openai", "gemini"])
+async def test_unknown_tool_falls_back_to_full_set(fake_provider, mocker, style):
+    mocker.patch.object(settings, "FAKE_LLM_STYLE", style)
+    # The model answers a leads question with a tool it was not shown
+    script = FakeLLM({"rules": [{"match": "leads", "steps": [
+        {"tool_calls": [{"name": "list_offers", "arguments": {"business_id": "{business_id}"}}]},
+        {"text": "Here are your offers."},
+    ]}]})
+    mocker.patch.object(fake_llm, "_fake_llm", script)
+    fallbacks = TOOL_SELECTIONS.value(outcome="fallback", channel=CHANNEL_WEB)
+
+    agent = Agent()
+    result = await agent.process_prompt("show my leads", business_id=11)
+    assert result["type"] == "list_offers"
+    assert TOOL_SELECTIONS.value(outcome="fallback", channel=CHANNEL_WEB) == fallbacks + 1
+    # Subset turn, full-set retry, final answer
+    assert script.calls == 3
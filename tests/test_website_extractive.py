@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.config import settings
+from app.services.rag_service import SimpleRAGService
+from app.website_agent import WebsiteAgent, format_extractive_answer
+
+
+def test_score_chunks_ranks_dominant_chunk_first():
+    rag = SimpleRAGService()
+    scored = rag.score_chunks("how does the loyalty program work?")
+
+    assert scored, "expected at least one matching chunk"
+    top_chunk = scored[0][1]
+    assert "Loyalty Program" in top_chunk
+    assert rag.matched_keywords("how does the loyalty program work?", top_chunk) == {"loyalty", "program"}
+
+
+def test_score_chunks_ignores_stopwords_only_query():
+    rag = SimpleRAGService()
+    assert rag.score_chunks("what is the") == []
+
+
+def test_retrieve_keeps_plain_word_overlap_ranking():
+    rag = SimpleRAGService()
+    # Stopwords still count for the LLM context, as they always have
+    assert rag.retrieve("what is the") != ""
+    assert rag.retrieve("loyalty program").startswith("4. Loyalty Program")
+
+
+def test_format_extractive_answer_strips_numbering():
+    chunk = "4. Loyalty Program\nFoster customer retention.\n- Automated tracking of customer points."
+    text = format_extractive_answer(chunk)
+    assert text.startswith("**Loyalty Program**\nFoster customer retention.")
+    assert "arrange a quick call" in text
+
+
+@pytest.mark.asyncio
+async def test_short_dominant_question_skips_llm(mocker):
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", True)
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_MIN_MARGIN", 0.5)
+    agent = WebsiteAgent()
+    agent.provider = "openai"
+    agent._process_openai = AsyncMock(return_value={"response_text": "from llm"})
+
+    response = await agent.process_message("Tell me about the loyalty program")
+
+    agent._process_openai.assert_not_called()
+    assert response["response_text"].startswith("**Loyalty Program**")
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_or_long_question_falls_back_to_llm(mocker):
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", True)
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_MAX_WORDS", 8)
+    agent = WebsiteAgent()
+    agent.provider = "openai"
+    agent._process_openai = AsyncMock(return_value={"response_text": "from llm"})
+
+    long_question = "Can you explain how reviews and the loyalty program and campaigns work together for my salon?"
+    response = await agent.process_message(long_question)
+
+    agent._process_openai.assert_called_once()
+    assert response["response_text"] == "from llm"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("question", ["what is the pricing?", "how much does it cost?"])
+async def test_single_keyword_match_falls_back_to_llm(mocker, question):
+    # "pricing" is only in the body of the website chunk and "cost" in "cost-effective"; neither answers the question
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", True)
+    agent = WebsiteAgent()
+    agent.provider = "openai"
+    agent._process_openai = AsyncMock(return_value={"response_text": "from llm"})
+
+    response = await agent.process_message(question)
+
+    agent._process_openai.assert_called_once()
+    assert response["response_text"] == "from llm"
+
+
+@pytest.mark.asyncio
+async def test_extractive_mode_can_be_disabled(mocker):
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", False)
+    agent = WebsiteAgent()
+    agent.provider = "openai"
+    agent._process_openai = AsyncMock(return_value={"response_text": "from llm"})
+
+    response = await agent.process_message("Tell me about the loyalty program")
+
+    assert response["response_text"] == "from llm"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("question, title", [("what is the pricing?", "Pricing"), ("Loyalty?", "Loyalty Program")])
+async def test_single_keyword_heading_hit_is_answered_extractively(mocker, tmp_path, question, title):
+    knowledge_base = tmp_path / "kb.txt"
+    knowledge_base.write_text(
+        "1. Pricing\nPlans start at $29 a month per outlet.\n\n"
+        "2. Loyalty Program\nReward repeat customers with points.\n\n"
+        "3. Reports\nWeekly revenue and footfall reports.\n",
+        encoding="utf-8",
+    )
+    mocker.patch.object(settings, "WEBSITE_EXTRACTIVE_ENABLED", True)
+    agent = WebsiteAgent()
+    agent.rag = SimpleRAGService(str(knowledge_base))
+    agent.provider = "openai"
+    agent._process_openai = AsyncMock(return_value={"response_text": "from llm"})
+
+    response = await agent.process_message(question)
+
+    agent._process_openai.assert_not_called()
+    assert response["response_text"].startswith(f"**{title}**")
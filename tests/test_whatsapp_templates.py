@@ -0,0 +1,46 @@
+import json
+from types import SimpleNamespace
+
+from app.config import settings
+from app.tools import appointments
+from app.utils.whatsapp import Template, escape, render_list
+from benchmarks import datasets
+
+
+def test_render_matches_escaping_the_whole_message():
+    template = Template("👤 *{lead.name}* said \"{quote}\"\n💰 ₹{value:,.2f}\t{{literal}}")
+    lead = SimpleNamespace(name="Mei Ling \\ Tan")
+    message = f"👤 *{lead.name}* said \"héllo 🚀\"\n💰 ₹{1234.5:,.2f}\t{{literal}}"
+    assert template.render(lead=lead, quote="héllo 🚀", value=1234.5) == json.dumps(message, ensure_ascii=True)[1:-1]
+    assert escape("a\"b\n") == "a\\\"b\\n"
+
+
+def test_static_template_is_rendered_once():
+    template = Template("👋 *Welcome!*\n")
+    assert template.render() is template.render()
+
+
+def test_render_list_caps_message_size():
+    header = Template("Items ({count})\n")
+    item = Template("{index}. {name}\n")
+    rows = [{"name": f"row-{i:04d}"} for i in range(1000)]
+
+    escaped = render_list(header, item, rows, row_count=len(rows), limit=200, count=len(rows))
+    message = json.loads(f'"{escaped}"')
+    assert len(message) <= 200
+    assert message.startswith("Items (1000)\n1. row-0000\n")
+    shown = message.count("row-")
+    assert message.endswith(f"\n...and {1000 - shown} more.")
+
+    # Everything fits: no overflow line
+    small = json.loads('"' + render_list(header, item, rows[:3], row_count=3, limit=200, count=3) + '"')
+    assert small == "Items (3)\n1. row-0000\n2. row-0001\n3. row-0002\n"
+
+
+def test_appointment_list_respects_whatsapp_limit():
+    data = datasets.make_appointments(5_000)
+    start_times = [appointments._parse_start_time(a.start_time) for a in data]
+    message = json.loads('"' + appointments.format_whatsapp_appointment_list(data, start_times) + '"')
+    assert len(message) <= settings.WHATSAPP_MAX_MESSAGE_CHARS
+    assert message.startswith("📅 *Appointments (5000)*")
+    assert "more." in message.splitlines()[-1]